@@ -0,0 +1,106 @@
+"""
+Header-only audio metadata probing
+
+Reads duration, sample rate, channel count, subtype and frame count from
+container headers without decoding any audio. soundfile (libsndfile) is
+tried first; formats it cannot open (e.g. m4a/aac) fall back to ffprobe.
+"""
+
+import json
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import soundfile as sf
+
+# Probing is I/O bound, so many files can be in flight at once
+DEFAULT_PROBE_WORKERS = 16
+
+
+def _probe_soundfile(file_path):
+    """Read metadata from the header with libsndfile."""
+    info = sf.info(str(file_path))
+    return {
+        'duration': info.frames / info.samplerate if info.samplerate else 0.0,
+        'sample_rate': info.samplerate,
+        'channels': info.channels,
+        'subtype': info.subtype,
+        'frames': info.frames,
+    }
+
+
+def _probe_ffprobe(file_path):
+    """Read metadata from the first audio stream with ffprobe."""
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-select_streams', 'a:0',
+         '-show_entries', 'stream=sample_rate,channels,codec_name,sample_fmt,duration:format=duration',
+         '-of', 'json', str(file_path)],
+        capture_output=True, text=True, check=False
+    )
+    if result.returncode != 0:
+        raise ValueError(f"ffprobe could not read {file_path}: {result.stderr.strip()}")
+
+    data = json.loads(result.stdout or '{}')
+    streams = data.get('streams') or []
+    if not streams:
+        raise ValueError(f"No audio stream found in {file_path}")
+
+    stream = streams[0]
+    sample_rate = int(stream.get('sample_rate', 0))
+    duration = float(stream.get('duration') or data.get('format', {}).get('duration') or 0.0)
+    subtype = stream.get('codec_name', 'unknown')
+    if stream.get('sample_fmt'):
+        subtype = f"{subtype} ({stream['sample_fmt']})"
+
+    return {
+        'duration': duration,
+        'sample_rate': sample_rate,
+        'channels': int(stream.get('channels', 0)),
+        'subtype': subtype,
+        'frames': int(round(duration * sample_rate)),
+    }
+
+
+def probe_audio(file_path):
+    """
+    Get audio metadata from file headers only.
+
+    Args:
+        file_path (str): Path to the audio file
+
+    Returns:
+        dict: duration, sample_rate, channels, subtype and frames
+    """
+    if not Path(file_path).exists():
+        raise FileNotFoundError(f"Input file not found: {file_path}")
+
+    try:
+        return _probe_soundfile(file_path)
+    except RuntimeError:
+        # sf.LibsndfileError (a RuntimeError) means libsndfile cannot parse it
+        try:
+            return _probe_ffprobe(file_path)
+        except FileNotFoundError:
+            raise ValueError(f"Unsupported audio format and ffprobe is not available: {file_path}")
+
+
+def probe_audio_batch(file_paths, max_workers=DEFAULT_PROBE_WORKERS):
+    """
+    Probe many files concurrently.
+
+    Returns:
+        dict: Maps each path to its metadata, or to None if it could not be read
+    """
+    file_paths = [str(p) for p in file_paths]
+
+    def probe_or_none(file_path):
+        try:
+            return probe_audio(file_path)
+        except (OSError, ValueError) as e:
+            print(f"Error getting audio info for {file_path}: {e}")
+            return None
+
+    workers = max(1, min(max_workers, len(file_paths), (os.cpu_count() or 1) * 4))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(file_paths, executor.map(probe_or_none, file_paths)))
@@ -5,19 +5,29 @@ import numpy as np
 import argparse
 import sys
 from pathlib import Path
+from audio_info import probe_audio, probe_audio_batch
+from spectral import DEFAULT_STFT_BLOCK_FRAMES, hpss, hpss_select, normalize_peak
+from precision import PRECISIONS, float_dtype, get_precision, set_precision
+from result_cache import cached_split, set_cache_enabled
+from warmup import configure_jit_cache
+
+# Keep librosa's compiled kernels on disk between runs
+configure_jit_cache()
 
 class AudioSplitter:
     def __init__(self):
         """Initialize the audio splitter with librosa-based separation."""
         print("✓ Audio splitter initialized (using librosa)")
     
-    def split_audio(self, input_path, output_dir=None):
+    @cached_split('hpss')
+    def split_audio(self, input_path, output_dir=None, block_frames=DEFAULT_STFT_BLOCK_FRAMES):
         """
         Split audio file into vocal and instrumental tracks using librosa.
         
         Args:
             input_path (str): Path to the input audio file
             output_dir (str): Directory to save output files (optional)
+            block_frames (int): STFT frames processed per block by HPSS
         
         Returns:
             tuple: Paths to vocal and instrumental files
@@ -41,7 +51,7 @@ class AudioSplitter:
             
             # Load audio file
             print("📖 Loading audio file...")
-            y, sr = librosa.load(str(input_path), sr=None, mono=False)
+            y, sr = librosa.load(str(input_path), sr=None, mono=False, dtype=float_dtype())
             
             print("🔧 Separating audio sources...")
             
@@ -61,9 +71,13 @@ class AudioSplitter:
                 vocals = librosa.effects.preemphasis(center)
                 instrumental = sides
                 
-                # Apply harmonic-percussive separation for better results
-                vocals_harmonic, _ = librosa.effects.hpss(vocals)
-                _, instrumental_percussive = librosa.effects.hpss(instrumental)
+                # Apply harmonic-percussive separation for better results.
+                # Both signals share one batched STFT/HPSS pass, and only the
+                # harmonic vocal and percussive instrumental parts are inverted.
+                vocals_harmonic, instrumental_percussive = hpss_select(
+                    np.stack([vocals, instrumental]), ('harmonic', 'percussive'),
+                    block_frames=block_frames
+                )
                 
                 # Combine for final result
                 vocals = vocals_harmonic * 0.7 + vocals * 0.3
@@ -71,14 +85,14 @@ class AudioSplitter:
                 
             else:
                 # Mono file - use harmonic-percussive separation
-                vocals, instrumental = librosa.effects.hpss(y)
+                vocals, instrumental = hpss(y, block_frames=block_frames)
                 
                 # Apply additional filtering
                 vocals = librosa.effects.preemphasis(vocals)
             
-            # Normalize audio
-            vocals = librosa.util.normalize(vocals)
-            instrumental = librosa.util.normalize(instrumental)
+            # Normalize audio (in place, keeping the working dtype)
+            vocals = normalize_peak(vocals)
+            instrumental = normalize_peak(instrumental)
             
             # Apply noise gate to reduce artifacts
             vocals = self._apply_noise_gate(vocals, threshold=0.01)
@@ -104,53 +118,65 @@ class AudioSplitter:
             raise e
     
     def _apply_noise_gate(self, audio, threshold=0.01):
-        """Apply a simple noise gate to reduce low-level noise."""
-        gate = np.abs(audio) > threshold
-        return audio * gate
+        """Apply a simple noise gate to reduce low-level noise (modifies ``audio`` in place)."""
+        audio[np.abs(audio) <= threshold] = 0
+        return audio
     
     def get_audio_info(self, file_path):
-        """Get basic information about an audio file."""
+        """Get basic information about an audio file from its headers (no decoding)."""
         try:
-            audio, sr = librosa.load(file_path, sr=None)
-            duration = len(audio) / sr
-            
-            return {
-                'duration': duration,
-                'sample_rate': sr,
-                'channels': 1 if len(audio.shape) == 1 else audio.shape[0],
-                'samples': len(audio)
-            }
-        except (OSError, ValueError, librosa.util.exceptions.ParameterError) as e:
+            info = probe_audio(file_path)
+            # 'samples' is kept for callers of the old librosa-based result
+            info['samples'] = info['frames']
+            return info
+        except (OSError, ValueError) as e:
             print(f"Error getting audio info: {e}")
             return None
+    
+    def get_audio_info_batch(self, file_paths):
+        """Get header information for many files concurrently (None for unreadable files)."""
+        results = probe_audio_batch(file_paths)
+        for info in results.values():
+            if info:
+                info['samples'] = info['frames']
+        return results
 
 def main():
     """Command line interface for audio splitting."""
     parser = argparse.ArgumentParser(description='Split audio into vocal and instrumental tracks')
-    parser.add_argument('--input', '-i', required=True, help='Input audio file path')
+    parser.add_argument('--input', '-i', required=True, nargs='+', help='Input audio file path(s)')
     parser.add_argument('--output', '-o', help='Output directory (optional)')
     parser.add_argument('--info', action='store_true', help='Show audio file information')
+    parser.add_argument('--precision', choices=list(PRECISIONS), default=get_precision(),
+                       help='Floating-point precision for processing (default: float32)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Always recompute instead of reusing cached results')
     
     args = parser.parse_args()
+    set_cache_enabled(not args.no_cache)
+    set_precision(args.precision)
     
     try:
         splitter = AudioSplitter()
         
         if args.info:
-            info = splitter.get_audio_info(args.input)
-            if info:
-                print("\n📊 Audio Information:")
-                print(f"   Duration: {info['duration']:.2f} seconds")
-                print(f"   Sample Rate: {info['sample_rate']} Hz")
-                print(f"   Channels: {info['channels']}")
-                print(f"   Total Samples: {info['samples']}")
-        
-        vocal_path, instrumental_path = splitter.split_audio(args.input, args.output)
+            # Headers of all inputs are probed concurrently
+            for input_path, info in splitter.get_audio_info_batch(args.input).items():
+                if info:
+                    print(f"\n📊 Audio Information: {Path(input_path).name}")
+                    print(f"   Duration: {info['duration']:.2f} seconds")
+                    print(f"   Sample Rate: {info['sample_rate']} Hz")
+                    print(f"   Channels: {info['channels']}")
+                    print(f"   Subtype: {info['subtype']}")
+                    print(f"   Total Samples: {info['samples']}")
         
-        print("\n🎉 Audio splitting completed successfully!")
-        print("📂 Files created:")
-        print(f"   🎤 Vocals: {vocal_path}")
-        print(f"   🎸 Instrumental: {instrumental_path}")
+        for input_path in args.input:
+            vocal_path, instrumental_path = splitter.split_audio(input_path, args.output)
+            
+            print("\n🎉 Audio splitting completed successfully!")
+            print("📂 Files created:")
+            print(f"   🎤 Vocals: {vocal_path}")
+            print(f"   🎸 Instrumental: {instrumental_path}")
         
     except (FileNotFoundError, ValueError, OSError) as e:
         print(f"\n❌ Error: {e}")
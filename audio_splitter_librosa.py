@@ -5,6 +5,18 @@ import numpy as np
 import argparse
 import sys
 from pathlib import Path
+from audio_info import probe_audio, probe_audio_batch
+from checkpoint import open_checkpoint, run_blocks
+from pcm_stream import load_audio
+from spectral import (DEFAULT_STFT_BLOCK_FRAMES, SpectralMasker, hpss, iter_stft_blocks, normalize_peak,
+                      process_stft, trim_silence)
+from precision import PRECISIONS, float_dtype, get_precision, set_precision
+from result_cache import cached_split, set_cache_enabled
+from stages import Stages
+from warmup import configure_jit_cache
+
+# Keep librosa's compiled kernels on disk between runs
+configure_jit_cache()
 
 # Handle Python 3.13+ compatibility issues
 import warnings
@@ -15,13 +27,17 @@ class AudioSplitter:
         """Initialize the audio splitter with librosa-based separation."""
         print("✓ Audio splitter initialized with librosa")
     
-    def split_audio(self, input_path, output_dir=None):
+    @cached_split('librosa')
+    def split_audio(self, input_path, output_dir=None, block_frames=DEFAULT_STFT_BLOCK_FRAMES,
+                    sample_rate=None):
         """
         Split audio file into vocal and instrumental tracks using librosa.
         
         Args:
             input_path (str): Path to the input audio file
             output_dir (str): Directory to save output files (optional)
+            block_frames (int): STFT frames processed per block
+            sample_rate (int): Rate to decode at (default: the file's own rate)
         
         Returns:
             tuple: Paths to vocal and instrumental files
@@ -35,53 +51,48 @@ class AudioSplitter:
             # Set output directory
             if output_dir is None:
                 output_dir = input_path.parent / "split_output"
-            else:
-                output_dir = Path(output_dir)
-            
-            output_dir.mkdir(exist_ok=True)
             
             print(f"🎵 Processing: {input_path.name}")
-            print(f"📁 Output directory: {output_dir}")
             
             # Load audio file
             print("📖 Loading audio file...")
-            y, sr = librosa.load(str(input_path), sr=None)
+            y, sr = load_audio(input_path, sample_rate)
             
-            print("🔧 Separating audio sources...")
+            return self.split_signal(y, sr, input_path.stem, output_dir, block_frames)
             
-            # Use librosa's harmonic-percussive separation
-            # This separates harmonic (tonal) and percussive components
-            y_harmonic, y_percussive = librosa.effects.hpss(y)
+        except Exception as e:
+            print(f"✗ Error during audio splitting: {e}")
+            raise e
+    
+    def split_signal(self, y, sr, base_name, output_dir, block_frames=DEFAULT_STFT_BLOCK_FRAMES):
+        """
+        Split an already decoded mono signal and save the tracks.
+        
+        Args:
+            y (np.ndarray): Mono signal, as returned by ``librosa.load``
+            sr (int): Sample rate
+            base_name (str): Name the output files start with
+            output_dir (str): Directory to save output files
+            block_frames (int): STFT frames processed per block
+        
+        Returns:
+            tuple: Paths to vocal and instrumental files
+        """
+        try:
+            output_dir = Path(output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            print(f"📁 Output directory: {output_dir}")
             
-            # Use spectral centroid-based separation for vocals
-            # Convert to stereo if mono
-            if len(y.shape) == 1:
-                y_stereo = np.stack([y, y])
-            else:
-                y_stereo = y
-            
-            # Use center channel extraction (simple vocal isolation)
-            # This works best with stereo recordings where vocals are centered
-            if len(y_stereo.shape) > 1 and y_stereo.shape[0] >= 2:
-                # Center channel (vocals) - subtract sides
-                center = y_stereo[0] - y_stereo[1]
-                # Sides (instrumental) - add channels
-                sides = (y_stereo[0] + y_stereo[1]) / 2
-                
-                # Apply some smoothing
-                vocals = librosa.effects.preemphasis(center)
-                instrumental = sides
-            else:
-                # Fallback for mono files - use harmonic separation
-                vocals = y_harmonic
-                instrumental = y_percussive
+            y = np.asarray(y, dtype=float_dtype())
+            
+            print("🔧 Separating audio sources...")
             
-            # Apply some noise reduction
-            vocals = librosa.effects.trim(vocals, top_db=20)[0]
-            instrumental = librosa.effects.trim(instrumental, top_db=20)[0]
+            # Stages run only when the tracks being saved need them
+            stages = self.separation_stages(y, block_frames)
+            vocals = stages['vocals_trimmed']
+            instrumental = stages['instrumental_trimmed']
             
             # Generate output filenames
-            base_name = input_path.stem
             vocal_path = output_dir / f"{base_name}_vocals.wav"
             instrumental_path = output_dir / f"{base_name}_instrumental.wav"
             
@@ -99,10 +110,61 @@ class AudioSplitter:
             print(f"✗ Error during audio splitting: {e}")
             raise e
     
-    def split_audio_advanced(self, input_path, output_dir=None):
+    def separation_stages(self, y, block_frames=DEFAULT_STFT_BLOCK_FRAMES):
+        """
+        The separation of ``split_signal`` as lazily evaluated stages.
+        
+        The vocal and instrumental tracks come from center channel extraction
+        when there are two channels (a mono signal counts as two identical
+        ones) and from harmonic-percussive separation otherwise, so HPSS only
+        runs for single-channel 2-D input.
+        
+        Returns:
+            Stages: With ``vocals_trimmed`` and ``instrumental_trimmed`` outputs
+        """
+        stages = Stages(signal=y)
+        
+        # Convert to stereo if mono
+        def channels(s):
+            y = s['signal']
+            return (y, y) if y.ndim == 1 else y
+        
+        def stereo(s):
+            return len(s['channels']) >= 2
+        
+        # Use librosa's harmonic-percussive separation
+        # This separates harmonic (tonal) and percussive components
+        stages.add('channels', channels)
+        stages.add('hpss', lambda s: hpss(s['signal'], block_frames=block_frames))
+        
+        # Use center channel extraction (simple vocal isolation)
+        # This works best with stereo recordings where vocals are centered:
+        # center (vocals) subtracts the sides, sides (instrumental) add channels
+        stages.add('center', lambda s: s['channels'][0] - s['channels'][1])
+        stages.add('sides', lambda s: (s['channels'][0] + s['channels'][1]) / 2)
+        
+        # Apply some smoothing; fallback for mono files - use harmonic separation
+        stages.add('vocals', lambda s: librosa.effects.preemphasis(s['center']) if stereo(s) else s['hpss'][0])
+        stages.add('instrumental', lambda s: s['sides'] if stereo(s) else s['hpss'][1])
+        
+        # Apply some noise reduction (same bounds as librosa.effects.trim,
+        # scanning in from the edges instead of framing the whole signal)
+        stages.add('vocals_trimmed', lambda s: trim_silence(s['vocals'], top_db=20)[0])
+        stages.add('instrumental_trimmed', lambda s: trim_silence(s['instrumental'], top_db=20)[0])
+        return stages
+    
+    @cached_split('advanced', suffix='_advanced')
+    def split_audio_advanced(self, input_path, output_dir=None, block_frames=DEFAULT_STFT_BLOCK_FRAMES,
+                             checkpoint=None):
         """
         Advanced audio separation using STFT and masking.
+        
+        The spectrogram is processed in blocks of ``block_frames`` STFT
+        frames; the result is the same as processing the whole file at once.
+        Long inputs (or any, with ``checkpoint=True``) are checkpointed block
+        by block, so an interrupted split resumes where it stopped.
         """
+        saved = None
         try:
             input_path = Path(input_path)
             
@@ -119,38 +181,25 @@ class AudioSplitter:
             print(f"🎵 Processing (Advanced): {input_path.name}")
             
             # Load audio
-            y, sr = librosa.load(str(input_path), sr=None)
-            
-            # Compute STFT
-            S = librosa.stft(y)
-            magnitude = np.abs(S)
-            phase = np.angle(S)
-            
-            # Create masks for separation
-            # Vocal mask: emphasize center frequencies and reduce sides
-            vocal_mask = np.ones_like(magnitude)
-            instrumental_mask = np.ones_like(magnitude)
-            
-            # Simple frequency-based separation
-            # Vocals typically in mid-range frequencies (300-3000 Hz)
-            freqs = librosa.fft_frequencies(sr=sr)
-            vocal_freq_range = (freqs >= 300) & (freqs <= 3000)
-            
-            # Enhance vocals in vocal frequency range
-            vocal_mask[vocal_freq_range] *= 1.5
-            instrumental_mask[vocal_freq_range] *= 0.3
-            
-            # Apply masks
-            S_vocals = magnitude * vocal_mask * np.exp(1j * phase)
-            S_instrumental = magnitude * instrumental_mask * np.exp(1j * phase)
-            
-            # Convert back to time domain
-            vocals = librosa.istft(S_vocals)
-            instrumental = librosa.istft(S_instrumental)
+            y, sr = librosa.load(str(input_path), sr=None, dtype=float_dtype())
+            
+            # STFT, masking and ISTFT run block by block with overlap-add, so
+            # only block_frames frames of spectrogram are in memory at once.
+            # The per-bin gains are broadcast straight onto the complex STFT.
+            masker = SpectralMasker(self._frequency_gains(sr))
+            saved = open_checkpoint(checkpoint, input_path, 'advanced', len(y) / sr,
+                                    {'precision': get_precision(), 'block_frames': block_frames})
+            if saved is None:
+                vocals, instrumental = process_stft(y, masker, block_frames)
+            else:
+                stems = run_blocks(saved, 'stems', (2, len(y)), float_dtype(),
+                                   lambda state: iter_stft_blocks(y, masker, block_frames, state=state))
+                # An in-memory copy, normalised below; the checkpoint keeps the raw stems
+                vocals, instrumental = stems
             
-            # Normalize
-            vocals = librosa.util.normalize(vocals)
-            instrumental = librosa.util.normalize(instrumental)
+            # Normalize (in place, keeping the working dtype)
+            vocals = normalize_peak(vocals)
+            instrumental = normalize_peak(instrumental)
             
             # Save files
             base_name = input_path.stem
@@ -159,6 +208,8 @@ class AudioSplitter:
             
             sf.write(str(vocal_path), vocals, sr)
             sf.write(str(instrumental_path), instrumental, sr)
+            if saved is not None:
+                saved.remove()
             
             print(f"✓ Advanced vocal track saved: {vocal_path}")
             print(f"✓ Advanced instrumental track saved: {instrumental_path}")
@@ -168,54 +219,83 @@ class AudioSplitter:
         except Exception as e:
             print(f"✗ Error during advanced audio splitting: {e}")
             raise e
+        finally:
+            if saved is not None:
+                # Unlocks an interrupted split's checkpoint so a retry can resume it
+                saved.close()
+    
+    def _frequency_gains(self, sr):
+        """Per-bin vocal and instrumental gains for the advanced separation."""
+        # Simple frequency-based separation
+        # Vocals typically in mid-range frequencies (300-3000 Hz)
+        freqs = librosa.fft_frequencies(sr=sr)
+        vocal_freq_range = (freqs >= 300) & (freqs <= 3000)
+        
+        # Enhance vocals in vocal frequency range, reduce them in the instrumental
+        gains = np.ones((2, len(freqs)), dtype=float_dtype())
+        gains[0, vocal_freq_range] = 1.5
+        gains[1, vocal_freq_range] = 0.3
+        return gains
     
     def get_audio_info(self, file_path):
-        """Get basic information about an audio file."""
+        """Get basic information about an audio file from its headers (no decoding)."""
         try:
-            audio, sr = librosa.load(file_path, sr=None)
-            duration = len(audio) / sr
-            
-            return {
-                'duration': duration,
-                'sample_rate': sr,
-                'channels': 1 if len(audio.shape) == 1 else audio.shape[0],
-                'samples': len(audio)
-            }
-        except Exception as e:
+            info = probe_audio(file_path)
+            # 'samples' is kept for callers of the old librosa-based result
+            info['samples'] = info['frames']
+            return info
+        except (OSError, ValueError) as e:
             print(f"Error getting audio info: {e}")
             return None
+    
+    def get_audio_info_batch(self, file_paths):
+        """Get header information for many files concurrently (None for unreadable files)."""
+        results = probe_audio_batch(file_paths)
+        for info in results.values():
+            if info:
+                info['samples'] = info['frames']
+        return results
 
 def main():
     """Command line interface for audio splitting."""
     parser = argparse.ArgumentParser(description='Split audio into vocal and instrumental tracks')
-    parser.add_argument('--input', '-i', required=True, help='Input audio file path')
+    parser.add_argument('--input', '-i', required=True, nargs='+', help='Input audio file path(s)')
     parser.add_argument('--output', '-o', help='Output directory (optional)')
     parser.add_argument('--info', action='store_true', help='Show audio file information')
+    parser.add_argument('--precision', choices=list(PRECISIONS), default=get_precision(),
+                       help='Floating-point precision for processing (default: float32)')
     parser.add_argument('--advanced', action='store_true', help='Use advanced separation method')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Always recompute instead of reusing cached results')
     
     args = parser.parse_args()
+    set_cache_enabled(not args.no_cache)
+    set_precision(args.precision)
     
     try:
         splitter = AudioSplitter()
         
         if args.info:
-            info = splitter.get_audio_info(args.input)
-            if info:
-                print(f"\n📊 Audio Information:")
-                print(f"   Duration: {info['duration']:.2f} seconds")
-                print(f"   Sample Rate: {info['sample_rate']} Hz")
-                print(f"   Channels: {info['channels']}")
-                print(f"   Total Samples: {info['samples']}")
-        
-        if args.advanced:
-            vocal_path, instrumental_path = splitter.split_audio_advanced(args.input, args.output)
-        else:
-            vocal_path, instrumental_path = splitter.split_audio(args.input, args.output)
-        
-        print(f"\n🎉 Audio splitting completed successfully!")
-        print(f"📂 Files created:")
-        print(f"   🎤 Vocals: {vocal_path}")
-        print(f"   🎸 Instrumental: {instrumental_path}")
+            # Headers of all inputs are probed concurrently
+            for input_path, info in splitter.get_audio_info_batch(args.input).items():
+                if info:
+                    print(f"\n📊 Audio Information: {Path(input_path).name}")
+                    print(f"   Duration: {info['duration']:.2f} seconds")
+                    print(f"   Sample Rate: {info['sample_rate']} Hz")
+                    print(f"   Channels: {info['channels']}")
+                    print(f"   Subtype: {info['subtype']}")
+                    print(f"   Total Samples: {info['samples']}")
+        
+        for input_path in args.input:
+            if args.advanced:
+                vocal_path, instrumental_path = splitter.split_audio_advanced(input_path, args.output)
+            else:
+                vocal_path, instrumental_path = splitter.split_audio(input_path, args.output)
+            
+            print(f"\n🎉 Audio splitting completed successfully!")
+            print(f"📂 Files created:")
+            print(f"   🎤 Vocals: {vocal_path}")
+            print(f"   🎸 Instrumental: {instrumental_path}")
         
         print(f"\n💡 Note: This uses librosa-based separation.")
         print(f"   For better results, consider using AI-based tools like:")
@@ -0,0 +1,339 @@
+"""
+Parallel batch splitting on a process pool
+
+Each file is split in a worker process by one of the splitter engines.
+Results are reported per file as they finish, and a failing file does not
+stop the rest of the batch.
+"""
+
+import os
+import csv
+import glob
+import json
+import time
+import importlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# Engine name -> (module, class, split method)
+ENGINES = {
+    'librosa': ('audio_splitter_librosa', 'AudioSplitter', 'split_audio'),
+    'advanced': ('audio_splitter_librosa', 'AudioSplitter', 'split_audio_advanced'),
+    'hpss': ('audio_splitter', 'AudioSplitter', 'split_audio'),
+    'enhanced': ('enhanced_audio_splitter', 'EnhancedAudioSplitter', 'split_audio_enhanced'),
+    'simple': ('simple_audio_splitter', 'SimpleAudioSplitter', 'split_audio_simple'),
+}
+
+# Files picked up when a directory is given as input
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.flac', '.m4a', '.ogg', '.aac', '.opus')
+
+# Per-file fields written to CSV manifests
+MANIFEST_FIELDS = ('input', 'engine', 'status', 'vocals', 'instrumental',
+                   'seconds', 'duration', 'error')
+
+# One splitter instance per engine per worker process
+_splitters = {}
+
+
+def default_workers():
+    """Number of worker processes to use when none is configured."""
+    return max(1, os.cpu_count() or 1)
+
+
+def process_pool(workers):
+    """
+    A process pool whose workers use this process's precision policy.
+
+    Spawned workers import precision afresh, so without this a policy set
+    with set_precision() (rather than the environment) would not reach them.
+    """
+    from precision import get_precision, set_precision
+    return ProcessPoolExecutor(max_workers=workers, initializer=set_precision,
+                               initargs=(get_precision(),))
+
+
+def collect_inputs(paths, file_list=None, recursive=False):
+    """
+    Expand directories, glob patterns and file lists into audio file paths.
+
+    Args:
+        paths (list): Files, directories or glob patterns ('**' matches subdirectories)
+        file_list (str): Optional text file with one path per line ('#' starts a comment)
+        recursive (bool): Also search subdirectories of directory inputs
+
+    Returns:
+        tuple: (files, missing) - unique files in input order, and inputs that matched nothing
+    """
+    paths = list(paths or [])
+    if file_list:
+        with open(file_list, encoding='utf-8') as f:
+            paths.extend(line.strip() for line in f
+                         if line.strip() and not line.lstrip().startswith('#'))
+
+    files, missing, seen = [], [], set()
+
+    def add(file_path):
+        key = os.path.abspath(file_path)
+        if key not in seen:
+            seen.add(key)
+            files.append(str(file_path))
+
+    for path in paths:
+        if os.path.isdir(path):
+            pattern = '**/*' if recursive else '*'
+            matches = sorted(p for p in Path(path).glob(pattern)
+                             if p.is_file() and p.suffix.lower() in AUDIO_EXTENSIONS)
+        elif os.path.isfile(path):
+            matches = [path]
+        else:
+            matches = sorted(p for p in glob.glob(path, recursive=True) if os.path.isfile(p))
+
+        if not matches:
+            missing.append(path)
+        for match in matches:
+            add(match)
+
+    return files, missing
+
+
+def output_dirs(files, output_dir=None):
+    """
+    Output directory for each input, checked so no two inputs write the same stems.
+
+    With ``output_dir``, each input's directory relative to the inputs'
+    common parent is mirrored under it (a/song.wav and b/song.wav go to
+    out/a and out/b; files from one directory go straight into out).
+    Without it, every input keeps the engine default (None), ``split_output``
+    next to the input.
+
+    Returns:
+        list: Output directory (or None) per input, in input order
+
+    Raises:
+        ValueError: If two inputs would still write the same stems
+            (e.g. song.wav and song.mp3 from one directory)
+    """
+    parents = [os.path.dirname(os.path.abspath(f)) for f in files]
+    if output_dir is None:
+        dirs = [None] * len(files)
+        targets = [os.path.join(parent, 'split_output') for parent in parents]
+    else:
+        try:
+            common = os.path.commonpath(parents) if parents else ''
+        except ValueError:
+            # Inputs on different drives share no parent; mirror their full paths
+            common = None
+        dirs = []
+        for parent in parents:
+            if common is None:
+                drive, rest = os.path.splitdrive(parent)
+                relative = os.path.join(drive.rstrip(':'), rest.lstrip('\\/'))
+            else:
+                relative = os.path.relpath(parent, common)
+            dirs.append(os.path.normpath(os.path.join(output_dir, relative)))
+        targets = dirs
+
+    owners = {}
+    clashes = []
+    for input_path, target in zip(files, targets):
+        key = (os.path.normcase(os.path.abspath(target)), os.path.normcase(Path(input_path).stem))
+        if key in owners:
+            clashes.append(f"{owners[key]} and {input_path}")
+        else:
+            owners[key] = input_path
+    if clashes:
+        raise ValueError("These inputs would overwrite each other's stems: " + '; '.join(clashes))
+    return dirs
+
+
+def write_manifest(results, manifest_path, fields=MANIFEST_FIELDS, **details):
+    """
+    Write batch results to a JSON or CSV manifest (chosen by file extension).
+
+    JSON manifests also record ``details`` (e.g. engine and worker count)
+    and a summary; CSV manifests hold one row per file with ``fields`` as columns.
+    """
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if manifest_path.suffix.lower() == '.csv':
+        with open(manifest_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        failed = sum(1 for r in results if r['status'] != 'done')
+        manifest = dict(details)
+        manifest['summary'] = {'total': len(results), 'done': len(results) - failed, 'failed': failed}
+        manifest['files'] = results
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+    return str(manifest_path)
+
+
+def get_splitter(engine):
+    """Create (once per process) the splitter instance for an engine name."""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine} (choose from {', '.join(ENGINES)})")
+    if engine not in _splitters:
+        module_name, class_name, _ = ENGINES[engine]
+        module = importlib.import_module(module_name)
+        _splitters[engine] = getattr(module, class_name)()
+    return _splitters[engine]
+
+
+def audio_duration(file_path):
+    """Duration of a file in seconds from its headers, or None if it cannot be read."""
+    try:
+        from audio_info import probe_audio
+        return probe_audio(file_path)['duration']
+    except (ImportError, OSError, ValueError):
+        return None
+
+
+def split_file(engine, input_path, output_dir=None, use_cache=None):
+    """
+    Split one file with the given engine; runs inside a worker process.
+
+    Returns:
+        dict: input, status ('done' or 'failed'), vocals, instrumental,
+        seconds (wall time), duration (audio seconds) and error
+    """
+    result = {
+        'input': str(input_path),
+        'engine': engine,
+        'status': 'failed',
+        'vocals': None,
+        'instrumental': None,
+        'seconds': 0.0,
+        'duration': audio_duration(input_path),
+        'error': None,
+    }
+
+    start = time.perf_counter()
+    try:
+        splitter = get_splitter(engine)
+        split = getattr(splitter, ENGINES[engine][2])
+        if output_dir:
+            # Mirrored subdirectories of a batch's output directory
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
+        result['vocals'], result['instrumental'] = split(str(input_path), output_dir,
+                                                         use_cache=use_cache)
+        result['status'] = 'done'
+    except Exception as e:
+        # Reported per file; the batch carries on
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - start
+
+    return result
+
+
+class BatchProgress:
+    """Running totals for a batch, including throughput."""
+
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+        self.audio_seconds = 0.0
+        self.start = time.perf_counter()
+
+    def update(self, result, skipped=False):
+        """Count a result; ``skipped`` ones finished earlier and are left out of the rates."""
+        if result['status'] == 'done':
+            self.done += 1
+            if not skipped:
+                self.audio_seconds += result['duration'] or 0.0
+        else:
+            self.failed += 1
+        if skipped:
+            self.skipped += 1
+
+    @property
+    def finished(self):
+        return self.done + self.failed
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    @property
+    def files_per_minute(self):
+        return 60.0 * (self.finished - self.skipped) / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def realtime_factor(self):
+        """Seconds of audio split per second of wall time."""
+        return self.audio_seconds / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self):
+        skipped = f", {self.skipped} from an earlier run" if self.skipped else ''
+        return (f"{self.finished}/{self.total} files  ({self.failed} failed{skipped})  "
+                f"{self.files_per_minute:.1f} files/min  {self.realtime_factor:.1f}x realtime")
+
+
+def run_batch(files, engine, output_dir=None, workers=None, on_start=None, on_result=None,
+              use_cache=None, job_store=None, retry_failed=False, batch_id=None):
+    """
+    Split files in parallel on a process pool.
+
+    Args:
+        files (list): Input file paths
+        engine (str): Engine name from ENGINES
+        output_dir (str): Output directory, mirroring the inputs' subdirectories
+            (see output_dirs; default: next to each input)
+        workers (int): Worker processes (default: one per CPU)
+        on_start (callable): Called with each input path when it is submitted
+        on_result (callable): Called with (result, progress) as each file finishes
+        use_cache (bool): Reuse cached stems for inputs that were already split,
+            so re-running a partly finished batch skips the completed files
+            (default: the result cache's process-wide setting)
+        job_store (str): SQLite job store that keeps every file's state, so an
+            interrupted batch resumes where it stopped (see job_store.py)
+        retry_failed (bool): With a job store, retry files that failed before
+        batch_id (str): With a job store, the batch to run or resume (default:
+            one per engine and output directory)
+
+    Returns:
+        list: Result dicts in input order
+
+    Raises:
+        ValueError: For an unknown engine, or inputs that would overwrite each other's stems
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine} (choose from {', '.join(ENGINES)})")
+    if job_store:
+        from job_store import run_stored_batch
+        return run_stored_batch(job_store, files, engine, output_dir, workers, on_start,
+                                on_result, use_cache, batch=batch_id, retry_failed=retry_failed)
+
+    files = [str(Path(f)) for f in files]
+    directories = output_dirs(files, output_dir)
+    progress = BatchProgress(len(files))
+    results = {}
+    workers = max(1, min(workers or default_workers(), len(files) or 1))
+
+    with process_pool(workers) as executor:
+        futures = {}
+        for input_path, directory in zip(files, directories):
+            futures[executor.submit(split_file, engine, input_path, directory, use_cache)] = input_path
+            if on_start:
+                on_start(input_path)
+
+        for future in as_completed(futures):
+            input_path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker itself died (e.g. killed by the OS)
+                result = {'input': input_path, 'engine': engine, 'status': 'failed',
+                          'vocals': None, 'instrumental': None, 'seconds': 0.0,
+                          'duration': None, 'error': f"{type(e).__name__}: {e}"}
+            results[input_path] = result
+            progress.update(result)
+            if on_result:
+                on_result(result, progress)
+
+    return [results[f] for f in files]
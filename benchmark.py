@@ -0,0 +1,816 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for the Music Splitter processing engines
+
+Usage:
+    python benchmark.py                         # Run all benchmarks
+    python benchmark.py simple-memory           # Run a single benchmark
+    python benchmark.py simple-memory --minutes 5 60 300
+    python benchmark.py stereo-hpss --seconds 120
+    python benchmark.py multi-download --files 16
+    python benchmark.py download-profile --minutes 5
+    python benchmark.py startup
+    python benchmark.py first-result --seconds 30
+    python benchmark.py daemon --seconds 30
+    python benchmark.py http-api --files 64 --workers 4
+"""
+
+import os
+import sys
+import argparse
+import functools
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add the current directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+def create_test_wav(path, minutes, sample_rate=44100, block_seconds=10):
+    """Write a synthetic stereo 16-bit WAV file block by block."""
+    import numpy as np
+
+    total_frames = int(minutes * 60 * sample_rate)
+    block_frames = block_seconds * sample_rate
+    rng = np.random.default_rng(0)
+
+    with wave.open(str(path), 'w') as wav_file:
+        wav_file.setnchannels(2)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+
+        written = 0
+        while written < total_frames:
+            n = min(block_frames, total_frames - written)
+            t = (np.arange(n) + written) / sample_rate
+            voice = 0.3 * np.sin(2 * np.pi * 440 * t)
+            left = voice + 0.1 * rng.standard_normal(n)
+            right = voice + 0.1 * rng.standard_normal(n)
+            stereo = np.column_stack((left, right)) * 32767 * 0.5
+            wav_file.writeframes(stereo.astype(np.int16).tobytes())
+            written += n
+
+    return path
+
+
+class MediaServer:
+    """
+    Local HTTP server for media files, standing in for a remote host.
+
+    Each request waits ``latency`` seconds before answering and bodies are
+    sent at up to ``bandwidth`` bytes per second per connection. The server
+    counts requests and the most connections it served at once.
+
+    Usage:
+        with MediaServer(directory, latency=0.1) as server:
+            url = f"{server.url}/song.wav"
+    """
+
+    def __init__(self, directory, latency=0.0, bandwidth=None):
+        self.directory = str(directory)
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self._httpd = None
+
+    def _handler(self):
+        server = self
+
+        class Handler(SimpleHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                try:
+                    time.sleep(server.latency)
+                    super().do_GET()
+                finally:
+                    with server._lock:
+                        server.active -= 1
+
+            def copyfile(self, source, outputfile):
+                try:
+                    if not server.bandwidth:
+                        return super().copyfile(source, outputfile)
+                    chunk = max(1, int(server.bandwidth // 20))
+                    for data in iter(lambda: source.read(chunk), b''):
+                        outputfile.write(data)
+                        time.sleep(len(data) / server.bandwidth)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Clients may hang up early, e.g. after probing the content type
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return functools.partial(Handler, directory=self.directory)
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        return False
+
+
+def run_isolated(code):
+    """
+    Run a snippet in a fresh interpreter and return (seconds, peak RSS in MB).
+
+    The result cache is disabled in the child, so repeated runs measure the
+    split itself rather than a cache hit and leave the user's cache alone.
+    Peak RSS needs the POSIX ``resource`` module; elsewhere it is NaN.
+    """
+    # ru_maxrss is reported in KB on Linux, so the child prints it itself
+    wrapper = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        f"{code}\n"
+        "elapsed = time.perf_counter() - start\n"
+        "try:\n"
+        "    import resource\n"
+        "    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+        "except ImportError:\n"
+        "    max_rss = 'nan'\n"
+        "print('BENCH', elapsed, max_rss)\n"
+    )
+    result = subprocess.run([sys.executable, '-c', wrapper], capture_output=True,
+                            text=True, cwd=str(Path(__file__).parent), check=True,
+                            env=dict(os.environ, MUSIC_SPLITTER_NO_CACHE='1'))
+    for line in result.stdout.splitlines():
+        if line.startswith('BENCH '):
+            _, elapsed, max_rss = line.split()
+            return float(elapsed), float(max_rss) / 1024
+    raise RuntimeError(f"Benchmark child produced no result:\n{result.stderr}")
+
+
+def bench_simple_memory(args):
+    """Peak RSS of SimpleAudioSplitter: streaming blocks vs whole-file loading."""
+    print("📊 SimpleAudioSplitter peak memory (streaming vs whole file)")
+    print(f"   {'minutes':>8} {'mode':>10} {'seconds':>9} {'peak MB':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for minutes in args.minutes:
+            wav_path = create_test_wav(tmp / f"bench_{minutes}.wav", minutes)
+            for mode, block_frames in (('streaming', 'DEFAULT_BLOCK_FRAMES'), ('whole', 'None')):
+                code = (
+                    "from simple_audio_splitter import SimpleAudioSplitter, DEFAULT_BLOCK_FRAMES\n"
+                    f"SimpleAudioSplitter().split_audio_simple(r'{wav_path}', r'{tmp / 'out'}', "
+                    f"block_frames={block_frames})"
+                )
+                elapsed, peak_mb = run_isolated(code)
+                print(f"   {minutes:>8} {mode:>10} {elapsed:>9.2f} {peak_mb:>9.1f}")
+            wav_path.unlink()
+
+
+def create_test_signal(seconds, sample_rate=44100, channels=2):
+    """Synthetic float32 signal of shape (channels, samples): a tone plus noise."""
+    import numpy as np
+
+    n = int(seconds * sample_rate)
+    t = np.arange(n) / sample_rate
+    rng = np.random.default_rng(0)
+    voice = 0.3 * np.sin(2 * np.pi * 440 * t)
+    return (voice + 0.1 * rng.standard_normal((channels, n))).astype(np.float32)
+
+
+def timed(func, *args, **kwargs):
+    """Call func and return (result, seconds)."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench_stereo_hpss(args):
+    """audio_splitter stereo HPSS: two librosa.effects.hpss calls vs one batched pass."""
+    import numpy as np
+    import librosa
+    from spectral import hpss_select
+
+    print(f"📊 Stereo HPSS on {args.seconds:.0f} s of audio")
+    y = create_test_signal(args.seconds)
+    vocals = librosa.effects.preemphasis((y[0] - y[1]) * 0.5)
+    instrumental = (y[0] + y[1]) * 0.5
+
+    # Warm up numba/FFT plans so neither side pays first-call costs
+    librosa.effects.hpss(vocals[:44100])
+    hpss_select(np.stack([vocals[:44100], instrumental[:44100]]), ('harmonic', 'percussive'))
+
+    def separate_passes():
+        vocals_harmonic, _ = librosa.effects.hpss(vocals)
+        _, instrumental_percussive = librosa.effects.hpss(instrumental)
+        return vocals_harmonic, instrumental_percussive
+
+    (ref_vocals, ref_inst), before = timed(separate_passes)
+    (new_vocals, new_inst), after = timed(hpss_select, np.stack([vocals, instrumental]),
+                                          ('harmonic', 'percussive'))
+
+    error = max(np.abs(new_vocals - ref_vocals).max(), np.abs(new_inst - ref_inst).max())
+    print(f"   Two hpss passes:   {before:.2f} s")
+    print(f"   Batched hpss pass: {after:.2f} s ({before / after:.1f}x)")
+    print(f"   Max abs difference: {error:.2e}")
+
+
+def bench_advanced_memory(args):
+    """Peak RSS of split_audio_advanced: block STFT engine vs one whole-file block."""
+    import soundfile as sf
+
+    print(f"📊 split_audio_advanced peak memory on {args.seconds:.0f} s of audio")
+    print(f"   {'mode':>10} {'seconds':>9} {'peak MB':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        wav_path = tmp / "bench_advanced.wav"
+        sf.write(str(wav_path), create_test_signal(args.seconds, channels=1)[0], 44100)
+
+        for mode, block_frames in (('blocks', 'DEFAULT_STFT_BLOCK_FRAMES'), ('whole', '10 ** 9')):
+            code = (
+                "from audio_splitter_librosa import AudioSplitter\n"
+                "from spectral import DEFAULT_STFT_BLOCK_FRAMES\n"
+                f"AudioSplitter().split_audio_advanced(r'{wav_path}', r'{tmp / 'out'}', "
+                f"block_frames={block_frames})"
+            )
+            elapsed, peak_mb = run_isolated(code)
+            print(f"   {mode:>10} {elapsed:>9.2f} {peak_mb:>9.1f}")
+
+
+def global_fft_spectral_subtraction(audio, noise_factor=0.5):
+    """The previous whole-signal FFT spectral subtraction, kept here as a reference."""
+    import numpy as np
+    from scipy.fft import fft, ifft
+
+    spectrum = fft(audio)
+    magnitude = np.abs(spectrum)
+    phase = np.angle(spectrum)
+
+    noise_start = magnitude[:len(magnitude)//10]
+    noise_end = magnitude[-len(magnitude)//10:]
+    noise_estimate = np.mean([np.mean(noise_start), np.mean(noise_end)])
+
+    clean_magnitude = magnitude - noise_factor * noise_estimate
+    clean_magnitude = np.maximum(clean_magnitude, 0.1 * magnitude)
+
+    clean_spectrum = clean_magnitude * np.exp(1j * phase)
+    return np.real(ifft(clean_spectrum)).astype(audio.dtype)
+
+
+def bench_spectral_subtraction(args):
+    """EnhancedAudioSplitter spectral subtraction: whole-signal FFT vs short-time frames."""
+    import tracemalloc
+    import numpy as np
+    from enhanced_audio_splitter import EnhancedAudioSplitter
+
+    splitter = EnhancedAudioSplitter()
+    methods = (
+        ('global FFT', global_fft_spectral_subtraction),
+        ('frames', splitter.apply_spectral_subtraction),
+    )
+
+    print("📊 Spectral subtraction (noise_factor=0.5)")
+    print(f"   {'seconds':>8} {'method':>11} {'time s':>8} {'peak MB':>9} {'SNR in':>7} {'SNR out':>8}")
+
+    sample_rate = 44100
+    for seconds in (args.seconds, args.seconds * 4):
+        # A tone that is switched on half of the time, buried in white noise
+        n = int(seconds * sample_rate)
+        t = np.arange(n) / sample_rate
+        clean = (0.3 * np.sin(2 * np.pi * 440 * t) * (np.sin(2 * np.pi * 0.25 * t) > 0)).astype(np.float32)
+        noisy = clean + (0.05 * np.random.default_rng(0).standard_normal(n)).astype(np.float32)
+
+        def snr(signal):
+            return 10 * np.log10(np.sum(clean ** 2) / np.sum((signal - clean) ** 2))
+
+        for name, method in methods:
+            tracemalloc.start()
+            result, elapsed = timed(method, noisy, noise_factor=0.5)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+            tracemalloc.stop()
+            print(f"   {seconds:>8.0f} {name:>11} {elapsed:>8.2f} {peak_mb:>9.1f} "
+                  f"{snr(noisy):>7.1f} {snr(result):>8.1f}")
+
+
+# Longest input librosa.effects.trim is run on (it frames the whole signal in memory)
+TRIM_REFERENCE_MAX_MINUTES = 60
+
+
+def bench_trim(args):
+    """librosa.effects.trim vs the edge-scanning trim_bounds on memory-mapped signals."""
+    import tracemalloc
+    import numpy as np
+    import librosa
+    from spectral import trim_bounds
+
+    print("📊 Silence trim (top_db=20) on a memory-mapped signal")
+    print(f"   {'minutes':>8} {'librosa s':>10} {'MB':>7} {'edge scan s':>12} {'MB':>5} {'same':>5}")
+
+    sample_rate = 44100
+    librosa.effects.trim(np.ones(sample_rate, dtype=np.float32), top_db=20)
+    trim_bounds(np.ones(sample_rate, dtype=np.float32), top_db=20)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for minutes in args.minutes:
+            # Noise with two seconds of near-silence at each end, written block by block
+            n = int(minutes * 60 * sample_rate)
+            path = Path(tmp) / 'trim.npy'
+            y = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=(n,))
+            rng = np.random.default_rng(0)
+            for i in range(0, n, 10 * sample_rate):
+                y[i:i + 10 * sample_rate] = 0.1 * rng.standard_normal(min(10 * sample_rate, n - i))
+            y[:2 * sample_rate] *= 1e-4
+            y[-2 * sample_rate:] *= 1e-4
+            y.flush()
+            del y
+            y = np.load(path, mmap_mode='r')
+
+            tracemalloc.start()
+            bounds, after = timed(trim_bounds, y, top_db=20)
+            after_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+            tracemalloc.stop()
+
+            if minutes <= TRIM_REFERENCE_MAX_MINUTES:
+                tracemalloc.start()
+                (_, ref), before = timed(librosa.effects.trim, np.asarray(y), top_db=20)
+                before_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+                tracemalloc.stop()
+                same = 'yes' if tuple(int(i) for i in ref) == bounds else 'NO'
+                print(f"   {minutes:>8.0f} {before:>10.2f} {before_mb:>7.0f} {after:>12.3f} "
+                      f"{after_mb:>5.0f} {same:>5}")
+            else:
+                print(f"   {minutes:>8.0f} {'-':>10} {'-':>7} {after:>12.3f} {after_mb:>5.0f} {'-':>5}")
+            del y
+
+
+def bench_lazy_stages(args):
+    """split_signal's lazy stages vs running every stage, as the eager pipeline did."""
+    from audio_splitter_librosa import AudioSplitter
+    from stages import reset_stage_counts, stage_counts
+
+    print(f"📊 librosa split stages on {args.seconds:.0f} s of mono audio")
+    y = create_test_signal(args.seconds, channels=1)[0]
+    splitter = AudioSplitter()
+    outputs = ('vocals_trimmed', 'instrumental_trimmed')
+
+    def run(eager):
+        stages = splitter.separation_stages(y)
+        if eager:
+            for name in ('hpss',) + outputs:
+                stages[name]
+        return [stages[name] for name in outputs]
+
+    # Warm up numba/FFT plans so neither side pays first-call costs
+    splitter.separation_stages(y[:44100])['hpss']
+
+    for mode, eager in (('eager', True), ('lazy', False)):
+        reset_stage_counts()
+        _, elapsed = timed(run, eager)
+        ran = ', '.join(name for name, count in stage_counts().items() if count)
+        print(f"   {mode:>6}: {elapsed:6.2f} s  stages run: {ran}")
+
+
+def bench_multi_download(args):
+    """YouTubeDownloader: one URL at a time vs download_many on a throttled local server."""
+    from youtube_downloader import YouTubeDownloader
+
+    print(f"📊 Downloading {args.files} files (10 s of audio each) from a local server "
+          f"with 0.2 s latency and 4 MB/s per connection")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        media = tmp / 'media'
+        media.mkdir()
+        for i in range(args.files):
+            create_test_wav(media / f"track{i:03d}.wav", 10 / 60)
+
+        def downloader():
+            # A fresh cache per run so every file is really downloaded
+            d = YouTubeDownloader(cache_dir=tempfile.mkdtemp(dir=tmp))
+            d.download_opts.update(quiet=True, noprogress=True)
+            return d
+
+        with MediaServer(media, latency=0.2, bandwidth=4 * 1024 * 1024) as server:
+            urls = [f"{server.url}/track{i:03d}.wav" for i in range(args.files)]
+
+            sequential = downloader()
+            _, before = timed(lambda: [sequential.download_audio(url, tmp / 'seq') for url in urls])
+            results, after = timed(downloader().download_many, urls, tmp / 'par',
+                                   workers=args.workers, per_host=args.workers)
+
+    failed = sum(1 for r in results if r['status'] != 'done')
+    print(f"   One at a time:         {before:.2f} s")
+    print(f"   download_many ({args.workers} workers): {after:.2f} s ({before / after:.1f}x, {failed} failed)")
+
+
+def bench_pipeline(args):
+    """Download then split in sequence vs the pipelined download_and_split_many."""
+    from batch import run_batch
+    from result_cache import set_cache_enabled
+    from youtube_downloader import YouTubeDownloader
+
+    # The synthetic tracks are identical, so keep the result cache out of the timing
+    os.environ['MUSIC_SPLITTER_NO_CACHE'] = '1'
+    set_cache_enabled(False)
+
+    split_workers = 2
+    print(f"📊 Download and split {args.files} files (30 s of audio each) from a local server "
+          f"with 1 MB/s per connection, {args.workers} download and {split_workers} split workers")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        media = tmp / 'media'
+        media.mkdir()
+        for i in range(args.files):
+            create_test_wav(media / f"track{i:03d}.wav", 0.5)
+
+        def downloader():
+            d = YouTubeDownloader(cache_dir=tempfile.mkdtemp(dir=tmp))
+            d.download_opts.update(quiet=True, noprogress=True)
+            return d
+
+        def staged(urls, out):
+            downloads = downloader().download_many(urls, out, workers=args.workers,
+                                                   per_host=args.workers)
+            return run_batch([r['path'] for r in downloads], 'librosa', out,
+                             workers=split_workers)
+
+        with MediaServer(media, bandwidth=1024 * 1024) as server:
+            urls = [f"{server.url}/track{i:03d}.wav" for i in range(args.files)]
+            _, before = timed(staged, urls, tmp / 'staged')
+            _, download_only = timed(downloader().download_many, urls, tmp / 'dl',
+                                     workers=args.workers, per_host=args.workers)
+            _, after = timed(downloader().download_and_split_many, urls, tmp / 'piped',
+                             download_workers=args.workers, split_workers=split_workers,
+                             per_host=args.workers)
+
+    print(f"   Downloads alone:          {download_only:.2f} s")
+    print(f"   Download, then split:     {before:.2f} s")
+    print(f"   Pipelined:                {after:.2f} s ({before / after:.1f}x)")
+
+
+# YouTubeDownloader's options before the native download profile; 'extractaudio',
+# 'audioformat' and 'audioquality' are command-line flags that YoutubeDL ignores
+LEGACY_DOWNLOAD_OPTS = {
+    'format': 'bestaudio[ext=m4a]/bestaudio[ext=mp3]/bestaudio',
+    'extractaudio': True,
+    'audioformat': 'mp3',
+    'audioquality': '192',
+    'noplaylist': True,
+    'prefer_ffmpeg': True,
+    'keepvideo': False,
+}
+
+# What those flags ask for on the command line: an mp3 transcode after download
+LEGACY_MP3_POSTPROCESSORS = [
+    {'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': '192'},
+]
+
+
+def cpu_seconds():
+    """User plus system CPU time of this process and its finished subprocesses."""
+    # Children's times are only reported on POSIX; they are 0 on Windows
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def bench_download_profile(args):
+    """CPU time per downloaded hour: the old download options vs the native audio profile."""
+    import librosa
+    from pcm_stream import ffmpeg_available, ffmpeg_binary, load_audio
+    from youtube_downloader import SPLIT_SAMPLE_RATE, YouTubeDownloader
+
+    if not ffmpeg_available():
+        print("📊 download-profile skipped: ffmpeg not found")
+        return
+
+    minutes = min(args.minutes)
+    print(f"📊 CPU seconds per downloaded hour (download + decode for splitting), "
+          f"{minutes:g} min sources from a local server")
+    print(f"   {'source':>12} {'profile':>14} {'file':>6} {'rate':>6} {'CPU s/hour':>11}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        media = tmp / 'media'
+        media.mkdir()
+        wav_path = create_test_wav(tmp / 'source.wav', minutes)
+
+        # The codecs YouTube serves audio in (Opus as a bare .opus file, since
+        # a generic .webm link is taken for video)
+        sources = {'AAC 44.1k': ('track.m4a', ['-c:a', 'aac', '-b:a', '128k']),
+                   'Opus 48k': ('track.opus', ['-c:a', 'libopus', '-b:a', '128k', '-ar', '48000'])}
+        for name, codec in sources.values():
+            subprocess.run([ffmpeg_binary(), '-v', 'error', '-y', '-i', str(wav_path), *codec,
+                            str(media / name)], check=True)
+
+        profiles = {
+            'today': (dict(LEGACY_DOWNLOAD_OPTS), None),
+            'today + mp3': (dict(LEGACY_DOWNLOAD_OPTS, postprocessors=LEGACY_MP3_POSTPROCESSORS), None),
+            'native': (None, SPLIT_SAMPLE_RATE),
+        }
+
+        # Pay import and first-call costs before measuring
+        librosa.load(str(wav_path), sr=None, duration=1)
+
+        with MediaServer(media) as server:
+            for label, (name, _) in sources.items():
+                for profile, (opts, sample_rate) in profiles.items():
+                    downloader = YouTubeDownloader(cache_dir=tempfile.mkdtemp(dir=tmp))
+                    if opts is not None:
+                        downloader.download_opts = dict(opts, outtmpl=downloader.download_opts['outtmpl'])
+                    downloader.download_opts.update(quiet=True, noprogress=True)
+
+                    start = cpu_seconds()
+                    path = downloader.download_audio(f"{server.url}/{name}", tmp / profile.replace(' ', ''))
+                    if sample_rate:
+                        y, sr = load_audio(path, sample_rate)
+                    else:
+                        y, sr = librosa.load(path, sr=None)
+                    per_hour = (cpu_seconds() - start) * 60 / minutes
+                    print(f"   {label:>12} {profile:>14} {Path(path).suffix:>6} {sr:>6} {per_hour:>11.1f}")
+
+
+# Backends that --help, --version and the first GUI paint must not import
+HEAVY_MODULES = ('librosa', 'yt_dlp', 'numpy', 'scipy', 'soundfile', 'numba')
+
+# GUI modules and the window class each entry point opens
+GUI_WINDOWS = {
+    'gui': 'MusicSplitterGUI',
+    'modern_gui': 'MusicSplitterApp',
+    'simple_gui': 'SimpleMusicSplitterGUI',
+}
+
+
+def run_startup(code):
+    """
+    Run a snippet in a fresh interpreter.
+
+    Returns (wall seconds including interpreter start, heavy modules it imported).
+    """
+    wrapper = (
+        "import sys\n"
+        "try:\n"
+        + ''.join(f"    {line}\n" for line in code.splitlines()) +
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print('\\nSTARTUP', *[m for m in {HEAVY_MODULES!r} if m in sys.modules])\n"
+    )
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', wrapper], capture_output=True,
+                            text=True, cwd=str(Path(__file__).parent))
+    elapsed = time.perf_counter() - start
+    for line in result.stdout.splitlines():
+        if line.startswith('STARTUP'):
+            return elapsed, line.split()[1:]
+    raise RuntimeError(f"Startup snippet failed:\n{result.stderr}")
+
+
+def run_entry_point(script, *argv):
+    """run_startup for an entry point script called with ``argv``."""
+    return run_startup(f"import runpy\n"
+                       f"sys.argv = {[script, *argv]!r}\n"
+                       f"runpy.run_path({script!r}, run_name='__main__')")
+
+
+def first_paint_code(module):
+    """Snippet that opens a GUI window and draws it once."""
+    return (f"import tkinter as tk\n"
+            f"from {module} import {GUI_WINDOWS[module]}\n"
+            f"root = tk.Tk()\n"
+            f"app = {GUI_WINDOWS[module]}(root)\n"
+            f"root.update()\n"
+            f"root.destroy()")
+
+
+def bench_startup(args):
+    """Wall time of --help, --version and GUI first paint, and any backends they import."""
+    print("📊 Entry point startup (fresh interpreter, best of 3)")
+    print(f"   {'command':>34} {'seconds':>8}  heavy imports")
+
+    def report(label, run):
+        timings = [run() for _ in range(3)]
+        elapsed, heavy = min(timings)
+        print(f"   {label:>34} {elapsed:>8.2f}  {', '.join(heavy) or '-'}")
+
+    for script in ('main.py', 'main_enhanced.py', 'main_exe.py', 'youtube_downloader.py'):
+        for flag in ('--help', '--version'):
+            if flag == '--version' and script == 'youtube_downloader.py':
+                continue
+            report(f"{script} {flag}", functools.partial(run_entry_point, script, flag))
+
+    for module in GUI_WINDOWS:
+        report(f"import {module}", functools.partial(run_startup, f"import {module}"))
+        try:
+            report(f"{module} first paint", functools.partial(run_startup, first_paint_code(module)))
+        except RuntimeError as e:
+            if 'display' not in str(e).lower():
+                raise
+            print(f"   {module + ' first paint':>34} skipped (no display)")
+
+
+def bench_first_result(args):
+    """Time to the first split_audio result: empty vs persistent JIT cache, with and without warm-up."""
+    idle = 5.0
+    print(f"📊 First split_audio result on a {args.seconds:.0f} s clip, requested {idle:.0f} s "
+          f"after launch (fresh interpreter)")
+    print(f"   {'JIT cache':>10} {'warm-up':>8} {'first s':>8} {'second s':>9}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        wav_path = create_test_wav(tmp / 'clip.wav', args.seconds / 60)
+        env = dict(os.environ, NUMBA_CACHE_DIR=str(tmp / 'numba'), MUSIC_SPLITTER_NO_CACHE='1')
+
+        for cache, warm in (('empty', False), ('on disk', False), ('on disk', True)):
+            code = (
+                "import time\n"
+                "from audio_splitter_librosa import AudioSplitter\n"
+                "from warmup import start_warm_up\n"
+                f"if {warm}:\n"
+                "    start_warm_up()\n"
+                f"time.sleep({idle})\n"
+                "splitter = AudioSplitter()\n"
+                "timings = []\n"
+                "for _ in range(2):\n"
+                "    start = time.perf_counter()\n"
+                f"    splitter.split_audio(r'{wav_path}', r'{tmp / 'out'}')\n"
+                "    timings.append(time.perf_counter() - start)\n"
+                "print('FIRST', *timings)\n"
+            )
+            result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                                    cwd=str(Path(__file__).parent), env=env, check=True)
+            line = next(l for l in result.stdout.splitlines() if l.startswith('FIRST '))
+            first, second = map(float, line.split()[1:])
+            print(f"   {cache:>10} {'yes' if warm else 'no':>8} {first:>8.2f} {second:>9.2f}")
+
+
+def bench_daemon(args):
+    """Per-job latency: a fresh `main.py --split` vs the same job sent to the warm daemon."""
+    from daemon import ping
+
+    print(f"📊 Latency of one split job on a {args.seconds:.0f} s clip (best of 3)")
+    script = str(Path(__file__).parent / 'main.py')
+
+    def run_cli(*argv):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, script, *argv], capture_output=True, check=True)
+        return time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory(prefix='ms-') as tmp:
+        tmp = Path(tmp)
+        wav_path = create_test_wav(tmp / 'clip.wav', args.seconds / 60)
+        sock = tmp / 'daemon.sock'
+        job = ['--split', str(wav_path), '--output', str(tmp / 'out'), '--no-cache']
+
+        one_shot = min(run_cli(*job) for _ in range(3))
+
+        server = subprocess.Popen([sys.executable, script, '--serve', '--socket', str(sock), '--no-cache'],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            while not ping(sock):
+                if server.poll() is not None:
+                    raise RuntimeError("The daemon exited during start-up")
+                time.sleep(0.1)
+            via_daemon = min(run_cli('--use-daemon', '--socket', str(sock), *job) for _ in range(3))
+        finally:
+            server.terminate()
+            server.wait()
+
+        from audio_splitter_librosa import AudioSplitter
+        splitter = AudioSplitter()
+        dsp = min(timed(splitter.split_audio, wav_path, tmp / 'out', use_cache=False)[1]
+                  for _ in range(3))
+
+    print(f"   main.py --split:              {one_shot:.2f} s")
+    print(f"   main.py --use-daemon --split: {via_daemon:.2f} s ({one_shot / via_daemon:.1f}x)")
+    print(f"   split_audio in a warm process: {dsp:.2f} s")
+
+
+def bench_http_api(args):
+    """Load test of the HTTP job API on localhost: throughput, latency and 429s."""
+    import json
+    import urllib.error
+    import urllib.request
+    from concurrent.futures import ThreadPoolExecutor
+    from http_service import JobService
+    from result_cache import set_cache_enabled
+
+    set_cache_enabled(False)
+    clients = args.workers * 4
+    max_queue = args.workers * 2
+    print(f"📊 HTTP job API: {args.files} split jobs (10 s clips, 'simple' engine) from "
+          f"{clients} clients, {args.workers} workers, queue of {max_queue}")
+
+    def post(service, body):
+        request = urllib.request.Request(f"{service.url}/jobs", data=json.dumps(body).encode(),
+                                         headers={'Content-Type': 'application/json'},
+                                         method='POST')
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.headers, json.load(response)
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers, json.load(e)
+
+    def get(service, path):
+        with urllib.request.urlopen(f"{service.url}{path}") as response:
+            return json.load(response)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        inputs = [create_test_wav(tmp / f"clip{i:03d}.wav", 10 / 60) for i in range(args.files)]
+
+        def client(service, path):
+            # Submit, backing off on 429 as told by Retry-After, then poll to completion
+            rejected = 0
+            start = time.perf_counter()
+            while True:
+                status, headers, body = post(service, {'input': str(path), 'engine': 'simple',
+                                                       'output_dir': str(tmp / 'out')})
+                if status != 429:
+                    break
+                rejected += 1
+                time.sleep(float(headers.get('Retry-After', 1)) / 10)
+            while get(service, f"/jobs/{body['id']}")['status'] not in ('done', 'failed'):
+                time.sleep(0.02)
+            return time.perf_counter() - start, rejected
+
+        with JobService(port=0, workers=args.workers, max_queue=max_queue) as service:
+            service.runner.preload(('simple',))
+            start = time.perf_counter()
+            with ThreadPoolExecutor(clients) as pool:
+                outcomes = list(pool.map(lambda p: client(service, p), inputs))
+            elapsed = time.perf_counter() - start
+            failed = sum(1 for r in service.jobs.values() if r['status'] == 'failed')
+
+    latencies = sorted(latency for latency, _ in outcomes)
+    rejected = sum(r for _, r in outcomes)
+    print(f"   Throughput:          {args.files / elapsed:.1f} jobs/s ({elapsed:.2f} s total, {failed} failed)")
+    print(f"   Job latency p50/p95: {latencies[len(latencies) // 2]:.2f} / "
+          f"{latencies[int(len(latencies) * 0.95)]:.2f} s")
+    print(f"   429 responses:       {rejected}")
+
+
+BENCHMARKS = {
+    'simple-memory': bench_simple_memory,
+    'stereo-hpss': bench_stereo_hpss,
+    'advanced-memory': bench_advanced_memory,
+    'spectral-subtraction': bench_spectral_subtraction,
+    'trim': bench_trim,
+    'lazy-stages': bench_lazy_stages,
+    'multi-download': bench_multi_download,
+    'pipeline': bench_pipeline,
+    'download-profile': bench_download_profile,
+    'startup': bench_startup,
+    'first-result': bench_first_result,
+    'daemon': bench_daemon,
+    'http-api': bench_http_api,
+}
+
+
+def main():
+    """Main benchmark function."""
+    parser = argparse.ArgumentParser(description='Benchmark the Music Splitter engines')
+    parser.add_argument('names', nargs='*', metavar='NAME',
+                       help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument('--minutes', type=float, nargs='+', default=[5, 60, 300],
+                       help='Input durations in minutes for length-scaling benchmarks')
+    parser.add_argument('--seconds', type=float, default=60,
+                       help='Input duration in seconds for DSP benchmarks')
+    parser.add_argument('--files', type=int, default=16,
+                       help='Number of files for download benchmarks')
+    parser.add_argument('--workers', type=int, default=4,
+                       help='Parallel workers for download benchmarks')
+
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    print("🎵 Music Splitter - Benchmarks")
+    print("=" * 40)
+
+    start = time.perf_counter()
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name](args)
+        print()
+
+    print(f"✅ Benchmarks finished in {time.perf_counter() - start:.1f} seconds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Resumable checkpoints for long single-file separations
+
+The advanced and enhanced engines process a signal in blocks, carrying an
+overlap-add tail from each block into the next. With a checkpoint, every
+finished sample goes to a memory-mapped array on disk and, every few
+seconds, the state needed to continue (the next block, the carried tail and
+any whole-signal estimates) is saved next to it. A run that crashed or was
+killed resumes from the last saved block instead of from the start, and
+since every block is processed exactly as in an uninterrupted run, the
+stems come out identical.
+
+Checkpoints are used for inputs of at least CHECKPOINT_MIN_SECONDS (or when
+asked for explicitly). They live in ``checkpoints`` under the cache
+directory (MUSIC_SPLITTER_CHECKPOINTS overrides it), keyed by the input
+file's path, size and modification time, the engine and its
+output-affecting parameters, and are removed once the stems are written.
+
+A checkpoint directory is locked by the split using it (the lock goes away
+with the process), so a second split of the same file at the same time
+runs without a checkpoint instead of sharing, and later deleting, the
+first one's arrays.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+from result_cache import DEFAULT_CACHE_DIR
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+# Inputs at least this long are checkpointed by default
+CHECKPOINT_MIN_SECONDS = 600
+
+# Seconds between state saves within a stage
+CHECKPOINT_INTERVAL = 5.0
+
+# Checkpoints untouched for this long are assumed abandoned and removed
+CHECKPOINT_MAX_AGE = 7 * 24 * 3600
+
+
+def default_checkpoint_dir():
+    if os.environ.get('MUSIC_SPLITTER_CHECKPOINTS'):
+        return Path(os.environ['MUSIC_SPLITTER_CHECKPOINTS'])
+    return Path(os.environ.get('MUSIC_SPLITTER_CACHE') or DEFAULT_CACHE_DIR) / 'checkpoints'
+
+
+def _unmap(array):
+    """Close a memory map now rather than when it is garbage collected."""
+    if getattr(array, '_mmap', None) is not None:
+        array._mmap.close()
+
+
+class CheckpointBusy(Exception):
+    """The checkpoint is locked by another split."""
+
+
+def _try_lock(fd):
+    """Lock an open file without waiting; raise OSError if another holder has it."""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+
+
+def open_checkpoint(enabled, input_path, engine, duration, params=None):
+    """
+    Checkpoint for a split, or None if it should run without one.
+
+    ``enabled`` None checkpoints inputs of at least CHECKPOINT_MIN_SECONDS.
+    Also None while another split holds the same checkpoint.
+    """
+    if enabled is None:
+        enabled = duration >= CHECKPOINT_MIN_SECONDS
+    if not enabled:
+        return None
+    try:
+        return Checkpoint(input_path, engine, params)
+    except CheckpointBusy:
+        print("⚠️  Another split of this file is using its checkpoint; running without one")
+        return None
+
+
+class Checkpoint:
+    """Saved progress of one split: per-stage output arrays and their state."""
+
+    def __init__(self, input_path, engine, params=None, root=None):
+        stat = os.stat(input_path)
+        description = json.dumps({'input': os.path.abspath(input_path), 'size': stat.st_size,
+                                  'mtime': stat.st_mtime_ns, 'engine': engine,
+                                  'params': params or {}}, sort_keys=True)
+        key = hashlib.blake2b(description.encode(), digest_size=20).hexdigest()
+        root = Path(root or default_checkpoint_dir())
+        self._prune(root)
+        self.directory = root / key
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock_fd = os.open(self.directory / 'lock', os.O_RDWR | os.O_CREAT)
+        try:
+            _try_lock(self._lock_fd)
+        except OSError:
+            os.close(self._lock_fd)
+            raise CheckpointBusy(str(self.directory)) from None
+        # In use again: not to be pruned as abandoned
+        os.utime(self.directory)
+        self._arrays = {}
+        self._saved = {}
+
+    @staticmethod
+    def _prune(root):
+        cutoff = time.time() - CHECKPOINT_MAX_AGE
+        try:
+            for entry in root.iterdir():
+                if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                    shutil.rmtree(entry, ignore_errors=True)
+        except OSError:
+            pass
+
+    def _state_path(self, name):
+        return self.directory / f"{name}.state.npz"
+
+    def array(self, name, shape, dtype):
+        """Memory-mapped output array of a stage, reopened if an earlier run left one."""
+        path = self.directory / f"{name}.npy"
+        self._saved[name] = time.monotonic()
+        self.close_array(name)
+        array = None
+        if path.exists():
+            try:
+                array = np.lib.format.open_memmap(path, mode='r+')
+                if array.shape != tuple(shape) or array.dtype != np.dtype(dtype):
+                    _unmap(array)
+                    array = None
+            except (OSError, ValueError):
+                array = None
+            if array is None:
+                # Unusable: start the stage over
+                self._state_path(name).unlink(missing_ok=True)
+        if array is None:
+            array = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=tuple(shape))
+        self._arrays[name] = array
+        return array
+
+    def close_array(self, name):
+        """Flush and unmap a stage's array; it must not be used afterwards."""
+        array = self._arrays.pop(name, None)
+        if array is not None:
+            array.flush()
+            _unmap(array)
+
+    def state(self, name):
+        """Saved state of a stage ({} if it has not saved any)."""
+        try:
+            with np.load(self._state_path(name)) as data:
+                return {key: data[key] for key in data.files}
+        except (OSError, ValueError, EOFError, zipfile.BadZipFile):
+            return {}
+
+    def save(self, name, array, state, force=False):
+        """
+        Flush a stage's array, then save its state.
+
+        Saves at most every CHECKPOINT_INTERVAL seconds unless ``force``; the
+        state is replaced atomically, so it never runs ahead of the array.
+        """
+        now = time.monotonic()
+        if not force and now - self._saved.get(name, now) < CHECKPOINT_INTERVAL:
+            return False
+        array.flush()
+        temp = self.directory / f"{name}.state.tmp"
+        with open(temp, 'wb') as f:
+            np.savez(f, **state)
+        os.replace(temp, self._state_path(name))
+        self._saved[name] = now
+        return True
+
+    def close(self):
+        """Unmap the arrays and give up the lock, keeping the saved progress."""
+        for name in list(self._arrays):
+            self.close_array(name)
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def remove(self):
+        """Delete the checkpoint once its stems are written, then close it."""
+        if self._lock_fd is None:
+            return
+        for name in list(self._arrays):
+            self.close_array(name)
+        try:
+            for entry in self.directory.iterdir():
+                if entry.name != 'lock':
+                    entry.unlink()
+        except OSError as e:
+            print(f"⚠️  Could not remove checkpoint {self.directory}: {e}")
+        self.close()
+        try:
+            (self.directory / 'lock').unlink()
+            self.directory.rmdir()
+        except OSError:
+            # Another split took the checkpoint over in the meantime
+            pass
+
+
+def run_blocks(checkpoint, name, shape, dtype, blocks):
+    """
+    Fill an array from a resumable block generator.
+
+    ``blocks(state)`` yields ``(start_sample, samples)`` pairs along the last
+    axis, like spectral.iter_stft_blocks, keeping the ``state`` dict current
+    and resuming from it when it is not empty. Without a checkpoint the array
+    is built in memory; with one it is filled in a memory map that survives
+    crashes, and an in-memory copy is returned once the stage is complete,
+    so the checkpoint can be removed while the result is still in use.
+    """
+    if checkpoint is None:
+        out = np.zeros(shape, dtype=dtype)
+        for start, samples in blocks({}):
+            out[..., start:start + samples.shape[-1]] = samples
+        return out
+
+    out = checkpoint.array(name, shape, dtype)
+    state = checkpoint.state(name)
+    if state.get('complete'):
+        print(f"↻ Using checkpointed {name}")
+    else:
+        if state:
+            print(f"↻ Resuming {name} from checkpoint")
+        for start, samples in blocks(state):
+            out[..., start:start + samples.shape[-1]] = samples
+            checkpoint.save(name, out, state)
+        state['complete'] = True
+        checkpoint.save(name, out, state, force=True)
+    result = np.array(out)
+    del out
+    checkpoint.close_array(name)
+    return result
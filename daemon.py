@@ -0,0 +1,252 @@
+"""
+Long-lived split/download worker on a Unix domain socket
+
+``python main.py --serve`` starts a daemon that loads and warms up the
+splitter engines once and then accepts jobs over a Unix socket, so each job
+costs roughly its DSP time instead of interpreter start, imports and JIT
+compilation. ``python main.py --use-daemon --split FILE`` (or ``--youtube``)
+submits a job to it and prints the job's progress as it runs.
+
+The protocol is one JSON object per line. A client sends one request:
+
+    {"op": "split", "input": "song.wav", "engine": "librosa", "output_dir": null}
+    {"op": "download", "url": "https://...", "output_dir": null, "stream": false}
+    {"op": "ping"} or {"op": "shutdown"}
+
+(jobs are described in jobs.py)
+and receives ``accepted``, zero or more ``progress`` events (the job's
+console output, line by line) and a final ``done`` or ``error`` event.
+
+The socket is MUSIC_SPLITTER_SOCKET, else ``daemon.sock`` in
+``~/.cache/music_splitter``. This module imports only the standard library
+at the top, so clients start quickly.
+"""
+
+import io
+import itertools
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+
+from jobs import JobRunner, validate_job
+
+DEFAULT_SOCKET_PATH = Path.home() / '.cache' / 'music_splitter' / 'daemon.sock'
+
+# Engines loaded and warmed up when the daemon starts
+DEFAULT_PRELOAD = ('librosa',)
+
+OPS = ('split', 'download', 'ping', 'shutdown')
+
+_output_lock = threading.Lock()
+
+
+def default_socket_path():
+    return Path(os.environ.get('MUSIC_SPLITTER_SOCKET') or DEFAULT_SOCKET_PATH)
+
+
+class JobOutput(io.TextIOBase):
+    """
+    sys.stdout replacement that sends each job thread's prints to its client.
+
+    Threads without a registered sink write to the original stream.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    def set_sink(self, sink):
+        self._local.sink = sink
+        self._local.pending = ''
+
+    def clear_sink(self):
+        self._local.sink = None
+
+    def write(self, text):
+        sink = getattr(self._local, 'sink', None)
+        if sink is None:
+            return self.stream.write(text)
+        lines = (self._local.pending + text).split('\n')
+        self._local.pending = lines.pop()
+        for line in lines:
+            if line.strip():
+                sink(line)
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def job_output():
+    """The JobOutput on sys.stdout, installed over the current stream if needed."""
+    with _output_lock:
+        if not isinstance(sys.stdout, JobOutput):
+            sys.stdout = JobOutput(sys.stdout)
+        return sys.stdout
+
+
+def restore_output():
+    with _output_lock:
+        if isinstance(sys.stdout, JobOutput):
+            sys.stdout = sys.stdout.stream
+
+
+class SplitDaemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server running jobs on warm, shared engine instances."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path=None, workers=1, preload=DEFAULT_PRELOAD, warm=None):
+        """
+        Args:
+            socket_path (str): Socket to listen on (default: default_socket_path())
+            workers (int): Jobs run at once; others wait for a slot
+            preload (tuple): Engine names to load before accepting jobs
+            warm (bool): Run the librosa warm-up before accepting jobs
+                (default: if a preloaded engine uses librosa)
+        """
+        self.socket_path = Path(socket_path or default_socket_path())
+        self.slots = threading.BoundedSemaphore(max(1, workers))
+        self.workers = max(1, workers)
+        self.running = 0
+        self.waiting = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.runner = JobRunner()
+
+        self._remove_stale_socket()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(str(self.socket_path), DaemonHandler)
+
+        seconds = self.runner.preload(preload, warm)
+        if seconds is not None:
+            print(f"🔥 Engines warmed up in {seconds:.1f}s")
+
+    def _remove_stale_socket(self):
+        if not self.socket_path.exists():
+            return
+        if ping(self.socket_path):
+            raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+        self.socket_path.unlink()
+
+    def serve(self):
+        """Serve until shutdown() or Ctrl+C."""
+        try:
+            print(f"🎧 Music Splitter daemon listening on {self.socket_path} "
+                  f"({self.workers} worker{'s' if self.workers != 1 else ''})")
+            self.serve_forever()
+        except KeyboardInterrupt:
+            print("\n⏹️  Daemon stopped")
+        finally:
+            self.server_close()
+
+    def server_close(self):
+        super().server_close()
+        restore_output()
+        try:
+            self.socket_path.unlink()
+        except OSError:
+            pass
+
+
+class DaemonHandler(socketserver.StreamRequestHandler):
+    def send(self, **event):
+        self.wfile.write((json.dumps(event) + '\n').encode())
+        self.wfile.flush()
+
+    def handle(self):
+        server = self.server
+        try:
+            request = json.loads(self.rfile.readline() or b'{}')
+        except ValueError as e:
+            self.send(event='error', error=f"Invalid request: {e}")
+            return
+
+        op = request.get('op')
+        if op not in OPS:
+            self.send(event='error', error=f"Unknown op: {op!r} (choose from {', '.join(OPS)})")
+            return
+        if op == 'ping':
+            self.send(event='done', running=server.running, waiting=server.waiting,
+                      workers=server.workers)
+            return
+        if op == 'shutdown':
+            self.send(event='done')
+            threading.Thread(target=server.shutdown, daemon=True).start()
+            return
+
+        try:
+            job = validate_job(request)
+        except ValueError as e:
+            self.send(event='error', error=str(e))
+            return
+
+        job_id = next(server._ids)
+        with server._lock:
+            server.waiting += 1
+            self.send(event='accepted', job=job_id, waiting=server.waiting - 1)
+
+        start = time.perf_counter()
+        with server.slots:
+            with server._lock:
+                server.waiting -= 1
+                server.running += 1
+            # The job's console output goes to this client
+            output = job_output()
+            output.set_sink(lambda line: self.send(event='progress', message=line))
+            try:
+                result = server.runner(job)
+            except Exception as e:
+                self.send(event='error', error=f"{type(e).__name__}: {e}",
+                          seconds=time.perf_counter() - start)
+                return
+            finally:
+                output.clear_sink()
+                with server._lock:
+                    server.running -= 1
+        self.send(event='done', seconds=time.perf_counter() - start, **result)
+
+
+def submit(request, socket_path=None, on_event=None):
+    """
+    Send a request to the daemon and return its final event.
+
+    ``on_event(event)`` is called for every event as it arrives.
+
+    Raises:
+        ConnectionError: If no daemon is listening on the socket
+    """
+    socket_path = str(socket_path or default_socket_path())
+    if not hasattr(socket, 'AF_UNIX'):
+        raise ConnectionError("Unix domain sockets are not supported on this platform")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError as e:
+            raise ConnectionError(f"No Music Splitter daemon on {socket_path} "
+                                  f"(start one with: python main.py --serve)") from e
+        sock.sendall((json.dumps(request) + '\n').encode())
+
+        event = None
+        with sock.makefile('rb') as reader:
+            for line in reader:
+                event = json.loads(line)
+                if on_event:
+                    on_event(event)
+                if event['event'] in ('done', 'error'):
+                    return event
+    raise ConnectionError("The daemon closed the connection before the job finished")
+
+
+def ping(socket_path=None):
+    """True if a daemon answers on the socket."""
+    try:
+        return submit({'op': 'ping'}, socket_path)['event'] == 'done'
+    except (ConnectionError, ValueError):
+        return False
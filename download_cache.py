@@ -0,0 +1,172 @@
+"""
+Video-ID keyed index of downloaded audio and video metadata
+
+Maps video IDs to the downloaded file and the metadata shown to the user,
+and remembers which ID each requested URL resolved to. A repeat request
+for a known URL or YouTube video ID is answered from the index without
+running the extractor or touching the network.
+
+The index is a JSON file (``index.json`` in the cache directory, by default
+``~/.cache/music_splitter/downloads`` or MUSIC_SPLITTER_DOWNLOAD_CACHE).
+Updates hold a lock file (``index.lock``) while they re-read the file and
+replace it atomically, so several downloaders, in threads or processes, can
+share one index.
+"""
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_DOWNLOAD_CACHE_DIR = Path.home() / '.cache' / 'music_splitter' / 'downloads'
+
+INDEX_FILE = 'index.json'
+
+LOCK_FILE = 'index.lock'
+
+# Metadata kept for each video (what get_video_info reports)
+INFO_FIELDS = ('id', 'title', 'duration', 'uploader', 'view_count', 'upload_date', 'ext')
+
+YOUTUBE_ID_PATTERN = re.compile(
+    r'(?:youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|embed/|live/|v/)|youtu\.be/)([A-Za-z0-9_-]{11})')
+
+
+def youtube_video_id(url):
+    """The 11-character video ID in a YouTube URL, or None."""
+    match = YOUTUBE_ID_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+def video_summary(info):
+    """The metadata fields kept in the index, from a yt-dlp info dict."""
+    return {field: info.get(field) for field in INFO_FIELDS}
+
+
+def _lock_file(fd):
+    """Lock an open file, waiting for other holders (msvcrt gives up after about 10s)."""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    else:
+        msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+
+
+def _unlock_file(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+class DownloadCache:
+    """Index of downloaded files and metadata keyed by video ID."""
+
+    def __init__(self, cache_dir=None):
+        if cache_dir is None:
+            cache_dir = os.environ.get('MUSIC_SPLITTER_DOWNLOAD_CACHE') or DEFAULT_DOWNLOAD_CACHE_DIR
+        self.cache_dir = Path(cache_dir)
+        self.index_path = self.cache_dir / INDEX_FILE
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        """Hold the index for a read-modify-write, against other threads and processes."""
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.cache_dir / LOCK_FILE, os.O_RDWR | os.O_CREAT)
+            try:
+                _lock_file(fd)
+                try:
+                    yield
+                finally:
+                    _unlock_file(fd)
+            finally:
+                os.close(fd)
+
+    def _load(self):
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        index.setdefault('videos', {})
+        index.setdefault('urls', {})
+        return index
+
+    def _save(self, index):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.index-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(index, f, indent=2)
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def resolve_id(self, url):
+        """Video ID for a URL from the index or the URL itself, without extraction."""
+        return self._load()['urls'].get(url) or youtube_video_id(url)
+
+    def get(self, video_id):
+        """Index entry (info, path, url, updated) for a video ID, or None."""
+        if not video_id:
+            return None
+        return self._load()['videos'].get(video_id)
+
+    def lookup(self, url):
+        """Index entry for a URL, or None if it has not been seen."""
+        return self.get(self.resolve_id(url))
+
+    def cached_file(self, entry):
+        """Path of an entry's downloaded file if it still exists, else None."""
+        path = entry.get('path') if entry else None
+        return path if path and os.path.isfile(path) else None
+
+    def record(self, url, info, path=None):
+        """
+        Store a video's metadata (and downloaded file, if any) under its ID.
+
+        A later call without ``path`` keeps the file recorded earlier.
+        """
+        video_id = info.get('id')
+        if not video_id:
+            return
+        with self._locked():
+            index = self._load()
+            entry = index['videos'].get(video_id, {})
+            entry['info'] = video_summary(info)
+            if path is not None:
+                entry['path'] = str(Path(path).resolve())
+            entry['url'] = url
+            entry['updated'] = time.time()
+            index['videos'][video_id] = entry
+            index['urls'][url] = video_id
+            self._save(index)
+
+    def forget(self, video_id, path=None):
+        """
+        Drop a video's downloaded file from the index (its metadata is kept).
+
+        With ``path``, the file is only dropped if it is the one recorded.
+        """
+        with self._locked():
+            index = self._load()
+            entry = index['videos'].get(video_id)
+            if not entry or 'path' not in entry:
+                return
+            if path is not None and entry['path'] != str(Path(path).resolve()):
+                return
+            del entry['path']
+            self._save(index)
@@ -9,34 +9,160 @@ from pathlib import Path
 import argparse
 import sys
 import scipy.signal
-from scipy.fft import fft, ifft
+from scipy.fft import rfft, irfft
+from numpy.lib.stride_tricks import sliding_window_view
+from wav_io import open_wav
+from precision import PRECISIONS, as_float, float_dtype, get_precision, set_precision
+from result_cache import cached_split, set_cache_enabled
+from checkpoint import open_checkpoint, run_blocks
+
+# Short-time spectral subtraction settings
+SS_FRAME_LENGTH = 2048
+SS_HOP_LENGTH = 512
+SS_BLOCK_FRAMES = 1024
+SS_NOISE_PERCENTILE = 10
 
 class EnhancedAudioSplitter:
     def __init__(self):
         """Initialize enhanced audio splitter."""
         print("✓ Enhanced audio splitter initialized")
     
-    def apply_spectral_subtraction(self, audio, noise_factor=0.5):
-        """Apply spectral subtraction to reduce noise and improve separation."""
-        # Perform FFT
-        spectrum = fft(audio)
-        magnitude = np.abs(spectrum)
-        phase = np.angle(spectrum)
-        
-        # Estimate noise from the first and last 10% of the signal
-        noise_start = magnitude[:len(magnitude)//10]
-        noise_end = magnitude[-len(magnitude)//10:]
-        noise_estimate = np.mean([np.mean(noise_start), np.mean(noise_end)])
-        
-        # Spectral subtraction
-        clean_magnitude = magnitude - noise_factor * noise_estimate
-        clean_magnitude = np.maximum(clean_magnitude, 0.1 * magnitude)  # Floor to prevent artifacts
-        
-        # Reconstruct signal
-        clean_spectrum = clean_magnitude * np.exp(1j * phase)
-        clean_audio = np.real(ifft(clean_spectrum))
-        
-        return clean_audio.astype(audio.dtype)
+    @staticmethod
+    def _frame_block(audio, t0, t1, frame_length, hop_length):
+        """
+        Frames [t0, t1) of the centered (zero-padded) signal, shape (frames, frame_length).
+        
+        Only this block of samples is copied; the rest of ``audio`` is untouched.
+        """
+        pad = frame_length // 2
+        seg_start = t0 * hop_length - pad
+        seg_end = (t1 - 1) * hop_length + frame_length - pad
+        segment = np.zeros(seg_end - seg_start, dtype=float_dtype())
+        
+        src_start, src_end = max(0, seg_start), min(len(audio), seg_end)
+        if src_end > src_start:
+            segment[src_start - seg_start:src_end - seg_start] = audio[src_start:src_end]
+        
+        return sliding_window_view(segment, frame_length)[::hop_length]
+    
+    def estimate_noise_profile(self, audio, frame_length=SS_FRAME_LENGTH, hop_length=SS_HOP_LENGTH,
+                               percentile=SS_NOISE_PERCENTILE, block_frames=SS_BLOCK_FRAMES):
+        """
+        Estimate the per-bin noise magnitude from the quietest frames of the signal.
+        
+        Frames whose windowed energy is at or below the given percentile are
+        treated as noise-only; their magnitude spectra are averaged.
+        """
+        window = scipy.signal.get_window('hann', frame_length).astype(float_dtype())
+        total_frames = 1 + len(audio) // hop_length
+        
+        # Pass 1: frame energies (time domain only, one float per frame)
+        energies = np.empty(total_frames, dtype=float_dtype())
+        for t0 in range(0, total_frames, block_frames):
+            t1 = min(t0 + block_frames, total_frames)
+            frames = self._frame_block(audio, t0, t1, frame_length, hop_length)
+            energies[t0:t1] = np.einsum('ij,j->i', frames * frames, window * window)
+        
+        quiet = np.flatnonzero(energies <= np.percentile(energies, percentile))
+        
+        # Pass 2: average magnitude spectrum of the quiet frames only
+        noise_sum = np.zeros(frame_length // 2 + 1, dtype=np.float64)
+        for t0 in range(0, total_frames, block_frames):
+            t1 = min(t0 + block_frames, total_frames)
+            selected = quiet[(quiet >= t0) & (quiet < t1)] - t0
+            if len(selected):
+                frames = self._frame_block(audio, t0, t1, frame_length, hop_length)[selected]
+                noise_sum += np.abs(rfft(frames * window, axis=-1)).sum(axis=0)
+        
+        return (noise_sum / max(len(quiet), 1)).astype(float_dtype())
+    
+    def apply_spectral_subtraction(self, audio, noise_factor=0.5, frame_length=SS_FRAME_LENGTH,
+                                   hop_length=SS_HOP_LENGTH, block_frames=SS_BLOCK_FRAMES,
+                                   checkpoint=None, name='spectral_subtraction'):
+        """
+        Apply short-time spectral subtraction to reduce noise and improve separation.
+        
+        The signal is processed as overlapping Hann-windowed rfft frames in
+        blocks of ``block_frames``, so working memory is bounded and run time
+        grows linearly with duration. The noise profile comes from the
+        lowest-energy frames (see ``estimate_noise_profile``). With a
+        checkpoint (see checkpoint.py) the result is saved under ``name`` as
+        it is produced, and an interrupted run resumes from the last block.
+        """
+        if frame_length % hop_length:
+            raise ValueError("frame_length must be a multiple of hop_length")
+        
+        def blocks(state):
+            return self._spectral_subtraction_blocks(audio, noise_factor, frame_length,
+                                                     hop_length, block_frames, state)
+        
+        clean_audio = run_blocks(checkpoint, name, (len(audio),), float_dtype(), blocks)
+        return clean_audio.astype(audio.dtype, copy=False)
+    
+    def _spectral_subtraction_blocks(self, audio, noise_factor, frame_length, hop_length,
+                                     block_frames, state):
+        """
+        Yield (start, samples) blocks of the spectral subtraction output.
+        
+        ``state`` holds the noise profile, the next block and the
+        overlap-add tail carried into it; it is updated before each yield and
+        resumed from when it is not empty.
+        """
+        n = len(audio)
+        pad = frame_length // 2
+        overlap = frame_length // hop_length
+        total_frames = 1 + n // hop_length
+        
+        if 'noise' not in state:
+            state['noise'] = noise_factor * self.estimate_noise_profile(
+                audio, frame_length, hop_length, block_frames=block_frames
+            )
+        noise = state['noise']
+        
+        dtype = float_dtype()
+        window = scipy.signal.get_window('hann', frame_length).astype(dtype)
+        window_sq = (window * window).reshape(overlap, hop_length)
+        
+        first = int(state.get('frame', 0))
+        carry = state.get('carry', np.zeros((overlap - 1, hop_length), dtype=dtype))
+        carry_norm = state.get('carry_norm', np.zeros((overlap - 1, hop_length), dtype=dtype))
+        
+        for t0 in range(first, total_frames, block_frames):
+            t1 = min(t0 + block_frames, total_frames)
+            frames = t1 - t0
+            
+            spectrum = rfft(self._frame_block(audio, t0, t1, frame_length, hop_length) * window, axis=-1)
+            magnitude = np.abs(spectrum)
+            
+            # Spectral subtraction, floored to prevent artifacts, applied as a
+            # real gain so the phase is kept without reconstructing it
+            clean_magnitude = np.maximum(magnitude - noise, 0.1 * magnitude)
+            spectrum *= clean_magnitude / np.maximum(magnitude, np.finfo(dtype).tiny)
+            
+            # Overlap-add the windowed frames in hop-sized pieces
+            pieces = (irfft(spectrum, n=frame_length, axis=-1) * window).reshape(frames, overlap, hop_length)
+            acc = np.zeros((frames + overlap - 1, hop_length), dtype=dtype)
+            norm = np.zeros_like(acc)
+            acc[:overlap - 1] = carry
+            norm[:overlap - 1] = carry_norm
+            for k in range(overlap):
+                acc[k:k + frames] += pieces[:, k]
+                norm[k:k + frames] += window_sq[k]
+            
+            done = frames if t1 < total_frames else frames + overlap - 1
+            carry, carry_norm = acc[done:], norm[done:]
+            state.update(frame=t1, carry=carry, carry_norm=carry_norm)
+            
+            out = acc[:done].ravel()
+            out_norm = norm[:done].ravel()
+            nonzero = out_norm > 1e-8
+            out[nonzero] /= out_norm[nonzero]
+            
+            # Drop the center padding and yield the finished samples
+            start = t0 * hop_length - pad
+            lo, hi = max(0, -start), min(len(out), n - start)
+            if hi > lo:
+                yield start + lo, out[lo:hi]
     
     def apply_bandpass_filter(self, audio, sample_rate, low_freq=80, high_freq=8000):
         """Apply bandpass filter to focus on vocal frequency range."""
@@ -44,41 +170,53 @@ class EnhancedAudioSplitter:
         low = low_freq / nyquist
         high = high_freq / nyquist
         
-        # Design bandpass filter
-        b, a = scipy.signal.butter(4, [low, high], btype='band')
-        filtered_audio = scipy.signal.filtfilt(b, a, audio)
+        # Design bandpass filter as second-order sections in the working dtype,
+        # so the zero-phase filter runs (and returns) in that precision
+        sos = scipy.signal.butter(4, [low, high], btype='band', output='sos')
+        filtered_audio = scipy.signal.sosfiltfilt(sos.astype(float_dtype()), as_float(audio))
         
-        return filtered_audio.astype(audio.dtype)
+        return filtered_audio.astype(audio.dtype, copy=False)
     
-    def enhanced_vocal_isolation(self, left, right, sample_rate):
-        """Enhanced vocal isolation using multiple techniques."""
+    def enhanced_vocal_isolation(self, left, right, sample_rate, checkpoint=None):
+        """
+        Enhanced vocal isolation using multiple techniques.
+        
+        ``left`` and ``right`` may be integer PCM views (e.g. memory-mapped);
+        they are converted to the working float dtype as part of the first
+        arithmetic step. With a checkpoint, both spectral subtraction passes
+        (the bulk of the work) are saved block by block; they run before the
+        whole-signal filtering so an interrupted split resumes inside them.
+        """
         # Method 1: Center channel extraction with improved algorithm
-        center = (left - right)
+        center = np.subtract(left, right, dtype=float_dtype())
         
         # Method 2: Apply spectral subtraction to clean up the signal
-        center_clean = self.apply_spectral_subtraction(center, noise_factor=0.3)
-        
-        # Method 3: Apply bandpass filter for vocal frequencies (80Hz - 8kHz)
-        center_filtered = self.apply_bandpass_filter(center_clean, sample_rate, 80, 8000)
-        
-        # Method 4: Dynamic range compression to enhance vocals
-        center_compressed = self.apply_compression(center_filtered)
+        center_clean = self.apply_spectral_subtraction(center, noise_factor=0.3,
+                                                       checkpoint=checkpoint, name='center')
         
         # Method 5: Stereo widening for instrumental
         # Use mid-side technique for better instrumental separation
-        mid = (left + right) / 2
-        side = (left - right) / 2
+        mid = np.add(left, right, dtype=float_dtype())
+        mid /= 2
+        side = center / 2
         
         # Enhance stereo field for instrumental
         instrumental = mid + 0.5 * side
-        instrumental_clean = self.apply_spectral_subtraction(instrumental, noise_factor=0.2)
+        instrumental_clean = self.apply_spectral_subtraction(instrumental, noise_factor=0.2,
+                                                             checkpoint=checkpoint, name='instrumental')
+        
+        # Method 3: Apply bandpass filter for vocal frequencies (80Hz - 8kHz)
+        center_filtered = self.apply_bandpass_filter(center_clean, sample_rate, 80, 8000)
+        
+        # Method 4: Dynamic range compression to enhance vocals
+        center_compressed = self.apply_compression(center_filtered)
         
         return center_compressed, instrumental_clean
     
     def apply_compression(self, audio, threshold=0.3, ratio=4.0):
         """Apply dynamic range compression to enhance vocals."""
         # Simple compression algorithm
-        compressed = np.copy(audio).astype(np.float32)
+        compressed = audio.astype(float_dtype(), copy=True)
         
         # Normalize to work with values between -1 and 1
         max_val = np.max(np.abs(compressed))
@@ -95,12 +233,17 @@ class EnhancedAudioSplitter:
         if max_val > 0:
             compressed = compressed * max_val
         
-        return compressed.astype(audio.dtype)
+        return compressed.astype(audio.dtype, copy=False)
     
-    def split_audio_enhanced(self, input_path, output_dir=None):
+    @cached_split('enhanced', suffix='_enhanced')
+    def split_audio_enhanced(self, input_path, output_dir=None, checkpoint=None):
         """
         Enhanced vocal/instrumental separation with multiple algorithms.
+        
+        Long inputs (or any, with ``checkpoint=True``) are checkpointed, so an
+        interrupted split resumes where it stopped with identical output.
         """
+        saved = None
         try:
             input_path = Path(input_path)
             
@@ -122,35 +265,20 @@ class EnhancedAudioSplitter:
             if input_path.suffix.lower() != '.wav':
                 raise ValueError("This version supports WAV files. Please convert your file to WAV format first.")
             
-            # Load WAV file
+            # Memory-map the WAV file; the channels stay on disk until the DSP reads them
             print("📖 Loading WAV file...")
-            with wave.open(str(input_path), 'rb') as wav_file:
-                frames = wav_file.readframes(-1)
-                sample_rate = wav_file.getframerate()
-                channels = wav_file.getnchannels()
-                sample_width = wav_file.getsampwidth()
+            with open_wav(input_path) as wav_file:
+                sample_rate = wav_file.sample_rate
+                sample_width = wav_file.sample_width
+                dtype = wav_file.dtype
                 
-                if channels != 2:
+                if wav_file.channels != 2:
                     raise ValueError("This version requires stereo (2-channel) WAV files for best results.")
                 
-                # Convert to numpy array
-                if sample_width == 1:
-                    dtype = np.uint8
-                    max_val = 127
-                elif sample_width == 2:
-                    dtype = np.int16
-                    max_val = 32767
-                elif sample_width == 4:
-                    dtype = np.int32
-                    max_val = 2147483647
-                else:
-                    raise ValueError(f"Unsupported sample width: {sample_width}")
-                
-                audio_data = np.frombuffer(frames, dtype=dtype)
-                audio_data = audio_data.reshape(-1, 2)
+                max_val = {1: 127, 2: 32767, 4: 2147483647}[sample_width]
                 
-                left = audio_data[:, 0].astype(np.float32)
-                right = audio_data[:, 1].astype(np.float32)
+                left = wav_file.left
+                right = wav_file.right
                 
                 print("🔧 Applying enhanced vocal separation algorithms...")
                 print("   • Center channel extraction")
@@ -160,8 +288,10 @@ class EnhancedAudioSplitter:
                 print("   • Stereo field enhancement")
                 
                 # Apply enhanced vocal isolation
+                saved = open_checkpoint(checkpoint, input_path, 'enhanced', wav_file.duration,
+                                        {'precision': get_precision()})
                 vocals_enhanced, instrumental_enhanced = self.enhanced_vocal_isolation(
-                    left, right, sample_rate
+                    left, right, sample_rate, checkpoint=saved
                 )
                 
                 # Normalize and convert back to original format
@@ -189,6 +319,8 @@ class EnhancedAudioSplitter:
                     inst_wav.setsampwidth(sample_width)
                     inst_wav.setframerate(sample_rate)
                     inst_wav.writeframes(instrumental_norm.tobytes())
+                if saved is not None:
+                    saved.remove()
                 
                 print(f"✓ Enhanced vocal track saved: {vocal_path}")
                 print(f"✓ Enhanced instrumental track saved: {instrumental_path}")
@@ -198,6 +330,10 @@ class EnhancedAudioSplitter:
         except Exception as e:
             print(f"✗ Error during enhanced audio splitting: {e}")
             raise e
+        finally:
+            if saved is not None:
+                # Unlocks an interrupted split's checkpoint so a retry can resume it
+                saved.close()
     
     def get_audio_info(self, file_path):
         """Get detailed information about a WAV file."""
@@ -227,8 +363,14 @@ def main():
     parser.add_argument('--input', '-i', required=True, help='Input WAV file path')
     parser.add_argument('--output', '-o', help='Output directory (optional)')
     parser.add_argument('--info', action='store_true', help='Show detailed audio file information')
+    parser.add_argument('--precision', choices=list(PRECISIONS), default=get_precision(),
+                       help='Floating-point precision for processing (default: float32)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Always recompute instead of reusing cached results')
     
     args = parser.parse_args()
+    set_cache_enabled(not args.no_cache)
+    set_precision(args.precision)
     
     try:
         splitter = EnhancedAudioSplitter()
@@ -4,8 +4,7 @@ import threading
 import os
 from pathlib import Path
 import webbrowser
-from audio_splitter_librosa import AudioSplitter
-from youtube_downloader import YouTubeDownloader, is_valid_youtube_url
+from youtube_downloader import is_valid_youtube_url
 
 class MusicSplitterGUI:
     def __init__(self, root):
@@ -211,9 +210,17 @@ Features:
         """Initialize audio splitter and YouTube downloader."""
         try:
             self.status_var.set("Loading AI models...")
+            # Imported here, off the UI thread, so the window appears at once
+            from audio_splitter_librosa import AudioSplitter
+            from youtube_downloader import YouTubeDownloader
             self.audio_splitter = AudioSplitter()
             self.youtube_downloader = YouTubeDownloader()
             
+            # Compile and load the separation stages now, not on the first split
+            self.status_var.set("Warming up audio engine...")
+            from warmup import warm_up
+            warm_up()
+            
             # Enable buttons
             self.root.after(0, self.enable_controls)
             self.status_var.set("Ready")
@@ -243,6 +250,21 @@ Features:
         if file_path:
             self.file_path_var.set(file_path)
             self.current_file = file_path
+            threading.Thread(target=self.show_file_info, args=(file_path,), daemon=True).start()
+    
+    def show_file_info(self, file_path):
+        """Log header information for the selected file (no decoding)."""
+        from audio_info import probe_audio
+        try:
+            info = probe_audio(file_path)
+        except (OSError, ValueError) as e:
+            self.root.after(0, self.log_message, self.file_log, f"⚠️ Could not read file info: {e}")
+            return
+        
+        minutes, seconds = divmod(int(info['duration']), 60)
+        message = (f"📊 {Path(file_path).name}: {minutes}:{seconds:02d}, "
+                   f"{info['sample_rate']} Hz, {info['channels']} ch, {info['subtype']}")
+        self.root.after(0, self.log_message, self.file_log, message)
     
     def browse_output_dir(self):
         """Browse for output directory."""
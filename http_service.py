@@ -0,0 +1,305 @@
+"""
+Local HTTP job API for splitting files and YouTube downloads
+
+An embeddable service that accepts jobs over HTTP and runs them on a pool
+of worker threads sharing warm engine instances (see jobs.py):
+
+    POST /jobs                 submit {"input": path} or {"url": url}, plus
+                               optional engine, output_dir, use_cache, stream,
+                               keep_original; 202 with the job
+    GET  /jobs/<id>            job status
+    POST /jobs/<id>/cancel     cancel a queued job (409 once it has started)
+    GET  /jobs/<id>/result     stems of a finished job (409 until it is done)
+    GET  /health               workers, queue depth and capacity
+
+When ``max_queue`` jobs are already waiting, submissions get 429 with
+``Retry-After``, ``X-Queue-Depth`` and ``X-Queue-Capacity`` headers; every
+202 carries the queue headers too. The service binds to 127.0.0.1 by default.
+
+POST requests must be sent with ``Content-Type: application/json``, and every
+request must name the service's own address (localhost, 127.0.0.1 or [::1]
+with its port) in its Host header. Web pages can then neither submit nor
+cancel jobs with a cross-origin form post, nor reach the API through a DNS
+name rebound to 127.0.0.1.
+
+Usage:
+    python main.py --api --port 8750 --workers 2
+
+    with JobService(port=0, workers=2) as service:
+        record = service.submit({'input': 'song.wav', 'engine': 'enhanced'})
+"""
+
+import itertools
+import json
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from jobs import JobRunner, validate_job
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8750
+DEFAULT_API_WORKERS = 2
+DEFAULT_MAX_QUEUE = 32
+
+# Finished jobs kept for status and result requests
+JOB_HISTORY = 1000
+
+FINISHED = ('done', 'failed', 'cancelled')
+
+JOB_PATH = re.compile(r'^/jobs/(\d+)(/cancel|/result)?$')
+
+# Host header names accepted besides the bound address
+LOCAL_HOSTS = ('localhost', '127.0.0.1', '[::1]')
+
+
+class JobService:
+    """Queue of jobs with a worker pool, served over HTTP."""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_API_WORKERS,
+                 max_queue=DEFAULT_MAX_QUEUE, runner=None):
+        """
+        Args:
+            host (str): Address to bind (default: localhost only)
+            port (int): Port to bind (0 picks a free one)
+            workers (int): Jobs run at once
+            max_queue (int): Waiting jobs accepted before answering 429
+            runner: Callable running a validated job and returning its result
+                fields (default: a jobs.JobRunner)
+        """
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.runner = runner or JobRunner()
+        self.jobs = OrderedDict()
+        self.queued = 0
+        self.running = 0
+        self._pending = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._threads = []
+        self._stopping = False
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def allowed_hosts(self):
+        """Host header values that address this service."""
+        host, port = self._httpd.server_address[:2]
+        names = set(LOCAL_HOSTS)
+        if host not in ('', '0.0.0.0', '::'):
+            names.add(f"[{host}]" if ':' in host else host)
+        hosts = {f"{name}:{port}" for name in names}
+        if port == 80:
+            hosts |= names
+        return hosts
+
+    def queue_headers(self):
+        with self._lock:
+            return {'X-Queue-Depth': str(self.queued), 'X-Queue-Capacity': str(self.max_queue),
+                    'X-Running-Jobs': str(self.running)}
+
+    def submit(self, request):
+        """
+        Queue a job from a request dict.
+
+        Returns:
+            dict: The job record, or None if the queue is full
+
+        Raises:
+            ValueError: If the request does not describe a valid job
+        """
+        job = validate_job(request)
+        with self._lock:
+            if self.queued >= self.max_queue:
+                return None
+            record = {'id': next(self._ids), 'status': 'queued', 'job': job,
+                      'submitted': time.time(), 'started': None, 'finished': None,
+                      'result': None, 'error': None}
+            self.jobs[record['id']] = record
+            self.queued += 1
+        self._pending.put(record['id'])
+        return record
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Cancel a queued job; return its record (unchanged if it already started)."""
+        with self._lock:
+            record = self.jobs.get(job_id)
+            if record and record['status'] == 'queued':
+                record['status'] = 'cancelled'
+                record['finished'] = time.time()
+                self.queued -= 1
+            return record
+
+    def _work(self):
+        while True:
+            job_id = self._pending.get()
+            if job_id is None or self._stopping:
+                return
+            with self._lock:
+                record = self.jobs.get(job_id)
+                if record is None or record['status'] != 'queued':
+                    # Cancelled while waiting
+                    continue
+                record['status'] = 'running'
+                record['started'] = time.time()
+                self.queued -= 1
+                self.running += 1
+
+            try:
+                result, error, status = self.runner(record['job']), None, 'done'
+            except Exception as e:
+                result, error, status = None, f"{type(e).__name__}: {e}", 'failed'
+
+            with self._lock:
+                record.update(status=status, result=result, error=error, finished=time.time())
+                self.running -= 1
+                self._forget_old_jobs()
+
+    def _forget_old_jobs(self):
+        finished = [job_id for job_id, r in self.jobs.items() if r['status'] in FINISHED]
+        for job_id in finished[:max(0, len(finished) - JOB_HISTORY)]:
+            del self.jobs[job_id]
+
+    def start(self):
+        """Start the workers and serve HTTP on a background thread."""
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def serve_forever(self):
+        """Start the workers and serve HTTP on this thread until Ctrl+C."""
+        self.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Stop accepting requests; running jobs finish, queued ones are dropped."""
+        self._stopping = True
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        for _ in self._threads:
+            self._pending.put(None)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def _handler(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def check_host(self):
+                host = (self.headers.get('Host') or '').lower()
+                if host in service.allowed_hosts():
+                    return True
+                self.send_json(403, {'error': f"Host not allowed: {host or '(none)'}"})
+                return False
+
+            def send_json(self, status, body, headers=None):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def send_job(self, status, record):
+                body = {key: record[key] for key in
+                        ('id', 'status', 'submitted', 'started', 'finished', 'error')}
+                body['job'] = record['job']
+                self.send_json(status, body)
+
+            def do_GET(self):
+                if not self.check_host():
+                    return
+                if self.path == '/health':
+                    with service._lock:
+                        body = {'workers': service.workers, 'queued': service.queued,
+                                'running': service.running, 'capacity': service.max_queue}
+                    self.send_json(200, body, service.queue_headers())
+                    return
+
+                match = JOB_PATH.match(self.path)
+                if not match or match.group(2) == '/cancel':
+                    self.send_json(404, {'error': f"Not found: {self.path}"})
+                    return
+                record = service.get(int(match.group(1)))
+                if record is None:
+                    self.send_json(404, {'error': f"Unknown job: {match.group(1)}"})
+                elif match.group(2) == '/result':
+                    if record['status'] == 'done':
+                        self.send_json(200, dict(record['result'], id=record['id']))
+                    else:
+                        self.send_json(409, {'id': record['id'], 'status': record['status'],
+                                             'error': record['error'] or f"Job is {record['status']}"})
+                else:
+                    self.send_job(200, record)
+
+            def do_POST(self):
+                if not self.check_host():
+                    return
+                content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+                if content_type != 'application/json':
+                    self.send_json(415, {'error': "POST requests must be sent as application/json"})
+                    return
+                if self.path == '/jobs':
+                    self.submit()
+                    return
+                match = JOB_PATH.match(self.path)
+                if not match or match.group(2) != '/cancel':
+                    self.send_json(404, {'error': f"Not found: {self.path}"})
+                    return
+                record = service.cancel(int(match.group(1)))
+                if record is None:
+                    self.send_json(404, {'error': f"Unknown job: {match.group(1)}"})
+                elif record['status'] == 'cancelled':
+                    self.send_job(200, record)
+                else:
+                    self.send_json(409, {'id': record['id'], 'status': record['status'],
+                                         'error': f"Cannot cancel a {record['status']} job"})
+
+            def submit(self):
+                try:
+                    length = int(self.headers.get('Content-Length') or 0)
+                    request = json.loads(self.rfile.read(length) or b'{}')
+                    record = service.submit(request)
+                except ValueError as e:
+                    self.send_json(400, {'error': str(e)})
+                    return
+
+                if record is None:
+                    headers = dict(service.queue_headers(), **{'Retry-After': '1'})
+                    self.send_json(429, {'error': "Job queue is full"}, headers)
+                    return
+                self.send_json(202, {'id': record['id'], 'status': record['status'],
+                                     'location': f"/jobs/{record['id']}"},
+                               dict(service.queue_headers(), Location=f"/jobs/{record['id']}"))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,451 @@
+"""
+Persistent batch job store in SQLite (WAL mode)
+
+Every file of a batch is a row recording its state, engine, parameters,
+attempts and output paths. Worker processes lease queued jobs atomically
+and keep their lease alive while they work; a lease whose worker died is
+handed back to the queue (at once if the worker was on this host, otherwise
+when the lease expires), and a job that keeps killing its worker is failed
+after ``max_attempts``. Running the same batch again against the same store
+skips finished files and carries on with the rest.
+
+Usage:
+    python main.py --batch music/ --job-store jobs.db
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_JOB_STORE = Path.home() / '.cache' / 'music_splitter' / 'jobs.db'
+
+DEFAULT_LEASE_SECONDS = 60
+DEFAULT_MAX_ATTEMPTS = 3
+
+STATES = ('queued', 'leased', 'done', 'failed')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    batch TEXT NOT NULL,
+    input TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    params TEXT NOT NULL DEFAULT '{}',
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    vocals TEXT,
+    instrumental TEXT,
+    seconds REAL,
+    duration REAL,
+    error TEXT,
+    signature TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    UNIQUE (batch, input)
+);
+CREATE INDEX IF NOT EXISTS jobs_batch_state ON jobs (batch, state);
+"""
+
+
+def worker_id():
+    """Lease owner name for this process: host and process ID."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def owner_alive(owner):
+    """False only if ``owner`` is a process on this host that no longer exists."""
+    host, _, pid = (owner or '').rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit() or os.name == 'nt':
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def input_signature(path):
+    """Size and modification time of an input, or None if it cannot be read."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def outputs_exist(job):
+    return all(job[key] and os.path.exists(job[key]) for key in ('vocals', 'instrumental'))
+
+
+def batch_name(engine, output_dir=None):
+    """Default batch name, so re-running the same command resumes the same batch."""
+    return f"{engine}:{Path(output_dir).resolve() if output_dir else ''}"
+
+
+class JobStore:
+    """Batch jobs in a SQLite database shared by the batch runner and its workers."""
+
+    def __init__(self, path=None, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.path = Path(path or DEFAULT_JOB_STORE)
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit; multi-statement updates use explicit transactions
+        self.db = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(SCHEMA)
+        columns = {row['name'] for row in self.db.execute('PRAGMA table_info(jobs)')}
+        if 'signature' not in columns:
+            self.db.execute('ALTER TABLE jobs ADD COLUMN signature TEXT')
+
+    def close(self):
+        self.db.close()
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction holding the database lock from the start."""
+        self.db.execute('BEGIN IMMEDIATE')
+        try:
+            yield self.db
+        except BaseException:
+            self.db.execute('ROLLBACK')
+            raise
+        self.db.execute('COMMIT')
+
+    def add(self, batch, files, engine, params=None):
+        """
+        Queue files for a batch; return how many were queued.
+
+        Files already in the batch keep their state, except that a finished
+        job is queued again if its input changed (size or mtime) or its stems
+        are gone, and jobs not yet done take the new ``params``.
+        """
+        now = time.time()
+        params = json.dumps(params or {}, sort_keys=True)
+        queued = 0
+        with self.transaction() as db:
+            for f in files:
+                signature = input_signature(f)
+                row = db.execute('SELECT * FROM jobs WHERE batch = ? AND input = ?',
+                                 (batch, str(f))).fetchone()
+                if row is None:
+                    db.execute('INSERT INTO jobs (batch, input, engine, params, signature, created, updated) '
+                               'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                               (batch, str(f), engine, params, signature, now, now))
+                    queued += 1
+                elif row['state'] == 'done' and (row['signature'] != signature or not outputs_exist(row)):
+                    db.execute("UPDATE jobs SET state = 'queued', attempts = 0, params = ?, signature = ?, "
+                               "vocals = NULL, instrumental = NULL, error = NULL, updated = ? WHERE id = ?",
+                               (params, signature, now, row['id']))
+                    queued += 1
+                elif row['state'] in ('queued', 'failed'):
+                    db.execute('UPDATE jobs SET params = ?, signature = ?, updated = ? WHERE id = ?',
+                               (params, signature, now, row['id']))
+        return queued
+
+    def unfinished_batches(self, prefix=''):
+        """
+        Batches starting with ``prefix`` that still have queued or leased jobs.
+
+        Returns:
+            list: (batch, inputs) pairs, most recently updated first
+        """
+        rows = self.db.execute(
+            "SELECT batch FROM jobs WHERE substr(batch, 1, ?) = ? GROUP BY batch "
+            "HAVING SUM(state IN ('queued', 'leased')) > 0 ORDER BY MAX(updated) DESC",
+            (len(prefix), prefix)).fetchall()
+        return [(row['batch'], [job['input'] for job in self.jobs(row['batch'])]) for row in rows]
+
+    def retry_failed(self, batch):
+        """Queue the batch's failed jobs again with fresh attempts."""
+        with self.transaction() as db:
+            return db.execute(
+                "UPDATE jobs SET state = 'queued', attempts = 0, error = NULL, updated = ? "
+                "WHERE batch = ? AND state = 'failed'", (time.time(), batch)).rowcount
+
+    def _release(self, db, rows, reason):
+        """Requeue leased rows, or fail the ones out of attempts."""
+        now = time.time()
+        for row in rows:
+            if row['attempts'] >= self.max_attempts:
+                db.execute("UPDATE jobs SET state = 'failed', lease_owner = NULL, lease_expires = NULL, "
+                           "error = ?, updated = ? WHERE id = ?",
+                           (f"{reason} after {row['attempts']} attempts", now, row['id']))
+            else:
+                db.execute("UPDATE jobs SET state = 'queued', lease_owner = NULL, lease_expires = NULL, "
+                           "updated = ? WHERE id = ?", (now, row['id']))
+        return len(rows)
+
+    def requeue_expired(self, batch=None):
+        """Return jobs whose lease expired to the queue; return how many."""
+        with self.transaction() as db:
+            return self._requeue_expired(db, batch)
+
+    def _requeue_expired(self, db, batch=None):
+        query = "SELECT id, attempts FROM jobs WHERE state = 'leased' AND lease_expires < ?"
+        args = [time.time()]
+        if batch is not None:
+            query += ' AND batch = ?'
+            args.append(batch)
+        return self._release(db, db.execute(query, args).fetchall(), 'Lease expired')
+
+    def requeue_orphans(self, batch=None):
+        """Return jobs leased by dead processes on this host to the queue; return how many."""
+        with self.transaction() as db:
+            query = "SELECT id, attempts, lease_owner FROM jobs WHERE state = 'leased'"
+            args = []
+            if batch is not None:
+                query += ' AND batch = ?'
+                args.append(batch)
+            orphans = [row for row in db.execute(query, args) if not owner_alive(row['lease_owner'])]
+            return self._release(db, orphans, 'Worker died')
+
+    def lease(self, batch, owner=None, lease_seconds=DEFAULT_LEASE_SECONDS, job_ids=None):
+        """
+        Atomically take the batch's oldest queued job.
+
+        Args:
+            job_ids (str): JSON list of job IDs to choose from (default: any in the batch)
+
+        Returns:
+            dict: The job (with ``params`` decoded), or None if none is queued
+        """
+        owner = owner or worker_id()
+        with self.transaction() as db:
+            self._requeue_expired(db, batch)
+            query, args = _only_jobs("SELECT id FROM jobs WHERE batch = ? AND state = 'queued'",
+                                     [batch], job_ids)
+            row = db.execute(query + ' ORDER BY id LIMIT 1', args).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            db.execute("UPDATE jobs SET state = 'leased', lease_owner = ?, lease_expires = ?, "
+                       "attempts = attempts + 1, updated = ? WHERE id = ?",
+                       (owner, now + lease_seconds, now, row['id']))
+            return self.get(row['id'])
+
+    def renew(self, job_id, owner, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Extend a lease still held by ``owner``; False if it was lost."""
+        cursor = self.db.execute(
+            "UPDATE jobs SET lease_expires = ?, updated = ? "
+            "WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+            (time.time() + lease_seconds, time.time(), job_id, owner))
+        return cursor.rowcount == 1
+
+    def finish(self, job_id, owner, result):
+        """Record a split_file result for a job still leased by ``owner``; False if the lease was lost."""
+        state = 'done' if result['status'] == 'done' else 'failed'
+        cursor = self.db.execute(
+            "UPDATE jobs SET state = ?, lease_owner = NULL, lease_expires = NULL, vocals = ?, "
+            "instrumental = ?, seconds = ?, duration = ?, error = ?, updated = ? "
+            "WHERE id = ? AND state = 'leased' AND lease_owner = ?",
+            (state, result['vocals'], result['instrumental'], result['seconds'],
+             result['duration'], result['error'], time.time(), job_id, owner))
+        return cursor.rowcount == 1
+
+    @contextmanager
+    def keep_leased(self, job_id, owner, lease_seconds=DEFAULT_LEASE_SECONDS):
+        """Renew a lease in the background for the duration of the block."""
+        stop = threading.Event()
+
+        def heartbeat():
+            # A separate connection, since sqlite3 connections are per thread
+            store = JobStore(self.path, self.max_attempts)
+            try:
+                while not stop.wait(lease_seconds / 3):
+                    store.renew(job_id, owner, lease_seconds)
+            finally:
+                store.close()
+
+        thread = threading.Thread(target=heartbeat, daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def get(self, job_id):
+        row = self.db.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return job_dict(row) if row else None
+
+    def jobs(self, batch):
+        return [job_dict(row) for row in
+                self.db.execute('SELECT * FROM jobs WHERE batch = ? ORDER BY id', (batch,))]
+
+    def counts(self, batch, job_ids=None):
+        """Number of the batch's jobs (or of ``job_ids``, as for lease) in each state."""
+        counts = dict.fromkeys(STATES, 0)
+        query, args = _only_jobs('SELECT state, COUNT(*) FROM jobs WHERE batch = ?', [batch], job_ids)
+        for state, count in self.db.execute(query + ' GROUP BY state', args):
+            counts[state] = count
+        return counts
+
+
+def _only_jobs(query, args, job_ids):
+    """Restrict a jobs query to a JSON list of job IDs, if one is given."""
+    if job_ids is None:
+        return query, args
+    return query + ' AND id IN (SELECT value FROM json_each(?))', args + [job_ids]
+
+
+def job_dict(row):
+    job = dict(row)
+    job['params'] = json.loads(job['params'])
+    return job
+
+
+def job_result(job):
+    """A job row in batch.split_file's result format (plus attempts)."""
+    return {
+        'input': job['input'],
+        'engine': job['engine'],
+        'status': job['state'] if job['state'] in ('done', 'failed') else 'failed',
+        'vocals': job['vocals'],
+        'instrumental': job['instrumental'],
+        'seconds': job['seconds'] or 0.0,
+        'duration': job['duration'],
+        'error': job['error'] if job['state'] in ('done', 'failed') else f"Job is {job['state']}",
+        'attempts': job['attempts'],
+    }
+
+
+def run_next_job(store_path, batch, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 job_ids=None):
+    """
+    Lease, run and record one job of a batch (of ``job_ids``, if given); runs
+    inside a worker process.
+
+    Returns:
+        dict: The job's result, or None if the batch has no queued jobs left
+    """
+    from batch import split_file
+
+    store = JobStore(store_path, max_attempts)
+    owner = worker_id()
+    try:
+        job = store.lease(batch, owner, lease_seconds, job_ids)
+        if job is None:
+            return None
+        with store.keep_leased(job['id'], owner, lease_seconds):
+            result = split_file(job['engine'], job['input'], job['params'].get('output_dir'),
+                                job['params'].get('use_cache'))
+        store.finish(job['id'], owner, result)
+        return dict(result, attempts=job['attempts'])
+    finally:
+        store.close()
+
+
+def run_stored_batch(store_path, files, engine, output_dir=None, workers=None, on_start=None,
+                     on_result=None, use_cache=None, batch=None, retry_failed=False,
+                     lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Split files like batch.run_batch, keeping every job's state in a job store.
+
+    Files already finished in an earlier run of the same batch are reported
+    through ``on_result`` without being split again, unless the input changed
+    or the stems were deleted since; jobs left leased by a
+    worker that died are requeued, and jobs leased by another live runner are
+    waited for. Arguments are as for batch.run_batch, plus:
+
+    Args:
+        store_path (str): SQLite job store (created if missing)
+        batch (str): Batch name (default: from the engine and output directory)
+        retry_failed (bool): Queue jobs that failed in an earlier run again
+        lease_seconds (float): How long a lease lasts without renewal
+        max_attempts (int): Leases a job gets before it is failed
+
+    Returns:
+        list: Result dicts in input order, each with its ``attempts``
+    """
+    from batch import ENGINES, BatchProgress, default_workers, output_dirs
+
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine} (choose from {', '.join(ENGINES)})")
+
+    files = list(dict.fromkeys(str(Path(f)) for f in files))
+    by_directory = {}
+    for f, directory in zip(files, output_dirs(files, output_dir)):
+        by_directory.setdefault(directory, []).append(f)
+    batch = batch or batch_name(engine, output_dir)
+    store = JobStore(store_path, max_attempts)
+    try:
+        for directory, group in by_directory.items():
+            store.add(batch, group, engine, {'output_dir': directory, 'use_cache': use_cache})
+        if retry_failed:
+            store.retry_failed(batch)
+        store.requeue_orphans(batch)
+
+        # Only this run's files: jobs other runs left queued in the batch stay queued
+        wanted = set(files)
+        jobs = [job for job in store.jobs(batch) if job['input'] in wanted]
+        job_ids = json.dumps([job['id'] for job in jobs])
+
+        progress = BatchProgress(len(jobs))
+        for job in jobs:
+            if job['state'] in ('done', 'failed'):
+                # Finished in an earlier run
+                result = job_result(job)
+                progress.update(result, skipped=True)
+                if on_result:
+                    on_result(result, progress)
+            elif on_start:
+                on_start(job['input'])
+
+        queued = store.counts(batch, job_ids)['queued']
+        workers = max(1, min(workers or default_workers(), queued or 1))
+        while True:
+            counts = store.counts(batch, job_ids)
+            if counts['queued']:
+                try:
+                    _run_workers(store_path, batch, workers, lease_seconds, max_attempts,
+                                 progress, on_result, job_ids)
+                except BrokenProcessPool:
+                    # A worker died mid-job (e.g. killed by the OS); its job goes back to the queue
+                    store.requeue_orphans(batch)
+            elif counts['leased']:
+                # Another runner is working on the same batch; wait for it or its leases to lapse
+                time.sleep(1)
+                store.requeue_expired(batch)
+                store.requeue_orphans(batch)
+            else:
+                break
+
+        by_input = {job['input']: job_result(job) for job in store.jobs(batch)}
+        return [by_input[f] for f in files]
+    finally:
+        store.close()
+
+
+def _run_workers(store_path, batch, workers, lease_seconds, max_attempts, progress, on_result, job_ids):
+    """Keep ``workers`` processes leasing ``job_ids`` until none of them is queued."""
+    from batch import process_pool
+
+    with process_pool(workers) as executor:
+        def start():
+            return executor.submit(run_next_job, store_path, batch, lease_seconds, max_attempts,
+                                   job_ids)
+
+        running = {start() for _ in range(workers)}
+        while running:
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                result = future.result()
+                if result is None:
+                    continue
+                progress.update(result)
+                if on_result:
+                    on_result(result, progress)
+                running.add(start())
@@ -0,0 +1,115 @@
+"""
+Split and download jobs shared by the worker daemon and the HTTP job API
+
+A job is a plain dict: ``{"op": "split", "input": path, "engine": ...}`` or
+``{"op": "download", "url": ..., "stream": false, "keep_original": true}``,
+both with optional ``output_dir`` and ``use_cache``. ``validate_job``
+normalises one from a request and ``JobRunner`` runs it on splitter and
+downloader instances that stay loaded between jobs.
+"""
+
+import threading
+from pathlib import Path
+
+JOB_OPS = ('split', 'download')
+
+# Engines built on librosa, which the warm-up prepares
+LIBROSA_ENGINES = ('librosa', 'advanced', 'hpss')
+
+# Fields a job may carry, with their defaults
+JOB_FIELDS = {
+    'split': {'input': None, 'engine': 'librosa', 'output_dir': None, 'use_cache': None},
+    'download': {'url': None, 'stream': False, 'keep_original': True, 'output_dir': None},
+}
+
+
+def validate_job(request):
+    """
+    Normalised job from a request dict.
+
+    The op may be given, or implied by an ``input`` (split) or ``url``
+    (download) field.
+
+    Raises:
+        ValueError: If the request does not describe a valid job
+    """
+    from batch import ENGINES
+
+    if not isinstance(request, dict):
+        raise ValueError("A job must be a JSON object")
+    op = request.get('op') or ('split' if 'input' in request else 'download' if 'url' in request else None)
+    if op not in JOB_OPS:
+        raise ValueError(f"Unknown op: {op!r} (choose from {', '.join(JOB_OPS)}, "
+                         f"or give 'input' or 'url')")
+
+    unknown = set(request) - set(JOB_FIELDS[op]) - {'op'}
+    if unknown:
+        raise ValueError(f"Unknown fields for a {op} job: {', '.join(sorted(unknown))}")
+
+    job = dict(JOB_FIELDS[op], **{k: v for k, v in request.items() if k != 'op'}, op=op)
+    if op == 'split':
+        if not job['input']:
+            raise ValueError("A split job needs an 'input' file path")
+        if job['engine'] not in ENGINES:
+            raise ValueError(f"Unknown engine: {job['engine']} (choose from {', '.join(ENGINES)})")
+        job['input'] = str(Path(job['input']).expanduser().resolve())
+    elif not job['url']:
+        raise ValueError("A download job needs a 'url'")
+    if job['output_dir']:
+        job['output_dir'] = str(Path(job['output_dir']).expanduser().resolve())
+    return job
+
+
+class JobRunner:
+    """Runs jobs on splitters and a downloader that are created once and reused."""
+
+    def __init__(self):
+        self._downloader = None
+        self._lock = threading.Lock()
+
+    def preload(self, engines=(), warm=None):
+        """
+        Load engines before the first job and warm up librosa.
+
+        By default the warm-up runs only if one of the engines uses librosa.
+        Returns the warm-up time in seconds, or None if it did not run.
+        """
+        from batch import get_splitter
+
+        for engine in engines:
+            get_splitter(engine)
+        if warm is None:
+            warm = any(engine in LIBROSA_ENGINES for engine in engines)
+        if warm:
+            from warmup import warm_up
+            return warm_up()
+        return None
+
+    def downloader(self):
+        with self._lock:
+            if self._downloader is None:
+                from youtube_downloader import YouTubeDownloader
+                self._downloader = YouTubeDownloader()
+            return self._downloader
+
+    def __call__(self, job):
+        """
+        Run a validated job and return its result fields.
+
+        Raises:
+            Exception: Whatever the engine or downloader raised
+        """
+        if job['op'] == 'split':
+            from batch import split_file
+            result = split_file(job['engine'], job['input'], job['output_dir'], job['use_cache'])
+            if result['status'] != 'done':
+                raise RuntimeError(result['error'])
+            return {key: result[key] for key in ('vocals', 'instrumental', 'duration')}
+
+        downloader = self.downloader()
+        if job['stream']:
+            vocals, instrumental = downloader.stream_and_split(job['url'], job['output_dir'])
+        else:
+            vocals, instrumental = downloader.download_and_split(
+                job['url'], job['output_dir'], keep_original=job['keep_original'])
+        return {'vocals': vocals, 'instrumental': instrumental}
@@ -8,13 +8,19 @@ with support for YouTube downloads.
 Usage:
     python main.py                    # Launch GUI
     python main.py --cli              # Use command line interface
+    python main.py --batch DIR        # Split many files in parallel
+    python main.py --serve            # Keep warm engines running for fast jobs
+    python main.py --api              # Local HTTP job API
     python main.py --help             # Show help
 """
 
+import os
 import sys
 import argparse
 from pathlib import Path
 
+from batch import ENGINES
+
 def main():
     """Main entry point for the Music Splitter application."""
     parser = argparse.ArgumentParser(
@@ -26,6 +32,12 @@ Examples:
     python main.py --cli                              # Command line mode
     python main.py --split audio.mp3                  # Split local file
     python main.py --youtube "https://youtube.com/..." # Download and split from YouTube
+    python main.py --batch music/ "live/**/*.flac" --workers 8 --manifest out.json
+    python main.py --file-list tracks.txt --engine enhanced --manifest out.csv
+    python main.py --batch music/ --job-store jobs.db  # Resumable batch
+    python main.py --serve &                          # Start the worker daemon
+    python main.py --use-daemon --split audio.mp3     # Split on the warm daemon
+    python main.py --api --port 8750 --workers 2      # HTTP job API on localhost
         """
     )
     
@@ -33,38 +45,83 @@ Examples:
                        help='Use command line interface instead of GUI')
     parser.add_argument('--split', metavar='FILE', 
                        help='Split audio file (CLI mode)')
-    parser.add_argument('--youtube', metavar='URL', 
-                       help='Download and split from YouTube URL (CLI mode)')
+    parser.add_argument('--youtube', metavar='URL', nargs='+',
+                       help='Download and split from YouTube video, playlist or channel URL(s) (CLI mode)')
+    parser.add_argument('--batch', metavar='PATH', nargs='+',
+                       help='Split files, directories or glob patterns in parallel (CLI mode)')
+    parser.add_argument('--file-list', metavar='FILE',
+                       help='Text file with one input path per line (batch mode)')
+    parser.add_argument('--recursive', '-r', action='store_true',
+                       help='Also search subdirectories of batch directories')
+    parser.add_argument('--engine', choices=list(ENGINES), default='librosa',
+                       help='Splitter engine for batch and daemon mode (default: librosa)')
+    parser.add_argument('--workers', '-j', type=int, metavar='N',
+                       help='Worker processes for batch mode (default: one per CPU), '
+                            'or jobs run at once by --serve (default: 1) and --api (default: 2)')
+    parser.add_argument('--manifest', metavar='FILE',
+                       help='Write batch results to a .json or .csv manifest')
+    parser.add_argument('--job-store', metavar='FILE',
+                       help='Keep batch job state in this SQLite file; re-running the batch '
+                            'resumes it, skipping finished files')
+    parser.add_argument('--retry-failed', action='store_true',
+                       help='With --job-store, retry files that failed in an earlier run')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Always recompute instead of reusing cached results')
+    # The precision module (and numpy) is only imported once work starts
+    parser.add_argument('--precision', choices=['float32', 'float64'],
+                       help='Floating-point precision for processing '
+                            '(default: $MUSIC_SPLITTER_PRECISION or float32)')
     parser.add_argument('--output', '-o', metavar='DIR',
                        help='Output directory for processed files')
     parser.add_argument('--keep-original', action='store_true',
-                       help='Keep original downloaded file (YouTube mode)')
+                       help='Keep original downloaded file (YouTube mode; otherwise it is deleted '
+                            'and dropped from the download cache)')
+    parser.add_argument('--stream', action='store_true',
+                       help='Decode YouTube audio while downloading, without saving the source (needs ffmpeg)')
     parser.add_argument('--info', action='store_true',
                        help='Show file/video information only')
+    parser.add_argument('--serve', action='store_true',
+                       help='Run a daemon that keeps the engines loaded and accepts jobs on a Unix socket')
+    parser.add_argument('--use-daemon', action='store_true',
+                       help='Send --split/--youtube jobs to the running daemon')
+    parser.add_argument('--socket', metavar='PATH',
+                       help='Daemon socket (default: ~/.cache/music_splitter/daemon.sock)')
+    parser.add_argument('--api', action='store_true',
+                       help='Run the HTTP job API on localhost')
+    parser.add_argument('--port', type=int, default=8750,
+                       help='Port for --api (default: 8750)')
+    parser.add_argument('--max-queue', type=int, default=32, metavar='N',
+                       help='Jobs --api queues before answering 429 (default: 32)')
     parser.add_argument('--version', action='version', version='Music Splitter 1.0')
     
     args = parser.parse_args()
+    if args.precision:
+        # Read when the precision module is imported, here and in every worker process
+        os.environ['MUSIC_SPLITTER_PRECISION'] = args.precision
+    
+    if args.serve:
+        run_daemon(args)
+        return
+    if args.api:
+        run_api(args)
+        return
+    
+    # Handle CLI mode (without importing tkinter)
+    if args.cli or args.split or args.youtube or args.batch or args.file_list:
+        run_cli_mode(args)
+        return
     
     # Check if GUI dependencies are available
-    gui_available = True
     try:
         import tkinter
     except ImportError:
-        gui_available = False
         print("⚠️  GUI not available (tkinter not installed)")
-        if not args.cli:
-            print("Switching to CLI mode...")
-            args.cli = True
-    
-    # Handle CLI mode
-    if args.cli or args.split or args.youtube:
+        print("Switching to CLI mode...")
+        args.cli = True
         run_cli_mode(args)
-    elif gui_available:
-        run_gui_mode()
-    else:
-        print("❌ Neither GUI nor CLI options specified, and GUI is not available.")
-        print("Use --help for usage information.")
-        sys.exit(1)
+        return
+    
+    run_gui_mode()
 
 def run_gui_mode():
     """Launch the GUI application."""
@@ -91,6 +148,13 @@ def run_gui_mode():
 def run_cli_mode(args):
     """Run in command line interface mode."""
     try:
+        if args.use_daemon:
+            run_daemon_client(args)
+            return
+        
+        from result_cache import set_cache_enabled
+        set_cache_enabled(not args.no_cache)
+        
         if args.split:
             # Split local file
             from audio_splitter_librosa import main as splitter_main
@@ -99,22 +163,33 @@ def run_cli_mode(args):
                 sys.argv.extend(['--output', args.output])
             if args.info:
                 sys.argv.append('--info')
+            if args.no_cache:
+                sys.argv.append('--no-cache')
             splitter_main()
             
         elif args.youtube:
             # Download and split from YouTube
             from youtube_downloader import main as youtube_main
-            sys.argv = ['youtube_downloader.py', '--url', args.youtube]
+            sys.argv = ['youtube_downloader.py', '--url', *args.youtube]
             if args.output:
                 sys.argv.extend(['--output', args.output])
             if args.keep_original:
                 sys.argv.append('--keep-original')
+            if args.stream:
+                sys.argv.append('--stream')
+            if args.no_cache:
+                sys.argv.append('--no-cache')
+            if args.manifest:
+                sys.argv.extend(['--manifest', args.manifest])
             if args.info:
                 sys.argv.append('--info')
             else:
                 sys.argv.append('--split')
             youtube_main()
             
+        elif args.batch or args.file_list:
+            run_batch_mode(args)
+            
         else:
             # Interactive CLI mode
             run_interactive_cli()
@@ -127,11 +202,128 @@ def run_cli_mode(args):
         print(f"❌ Error in CLI mode: {e}")
         sys.exit(1)
 
+def run_batch_mode(args):
+    """Split many files on a process pool and exit non-zero if any failed."""
+    from batch import collect_inputs, run_batch, write_manifest
+    
+    files, missing = collect_inputs(args.batch, args.file_list, args.recursive)
+    for path in missing:
+        print(f"⚠️  No audio files matched: {path}")
+    if not files:
+        print("❌ No input files found!")
+        sys.exit(1)
+    
+    print(f"🎵 Splitting {len(files)} files with the '{args.engine}' engine...")
+    
+    def report(result, progress):
+        mark = '✓' if result['status'] == 'done' else '✗'
+        print(f"{mark} [{progress.finished}/{progress.total}] {Path(result['input']).name}"
+              f"  ({result['seconds']:.1f}s)  {progress.summary()}")
+    
+    results = run_batch(files, args.engine, args.output, args.workers, on_result=report,
+                        use_cache=False if args.no_cache else None,
+                        job_store=args.job_store, retry_failed=args.retry_failed)
+    
+    if args.manifest:
+        path = write_manifest(results, args.manifest, engine=args.engine,
+                              workers=args.workers, output_dir=args.output)
+        print(f"📄 Manifest saved: {path}")
+    
+    failed = [r for r in results if r['status'] != 'done']
+    print(f"\n✓ {len(results) - len(failed)}/{len(results)} files split")
+    if failed or missing:
+        print(f"❌ {len(failed) + len(missing)} inputs failed:")
+        for path in missing:
+            print(f"  {path}: no audio files matched")
+        for result in failed:
+            print(f"  {result['input']}: {result['error']}")
+        sys.exit(1)
+
+def run_daemon(args):
+    """Keep the engines loaded and serve jobs on a Unix socket until stopped."""
+    from daemon import SplitDaemon
+    from result_cache import set_cache_enabled
+    
+    set_cache_enabled(not args.no_cache)
+    print(f"🚀 Starting Music Splitter daemon (loading the '{args.engine}' engine)...")
+    try:
+        server = SplitDaemon(args.socket, workers=args.workers or 1, preload=(args.engine,))
+    except (OSError, RuntimeError) as e:
+        print(f"❌ Could not start daemon: {e}")
+        sys.exit(1)
+    server.serve()
+
+def run_api(args):
+    """Serve the HTTP job API on localhost until stopped."""
+    from http_service import DEFAULT_API_WORKERS, JobService
+    from result_cache import set_cache_enabled
+    
+    set_cache_enabled(not args.no_cache)
+    try:
+        service = JobService(port=args.port, workers=args.workers or DEFAULT_API_WORKERS,
+                             max_queue=args.max_queue)
+    except OSError as e:
+        print(f"❌ Could not start the job API: {e}")
+        sys.exit(1)
+    
+    print(f"🚀 Loading the '{args.engine}' engine...")
+    service.runner.preload((args.engine,))
+    print(f"🌐 Job API listening on {service.url} ({service.workers} workers, "
+          f"up to {service.max_queue} queued jobs)")
+    service.serve_forever()
+    print("\n⏹️  Job API stopped")
+
+def run_daemon_client(args):
+    """Submit --split/--youtube jobs to the daemon, printing their progress as it arrives."""
+    from daemon import submit
+    
+    if args.split:
+        requests = [{'op': 'split', 'input': str(Path(args.split).resolve()), 'engine': args.engine}]
+    elif args.youtube:
+        requests = [{'op': 'download', 'url': url, 'stream': args.stream,
+                     'keep_original': args.keep_original} for url in args.youtube]
+    else:
+        print("❌ --use-daemon needs --split FILE or --youtube URL")
+        sys.exit(1)
+    
+    def report(event):
+        if event['event'] == 'progress':
+            print(f"   {event['message']}")
+        elif event['event'] == 'accepted' and event['waiting']:
+            print(f"⏳ Queued behind {event['waiting']} jobs")
+    
+    failed = 0
+    for request in requests:
+        if args.output:
+            request['output_dir'] = str(Path(args.output).resolve())
+        if args.no_cache:
+            request['use_cache'] = False
+        try:
+            result = submit(request, args.socket, on_event=report)
+        except ConnectionError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        
+        if result['event'] == 'done':
+            print(f"✓ Done in {result['seconds']:.2f}s")
+            print(f"  🎤 Vocals: {result['vocals']}")
+            print(f"  🎸 Instrumental: {result['instrumental']}")
+        else:
+            failed += 1
+            print(f"❌ {result['error']}")
+    
+    if failed:
+        sys.exit(1)
+
 def run_interactive_cli():
     """Run interactive command line interface."""
     print("🎵 Music Splitter - Interactive CLI Mode")
     print("=" * 50)
     
+    # Load the separation engine while the user is typing
+    from warmup import start_warm_up
+    start_warm_up()
+    
     while True:
         print("\nOptions:")
         print("1. Split local audio file")
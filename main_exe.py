@@ -6,7 +6,6 @@ Simplified main entry point that works without complex dependencies
 
 import sys
 import argparse
-import tkinter as tk
 from pathlib import Path
 
 def main():
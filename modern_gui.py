@@ -6,19 +6,32 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
 import os
+import uuid
 from pathlib import Path
 
-try:
-    from enhanced_audio_splitter import EnhancedAudioSplitter
-except ImportError:
-    from simple_audio_splitter import SimpleAudioSplitter as EnhancedAudioSplitter
 
-try:
-    from youtube_downloader import YouTubeDownloader
-except ImportError:
-    class YouTubeDownloader:
-        def download(self, url, output_dir):
-            raise Exception('YouTube downloader not available')
+class UnavailableDownloader:
+    def download(self, url, output_dir):
+        raise Exception('YouTube downloader not available')
+
+
+# The DSP and download backends are imported on first use (see the
+# audio_splitter and youtube_downloader properties), so the window paints
+# before scipy, numpy and yt-dlp have loaded
+def load_audio_splitter():
+    try:
+        from enhanced_audio_splitter import EnhancedAudioSplitter
+    except ImportError:
+        from simple_audio_splitter import SimpleAudioSplitter as EnhancedAudioSplitter
+    return EnhancedAudioSplitter()
+
+
+def load_youtube_downloader():
+    try:
+        from youtube_downloader import YouTubeDownloader
+        return YouTubeDownloader()
+    except ImportError:
+        return UnavailableDownloader()
 
 
 class MusicSplitterApp:
@@ -39,10 +52,34 @@ class MusicSplitterApp:
     
     def __init__(self, root):
         self.root = root
+        self._audio_splitter = None
+        self._youtube_downloader = None
+        self._backend_lock = threading.Lock()
         self.setup_window()
         self.create_ui()
-        self.audio_splitter = EnhancedAudioSplitter()
-        self.youtube_downloader = YouTubeDownloader()
+        threading.Thread(target=self._load_backends, daemon=True).start()
+    
+    def _load_backends(self):
+        try:
+            self.audio_splitter
+            self.youtube_downloader
+        except Exception:
+            # Reported by the task that needs the backend
+            pass
+    
+    @property
+    def audio_splitter(self):
+        with self._backend_lock:
+            if self._audio_splitter is None:
+                self._audio_splitter = load_audio_splitter()
+            return self._audio_splitter
+    
+    @property
+    def youtube_downloader(self):
+        with self._backend_lock:
+            if self._youtube_downloader is None:
+                self._youtube_downloader = load_youtube_downloader()
+            return self._youtube_downloader
         
     def setup_window(self):
         self.root.overrideredirect(True)
@@ -248,12 +285,24 @@ class MusicSplitterApp:
         self.batch_list.pack(fill=tk.BOTH, expand=True)
         
         self.batch_files = []
+        self.batch_labels = {}
+        self.batch_running = False
         
         btns = tk.Frame(cont, bg=self.BG_DARK)
         btns.pack(pady=10)
         
         self.btn(btns, ' Add Files', self.add_batch).pack(side=tk.LEFT, padx=5)
         self.btn(btns, ' Clear', self.clear_batch).pack(side=tk.LEFT, padx=5)
+        
+        tk.Label(btns, text='Workers', font=('Segoe UI', 10),
+                bg=self.BG_DARK, fg=self.TEXT_GRAY).pack(side=tk.LEFT, padx=(15,5))
+        cpus = os.cpu_count() or 1
+        self.workers_var = tk.IntVar(value=cpus)
+        tk.Spinbox(btns, from_=1, to=max(cpus * 2, 1), width=4,
+                  textvariable=self.workers_var,
+                  bg=self.BG_LIGHT, fg=self.TEXT_WHITE, buttonbackground=self.BG_LIGHT,
+                  relief='flat', font=('Segoe UI', 10)).pack(side=tk.LEFT, padx=(0,15))
+        
         self.accent_btn(btns, ' Process All', self.process_batch).pack(side=tk.LEFT, padx=5)
     
     def card(self, parent):
@@ -374,22 +423,58 @@ class MusicSplitterApp:
         try:
             od = Path('downloads')
             od.mkdir(exist_ok=True)
-            df = self.youtube_downloader.download(url, str(od))
             
-            if hasattr(self.audio_splitter, 'split_audio_enhanced'):
-                vp, ip = self.audio_splitter.split_audio_enhanced(df)
+            if hasattr(self.youtube_downloader, 'download_and_split_many'):
+                # Several URLs (or a playlist) are pipelined: files are split
+                # while the next ones are still downloading
+                urls = url.split()
+                # Downloads are m4a/webm, which the WAV-only splitters reject;
+                # the librosa engine decodes them itself
+                results = self.youtube_downloader.download_and_split_many(
+                    urls, str(od), engine='librosa',
+                    on_result=lambda r: self.root.after(0, self._download_split_progress, r))
+                self.root.after(0, self._download_split_many_done, results)
+                return
             else:
-                vp, ip = self.audio_splitter.split_audio_simple(df)
+                df = self.youtube_downloader.download(url, str(od))
+                
+                if hasattr(self.audio_splitter, 'split_audio_enhanced'):
+                    vp, ip = self.audio_splitter.split_audio_enhanced(df)
+                else:
+                    vp, ip = self.audio_splitter.split_audio_simple(df)
             
             self.root.after(0, self._download_split_done, vp, ip)
         except Exception as e:
             self.root.after(0, self._download_split_error, str(e))
     
+    def _download_split_progress(self, result):
+        mark = 'Split' if result['status'] == 'done' else 'Failed'
+        self.status(f"{mark}: {result['url']}")
+    
     def _download_split_done(self, vp, ip):
         self.yt_status.config(text=' Completed!', fg=self.SUCCESS_GREEN)
         self.status('YouTube download and split completed')
         messagebox.showinfo('Success', 'Download and split completed successfully!')
     
+    def _download_split_many_done(self, results):
+        done = [r for r in results if r['status'] == 'done']
+        failed = [r for r in results if r['status'] != 'done']
+        stems = '\n'.join(f"{Path(r['vocals']).name}, {Path(r['instrumental']).name}"
+                          for r in done[:10])
+        if len(done) > 10:
+            stems += f'\n... and {len(done) - 10} more'
+        if failed:
+            self.yt_status.config(text=f' {len(failed)} of {len(results)} failed', fg=self.ERROR_RED)
+            self.status(f'Split {len(results) - len(failed)}/{len(results)} downloads, {len(failed)} failed')
+            errors = '\n'.join(f"{r['url']}: {r['error']}" for r in failed[:10])
+            messagebox.showwarning('Download and split finished with errors',
+                                   f'{len(failed)} of {len(results)} URLs failed:\n{errors}'
+                                   + (f'\n\nSplit:\n{stems}' if stems else ''))
+        else:
+            self.yt_status.config(text=' Completed!', fg=self.SUCCESS_GREEN)
+            self.status(f'Downloaded and split {len(results)} files')
+            messagebox.showinfo('Success', f'Downloaded and split {len(results)} files:\n\n{stems}')
+    
     def _download_split_error(self, err):
         self.yt_status.config(text=' Failed', fg=self.ERROR_RED)
         self.status('Operation failed')
@@ -400,14 +485,56 @@ class MusicSplitterApp:
             title='Select Audio Files',
             filetypes=[('Audio Files', '*.mp3 *.wav *.flac *.m4a *.ogg'),
                       ('All Files', '*.*')])
-        for f in files:
-            if f not in self.batch_files:
-                self.batch_files.append(f)
-                self.batch_list.insert(tk.END, Path(f).name)
+        # Kept in the form the batch runner reports them in (native separators),
+        # so results find their rows
+        new_files = list(dict.fromkeys(str(Path(f)) for f in files))
+        new_files = [f for f in new_files if f not in self.batch_files]
+        for f in new_files:
+            self.batch_files.append(f)
+            self.batch_labels[f] = Path(f).name
+            self.batch_list.insert(tk.END, Path(f).name)
         self.status(f'Added {len(files)} files  Total: {len(self.batch_files)}')
+        if new_files:
+            threading.Thread(target=self._probe_batch_task, args=(new_files,), daemon=True).start()
+    
+    def _probe_batch_task(self, files):
+        # Headers only, probed concurrently, so large selections list quickly
+        try:
+            from audio_info import probe_audio_batch
+            infos = probe_audio_batch(files)
+        except ImportError:
+            return
+        self.root.after(0, self._show_batch_info, infos)
+    
+    def _show_batch_info(self, infos):
+        for i, fp in enumerate(self.batch_files):
+            info = infos.get(fp)
+            if info:
+                m, s = divmod(int(info['duration']), 60)
+                self.batch_labels[fp] = f'{Path(fp).name}  ({m}:{s:02d})'
+                self._set_batch_item(i, self.batch_labels[fp])
+    
+    def _set_batch_item(self, i, text, color=None):
+        self.batch_list.delete(i)
+        self.batch_list.insert(i, text)
+        self.batch_list.itemconfig(i, fg=color or self.TEXT_WHITE)
+    
+    def _set_batch_status(self, fp, state, detail=''):
+        fp = str(Path(fp))
+        if fp not in self.batch_files:
+            return
+        colors = {'queued': self.TEXT_GRAY, 'done': self.SUCCESS_GREEN, 'failed': self.ERROR_RED}
+        text = f'[{state}]  {self.batch_labels.get(fp, Path(fp).name)}'
+        if detail:
+            text += f'  {detail}'
+        self._set_batch_item(self.batch_files.index(fp), text, colors.get(state))
     
     def clear_batch(self):
+        if self.batch_running:
+            messagebox.showerror('Error', 'Batch processing is still running!')
+            return
         self.batch_files.clear()
+        self.batch_labels.clear()
         self.batch_list.delete(0, tk.END)
         self.status('Batch list cleared')
     
@@ -415,30 +542,82 @@ class MusicSplitterApp:
         if not self.batch_files:
             messagebox.showerror('Error', 'No files selected!')
             return
-        self.status(f'Processing {len(self.batch_files)} files...')
-        threading.Thread(target=self._batch_task, daemon=True).start()
+        if self.batch_running:
+            messagebox.showerror('Error', 'Batch processing is already running!')
+            return
+        try:
+            workers = max(1, int(self.workers_var.get()))
+        except (tk.TclError, ValueError):
+            messagebox.showerror('Error', 'Workers must be a whole number!')
+            return
+        
+        self.batch_running = True
+        batch_id = self._choose_batch_id(self.batch_files)
+        self.status(f'Processing {len(self.batch_files)} files with {workers} workers...')
+        threading.Thread(target=self._batch_task, args=(list(self.batch_files), workers, batch_id),
+                        daemon=True).start()
     
-    def _batch_task(self):
+    def _choose_batch_id(self, files):
+        # Every run is a new job-store batch; an interrupted run of the same
+        # files is resumed only if the user asks for it
+        wanted = {str(Path(f)) for f in files}
         try:
-            total = len(self.batch_files)
-            for i, fp in enumerate(self.batch_files):
-                self.root.after(0, self.status,
-                              f'Processing {i+1}/{total}: {Path(fp).name}')
-                
-                if hasattr(self.audio_splitter, 'split_audio_enhanced'):
-                    self.audio_splitter.split_audio_enhanced(fp)
-                else:
-                    self.audio_splitter.split_audio_simple(fp)
-            
-            self.root.after(0, self._batch_done, total)
+            from job_store import DEFAULT_JOB_STORE, JobStore
+            store = JobStore(DEFAULT_JOB_STORE)
+            try:
+                unfinished = store.unfinished_batches('gui:')
+            finally:
+                store.close()
+        except Exception:
+            unfinished = []
+        for batch_id, inputs in unfinished:
+            if set(inputs) == wanted:
+                if messagebox.askyesno('Resume batch',
+                                       'An earlier run of these files was interrupted.\n'
+                                       'Resume it and skip the files it already finished?'):
+                    return batch_id
+                break
+        return f'gui:{uuid.uuid4().hex}'
+    
+    def _batch_task(self, files, workers, batch_id):
+        # Each file is split in its own worker process; a failing file is
+        # reported on its row and the rest of the batch keeps going. Job state
+        # is kept in the job store, so an interrupted batch can be resumed
+        engine = 'enhanced' if hasattr(self.audio_splitter, 'split_audio_enhanced') else 'simple'
+        try:
+            from batch import run_batch
+            from job_store import DEFAULT_JOB_STORE
+            results = run_batch(
+                files, engine, workers=workers, job_store=DEFAULT_JOB_STORE, batch_id=batch_id,
+                on_start=lambda fp: self.root.after(0, self._set_batch_status, fp, 'queued'),
+                on_result=lambda result, progress: self.root.after(
+                    0, self._batch_progress, result, progress.summary()))
+            self.root.after(0, self._batch_done, results)
         except Exception as e:
             self.root.after(0, self._batch_error, str(e))
     
-    def _batch_done(self, total):
-        self.status(f' Processed {total} files successfully')
-        messagebox.showinfo('Success', f'Successfully processed {total} files!')
+    def _batch_progress(self, result, summary):
+        if result['status'] == 'done':
+            self._set_batch_status(result['input'], 'done', f"{result['seconds']:.1f}s")
+        else:
+            self._set_batch_status(result['input'], 'failed', result['error'])
+        self.status(summary)
+    
+    def _batch_done(self, results):
+        self.batch_running = False
+        failed = [r for r in results if r['status'] != 'done']
+        total = len(results)
+        if failed:
+            self.status(f' Processed {total - len(failed)}/{total} files, {len(failed)} failed')
+            names = '\n'.join(f"{Path(r['input']).name}: {r['error']}" for r in failed[:10])
+            messagebox.showwarning('Batch finished with errors',
+                                  f'{len(failed)} of {total} files failed:\n{names}')
+        else:
+            self.status(f' Processed {total} files successfully')
+            messagebox.showinfo('Success', f'Successfully processed {total} files!')
     
     def _batch_error(self, err):
+        self.batch_running = False
         self.status('Batch processing failed')
         messagebox.showerror('Error', f'Batch processing failed:\\n{err}')
 
@@ -0,0 +1,164 @@
+"""
+Streaming decode of remote or local media into float PCM through ffmpeg
+
+ffmpeg reads the source (a URL or a file path) and writes raw 32-bit float
+samples to a pipe, which is read in fixed-size blocks. The source is never
+written to disk and is decoded exactly once, at the requested sample rate.
+
+ffmpeg must be on PATH (or named by the FFMPEG_BINARY environment variable).
+"""
+
+import os
+import shutil
+import subprocess
+
+import numpy as np
+
+from precision import float_dtype
+
+# Frames read from the pipe at a time
+DEFAULT_BLOCK_FRAMES = 65536
+
+
+def ffmpeg_binary():
+    """Path of the ffmpeg executable, or None if it cannot be found."""
+    return os.environ.get('FFMPEG_BINARY') or shutil.which('ffmpeg')
+
+
+def ffmpeg_available():
+    return ffmpeg_binary() is not None
+
+
+def ffmpeg_command(source, sample_rate, channels=2, headers=None):
+    """ffmpeg arguments decoding ``source`` to interleaved float32 PCM on stdout."""
+    binary = ffmpeg_binary()
+    if binary is None:
+        raise RuntimeError("ffmpeg not found; install it or set FFMPEG_BINARY")
+
+    command = [binary, '-hide_banner', '-loglevel', 'error', '-nostdin']
+    if headers:
+        command += ['-headers', ''.join(f"{name}: {value}\r\n" for name, value in headers.items())]
+    command += ['-i', str(source), '-vn', '-f', 'f32le',
+                '-ac', str(channels), '-ar', str(int(sample_rate)), 'pipe:1']
+    return command
+
+
+def iter_pcm_blocks(source, sample_rate, channels=2, headers=None,
+                    block_frames=DEFAULT_BLOCK_FRAMES):
+    """
+    Decode ``source`` and yield float32 blocks of shape (frames, channels).
+
+    Raises:
+        RuntimeError: If ffmpeg is missing or fails to decode the source
+    """
+    frame_bytes = 4 * channels
+    process = subprocess.Popen(ffmpeg_command(source, sample_rate, channels, headers),
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        pending = b''
+        while True:
+            data = process.stdout.read(block_frames * frame_bytes)
+            if not data:
+                break
+            data = pending + data
+            usable = len(data) - len(data) % frame_bytes
+            pending = data[usable:]
+            if usable:
+                yield np.frombuffer(data[:usable], dtype='<f4').reshape(-1, channels)
+        error = process.stderr.read().decode(errors='replace').strip()
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg could not decode {source}: {error or 'unknown error'}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+
+def _probed_duration(source):
+    """Duration of a local file from its headers, or None for URLs and unreadable files."""
+    if not os.path.isfile(str(source)):
+        return None
+    try:
+        from audio_info import probe_audio
+        return probe_audio(source)['duration']
+    except (ImportError, OSError, RuntimeError, ValueError):
+        return None
+
+
+def _set_capacity(buffer, rows, filled, capacity):
+    """
+    Resize a flat buffer of ``rows`` equal rows, the first ``filled`` frames of
+    each in use, to rows of ``capacity`` frames.
+
+    The buffer is reallocated in place where the allocator allows and the rows
+    are moved within it, so the signal is never held twice.
+    """
+    old = buffer.size // rows
+    if capacity == old:
+        return
+    if capacity > old:
+        buffer.resize(rows * capacity, refcheck=False)
+        # Later rows move first, so none is overwritten before it has moved
+        order = range(rows - 1, 0, -1)
+    else:
+        order = range(1, rows)
+    for row in order:
+        buffer[row * capacity:row * capacity + filled] = buffer[row * old:row * old + filled]
+    if capacity < old:
+        buffer.resize(rows * capacity, refcheck=False)
+
+
+def decode_stream(source, sample_rate, channels=2, headers=None, mono=False,
+                  block_frames=DEFAULT_BLOCK_FRAMES, duration=None):
+    """
+    Decode ``source`` into a (channels, samples) array in the working precision.
+
+    With ``mono=True`` the channels are averaged into a 1-D signal, as
+    ``librosa.load`` does by default.
+
+    The output is allocated up front for ``duration`` seconds (by default a
+    local file's duration from its headers) and each block is written into
+    it, so peak memory is about the decoded signal itself. It grows if more
+    audio arrives than expected, or if the duration is unknown (URLs).
+    """
+    if duration is None:
+        duration = _probed_duration(source)
+    rows = 1 if mono else channels
+    # One block of slack, so a header duration rounded down needs no regrowth
+    capacity = int(np.ceil((duration or 0) * sample_rate)) + block_frames
+    buffer = np.empty(rows * capacity, dtype=float_dtype())
+    filled = 0
+
+    for block in iter_pcm_blocks(source, sample_rate, channels, headers, block_frames):
+        end = filled + len(block)
+        if end > capacity:
+            new_capacity = max(end, 2 * capacity)
+            _set_capacity(buffer, rows, filled, new_capacity)
+            capacity = new_capacity
+        buffer.reshape(rows, capacity)[:, filled:end] = block.mean(axis=1) if mono else block.T
+        filled = end
+
+    if not filled:
+        raise RuntimeError(f"No audio decoded from {source}")
+    _set_capacity(buffer, rows, filled, filled)
+    return buffer if mono else buffer.reshape(rows, filled)
+
+
+def load_audio(path, sample_rate=None):
+    """
+    Load a file as a mono signal, like ``librosa.load(path, sr=sample_rate)``.
+
+    With a ``sample_rate`` and ffmpeg available, the file is decoded and
+    resampled in one ffmpeg pass instead of being decoded at its own rate
+    and resampled afterwards.
+
+    Returns:
+        tuple: (signal, sample_rate)
+    """
+    if sample_rate and ffmpeg_available():
+        return decode_stream(path, sample_rate, mono=True), int(sample_rate)
+
+    import librosa
+    return librosa.load(str(path), sr=sample_rate, dtype=float_dtype())
@@ -0,0 +1,50 @@
+"""
+Floating-point precision policy shared by the separation engines
+
+All DSP stages work in float32/complex64 by default. float64/complex128
+can be opted into with ``set_precision('float64')`` or by setting the
+MUSIC_SPLITTER_PRECISION environment variable before startup.
+"""
+
+import os
+import numpy as np
+
+PRECISIONS = {
+    'float32': (np.dtype(np.float32), np.dtype(np.complex64)),
+    'float64': (np.dtype(np.float64), np.dtype(np.complex128)),
+}
+
+DEFAULT_PRECISION = 'float32'
+
+_precision = DEFAULT_PRECISION
+
+
+def set_precision(name):
+    """Select the working precision: 'float32' (default) or 'float64'."""
+    global _precision
+    if name not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {name} (choose from {', '.join(PRECISIONS)})")
+    _precision = name
+
+
+def get_precision():
+    """Name of the current working precision."""
+    return _precision
+
+
+def float_dtype():
+    """Real dtype used for time-domain samples, magnitudes and masks."""
+    return PRECISIONS[_precision][0]
+
+
+def complex_dtype():
+    """Complex dtype used for spectra."""
+    return PRECISIONS[_precision][1]
+
+
+def as_float(x):
+    """View or convert ``x`` to the working float dtype (no copy if it already matches)."""
+    return np.asarray(x, dtype=float_dtype())
+
+
+set_precision(os.environ.get('MUSIC_SPLITTER_PRECISION', DEFAULT_PRECISION))
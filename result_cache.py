@@ -0,0 +1,217 @@
+"""
+Content-addressed cache of split results
+
+Stems are stored under a key made from a hash of the input file's bytes,
+the engine name and the parameters that affect its output, so splitting
+the same audio again (under any file name) copies the stored stems instead
+of recomputing them. Each entry lives in its own directory with a small
+metadata file whose modification time records its last use; the least
+recently used entries are evicted once the cache grows past its size limit.
+
+The cache location and limit can be set with the MUSIC_SPLITTER_CACHE and
+MUSIC_SPLITTER_CACHE_MB environment variables; MUSIC_SPLITTER_NO_CACHE=1
+disables it, as does ``--no-cache`` on the command line.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from precision import get_precision
+
+# Bump when an engine's output changes so old entries are no longer hit
+CACHE_VERSION = 2
+
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'music_splitter'
+DEFAULT_CACHE_MB = 2048
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+META_FILE = 'entry.json'
+
+_enabled = os.environ.get('MUSIC_SPLITTER_NO_CACHE', '') in ('', '0')
+
+# (path, size, mtime) -> digest, so a file is hashed once per process
+_digests = {}
+
+
+def set_cache_enabled(enabled):
+    """Turn the result cache on or off for this process."""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def cache_enabled():
+    return _enabled
+
+
+def file_digest(file_path):
+    """BLAKE2b digest of a file's contents, memoised on its size and mtime."""
+    stat = os.stat(file_path)
+    memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    if memo_key not in _digests:
+        digest = hashlib.blake2b(digest_size=20)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+                digest.update(chunk)
+        _digests[memo_key] = digest.hexdigest()
+    return _digests[memo_key]
+
+
+class ResultCache:
+    """Size-bounded LRU store of output files keyed by input content and engine."""
+
+    def __init__(self, cache_dir=None, max_bytes=None):
+        if cache_dir is None:
+            cache_dir = os.environ.get('MUSIC_SPLITTER_CACHE') or DEFAULT_CACHE_DIR
+        if max_bytes is None:
+            max_bytes = int(os.environ.get('MUSIC_SPLITTER_CACHE_MB', DEFAULT_CACHE_MB)) * 1024 * 1024
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(digest, engine, params=None):
+        """Cache key for an input digest, engine name and output-affecting parameters."""
+        description = json.dumps({'version': CACHE_VERSION, 'input': digest,
+                                  'engine': engine, 'params': params or {}}, sort_keys=True)
+        return hashlib.blake2b(description.encode(), digest_size=20).hexdigest()
+
+    def _entry_dir(self, key):
+        return self.cache_dir / key[:2] / key
+
+    def get(self, key):
+        """Cached file paths for a key (marking it as recently used), or None."""
+        entry = self._entry_dir(key)
+        try:
+            with open(entry / META_FILE, encoding='utf-8') as f:
+                meta = json.load(f)
+            paths = [entry / name for name in meta['files']]
+            if not all(p.exists() for p in paths):
+                return None
+            os.utime(entry / META_FILE)
+            return paths
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def put(self, key, file_paths, **details):
+        """Store copies of ``file_paths`` under ``key`` and evict old entries if needed."""
+        entry = self._entry_dir(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+
+        # Build the entry in a scratch directory and move it into place in one
+        # step, so other processes never see a half-written entry
+        staging = Path(tempfile.mkdtemp(dir=entry.parent, prefix='.tmp-'))
+        try:
+            names = []
+            for i, file_path in enumerate(file_paths):
+                name = f"{i}{Path(file_path).suffix}"
+                shutil.copyfile(file_path, staging / name)
+                names.append(name)
+            meta = dict(details, files=names, created=time.time())
+            with open(staging / META_FILE, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, indent=2)
+            if entry.exists() and self.get(key) is None:
+                # Remove a damaged entry so it can be replaced
+                shutil.rmtree(entry, ignore_errors=True)
+            try:
+                os.replace(staging, entry)
+            except OSError:
+                # Another process stored the same result first
+                pass
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        self.evict()
+
+    def entries(self):
+        """(last_used, bytes, path) for every entry."""
+        found = []
+        for meta_path in self.cache_dir.glob(f'*/*/{META_FILE}'):
+            try:
+                entry = meta_path.parent
+                size = sum(p.stat().st_size for p in entry.iterdir())
+                found.append((meta_path.stat().st_mtime, size, entry))
+            except OSError:
+                continue
+        return found
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits its size limit."""
+        entries = sorted(self.entries(), key=lambda e: e[0])
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+def cached_split(engine, suffix=''):
+    """
+    Decorator that serves a split method's stems from the result cache.
+
+    The decorated method must take ``(input_path, output_dir=None, ...)``,
+    write ``<stem>_vocals<suffix>.wav`` and ``<stem>_instrumental<suffix>.wav``
+    (by default into ``split_output`` next to the input) and return both
+    paths. It also accepts ``use_cache=False`` to bypass the cache for one
+    call. Arguments other than the paths and ``sample_rate`` (passed by
+    keyword or position) are assumed not to change the output (e.g. block
+    sizes); the precision policy is part of the key.
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, input_path, output_dir=None, *args, use_cache=None, **kwargs):
+            if not (cache_enabled() if use_cache is None else use_cache):
+                return method(self, input_path, output_dir, *args, **kwargs)
+
+            try:
+                arguments = signature.bind(self, input_path, output_dir, *args, **kwargs).arguments
+            except TypeError:
+                # Bad arguments: let the method raise as usual
+                return method(self, input_path, output_dir, *args, **kwargs)
+
+            try:
+                cache = ResultCache()
+                params = {'precision': get_precision()}
+                if arguments.get('sample_rate'):
+                    params['sample_rate'] = int(arguments['sample_rate'])
+                key = cache.make_key(file_digest(input_path), engine, params)
+            except OSError:
+                # Unreadable input: let the method report it as usual
+                return method(self, input_path, output_dir, *args, **kwargs)
+
+            cached = cache.get(key)
+            if cached:
+                source = Path(input_path)
+                target_dir = Path(output_dir) if output_dir is not None else source.parent / "split_output"
+                target_dir.mkdir(exist_ok=True)
+                targets = [target_dir / f"{source.stem}_vocals{suffix}.wav",
+                           target_dir / f"{source.stem}_instrumental{suffix}.wav"]
+                for cached_path, target in zip(cached, targets):
+                    shutil.copyfile(cached_path, target)
+                print(f"✓ Using cached result for {source.name} ({engine})")
+                return str(targets[0]), str(targets[1])
+
+            outputs = method(self, input_path, output_dir, *args, **kwargs)
+            try:
+                cache.put(key, outputs, engine=engine, source=Path(input_path).name)
+            except OSError as e:
+                print(f"⚠️  Could not cache result: {e}")
+            return outputs
+
+        return wrapper
+    return decorator
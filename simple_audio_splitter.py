@@ -9,16 +9,26 @@ import wave
 import numpy as np
 from pathlib import Path
 import argparse
+from wav_io import open_wav
+from result_cache import cached_split, set_cache_enabled
+
+# Frames read per block when streaming (~1.5 s at 44.1 kHz)
+DEFAULT_BLOCK_FRAMES = 65536
 
 class SimpleAudioSplitter:
     def __init__(self):
         """Initialize simple audio splitter."""
         print("✓ Simple audio splitter initialized")
     
-    def split_audio_simple(self, input_path, output_dir=None):
+    @cached_split('simple')
+    def split_audio_simple(self, input_path, output_dir=None, block_frames=DEFAULT_BLOCK_FRAMES):
         """
         Simple vocal/instrumental separation using center/side technique.
         Works best with stereo files where vocals are centered.
+        
+        The input is processed in blocks of ``block_frames`` frames, so peak
+        memory does not grow with the length of the file. Pass ``None`` to
+        process the whole file as a single block.
         """
         try:
             input_path = Path(input_path)
@@ -41,68 +51,41 @@ class SimpleAudioSplitter:
             if input_path.suffix.lower() != '.wav':
                 raise ValueError("This simplified version only supports WAV files. Please convert your file to WAV format first.")
             
-            # Load WAV file
+            # Memory-map the WAV file and stream it block by block
             print("📖 Loading WAV file...")
-            with wave.open(str(input_path), 'rb') as wav_file:
-                frames = wav_file.readframes(-1)
-                sample_rate = wav_file.getframerate()
-                channels = wav_file.getnchannels()
-                sample_width = wav_file.getsampwidth()
+            with open_wav(input_path) as wav_file:
+                sample_rate = wav_file.sample_rate
+                total_frames = wav_file.frames
                 
-                if channels != 2:
+                if wav_file.channels != 2:
                     raise ValueError("This simplified version requires stereo (2-channel) WAV files.")
                 
-                # Convert to numpy array
-                if sample_width == 1:
-                    dtype = np.uint8
-                elif sample_width == 2:
-                    dtype = np.int16
-                elif sample_width == 4:
-                    dtype = np.int32
-                else:
-                    raise ValueError(f"Unsupported sample width: {sample_width}")
-                
-                audio_data = np.frombuffer(frames, dtype=dtype)
-                audio_data = audio_data.reshape(-1, 2)  # Reshape to stereo
-                
-                print("🔧 Separating audio using center/side technique...")
-                
-                # Simple center/side extraction
-                left = audio_data[:, 0].astype(np.float32)
-                right = audio_data[:, 1].astype(np.float32)
-                
-                # Center channel (vocals) - difference between channels
-                center = (left - right) / 2
-                
-                # Sides (instrumental) - average of channels
-                sides = (left + right) / 2
-                
-                # Normalize
-                center = np.clip(center, -32767, 32767).astype(np.int16)
-                sides = np.clip(sides, -32767, 32767).astype(np.int16)
+                if block_frames is None or block_frames <= 0:
+                    block_frames = max(total_frames, 1)
                 
                 # Generate output filenames
                 base_name = input_path.stem
                 vocal_path = output_dir / f"{base_name}_vocals.wav"
                 instrumental_path = output_dir / f"{base_name}_instrumental.wav"
                 
-                # Save separated tracks
-                print("💾 Saving separated tracks...")
-                
-                # Save vocals (mono)
-                with wave.open(str(vocal_path), 'w') as vocal_wav:
-                    vocal_wav.setnchannels(1)
-                    vocal_wav.setsampwidth(2)
-                    vocal_wav.setframerate(sample_rate)
-                    vocal_wav.writeframes(center.tobytes())
+                print("🔧 Separating audio using center/side technique...")
                 
-                # Save instrumental (mono)
-                with wave.open(str(instrumental_path), 'w') as inst_wav:
-                    inst_wav.setnchannels(1)
-                    inst_wav.setsampwidth(2)
-                    inst_wav.setframerate(sample_rate)
-                    inst_wav.writeframes(sides.tobytes())
+                # Both outputs are written as the input is read, so only one
+                # block of samples is ever held in memory
+                with wave.open(str(vocal_path), 'w') as vocal_wav, \
+                        wave.open(str(instrumental_path), 'w') as inst_wav:
+                    for out_wav in (vocal_wav, inst_wav):
+                        out_wav.setnchannels(1)
+                        out_wav.setsampwidth(2)
+                        out_wav.setframerate(sample_rate)
+                    
+                    for start in range(0, total_frames, block_frames):
+                        block = wav_file.data[start:start + block_frames]
+                        center, sides = self._split_block(block)
+                        vocal_wav.writeframes(center.tobytes())
+                        inst_wav.writeframes(sides.tobytes())
                 
+                print("💾 Saving separated tracks...")
                 print(f"✓ Vocal track saved: {vocal_path}")
                 print(f"✓ Instrumental track saved: {instrumental_path}")
                 
@@ -112,6 +95,28 @@ class SimpleAudioSplitter:
             print(f"✗ Error during audio splitting: {e}")
             raise e
     
+    @staticmethod
+    def _split_block(block):
+        """Compute the center and sides int16 signals for one (frames, 2) block of PCM samples."""
+        # Simple center/side extraction, converting the strided channel
+        # views straight into float32 results without separate copies
+        left = block[:, 0]
+        right = block[:, 1]
+        
+        # Center channel (vocals) - difference between channels
+        center = np.subtract(left, right, dtype=np.float32)
+        center /= 2
+        
+        # Sides (instrumental) - average of channels
+        sides = np.add(left, right, dtype=np.float32)
+        sides /= 2
+        
+        # Normalize
+        center = np.clip(center, -32767, 32767).astype(np.int16)
+        sides = np.clip(sides, -32767, 32767).astype(np.int16)
+        
+        return center, sides
+    
     def get_audio_info(self, file_path):
         """Get basic information about a WAV file."""
         try:
@@ -137,8 +142,13 @@ def main():
     parser.add_argument('--input', '-i', required=True, help='Input WAV file path')
     parser.add_argument('--output', '-o', help='Output directory (optional)')
     parser.add_argument('--info', action='store_true', help='Show audio file information')
+    parser.add_argument('--block-frames', type=int, default=DEFAULT_BLOCK_FRAMES,
+                       help='Frames processed per block (0 = whole file at once)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Always recompute instead of reusing cached results')
     
     args = parser.parse_args()
+    set_cache_enabled(not args.no_cache)
     
     try:
         splitter = SimpleAudioSplitter()
@@ -152,7 +162,9 @@ def main():
                 print(f"   Channels: {info['channels']}")
                 print(f"   Total Frames: {info['frames']}")
         
-        vocal_path, instrumental_path = splitter.split_audio_simple(args.input, args.output)
+        vocal_path, instrumental_path = splitter.split_audio_simple(
+            args.input, args.output, block_frames=args.block_frames
+        )
         
         print("\n🎉 Audio splitting completed successfully!")
         print("📂 Files created:")
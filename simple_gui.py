@@ -2,7 +2,6 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
 from pathlib import Path
-from simple_audio_splitter import SimpleAudioSplitter
 
 class SimpleMusicSplitterGUI:
     def __init__(self, root):
@@ -11,11 +10,19 @@ class SimpleMusicSplitterGUI:
         self.root.geometry("600x400")
         self.root.resizable(True, True)
         
-        self.splitter = SimpleAudioSplitter()
+        self._splitter = None
         self.current_file = None
         
         self.setup_ui()
     
+    @property
+    def splitter(self):
+        """The splitter, imported on first use so the window opens without numpy."""
+        if self._splitter is None:
+            from simple_audio_splitter import SimpleAudioSplitter
+            self._splitter = SimpleAudioSplitter()
+        return self._splitter
+    
     def setup_ui(self):
         """Create the user interface."""
         # Main frame
@@ -0,0 +1,414 @@
+"""
+Spectral building blocks shared by the librosa-based splitters
+"""
+
+import numpy as np
+import librosa
+import scipy.fft
+from numpy.lib.stride_tricks import sliding_window_view
+from precision import float_dtype
+
+# Upper bound on the temporary window buffer used by the median filter
+MEDIAN_BLOCK_BYTES = 32 * 1024 * 1024
+
+# STFT frames processed per block by the streaming engine (~24 s at 44.1 kHz)
+DEFAULT_STFT_BLOCK_FRAMES = 2048
+
+# librosa's STFT defaults, used throughout the splitters
+N_FFT = 2048
+HOP_LENGTH = 512
+
+
+def median_filter_1d(x, size, axis=-1):
+    """
+    Median filter along one axis with scipy.ndimage's 'reflect' edge mode.
+
+    Gives the same result as ``scipy.ndimage.median_filter`` with a kernel
+    that is 1 on every other axis, but selects the median of each window
+    with a vectorised ``np.partition`` over blocks of rows, which is several
+    times faster for the kernel sizes used by HPSS.
+    """
+    half = size // 2
+    moved = np.moveaxis(x, axis, -1)
+    rows = moved.reshape(-1, moved.shape[-1])
+    out = np.empty_like(rows)
+
+    n = rows.shape[-1]
+    block_rows = max(1, MEDIAN_BLOCK_BYTES // max(1, n * size * rows.itemsize))
+
+    for start in range(0, rows.shape[0], block_rows):
+        # 'symmetric' padding repeats the edge sample, like ndimage's 'reflect'
+        block = np.pad(rows[start:start + block_rows], ((0, 0), (half, size - 1 - half)),
+                       mode='symmetric')
+        windows = sliding_window_view(block, size, axis=-1)
+        out[start:start + block_rows] = np.partition(windows, half, axis=-1)[..., half]
+
+    return np.moveaxis(out.reshape(moved.shape), -1, axis)
+
+
+def iter_stft_blocks(y, process, block_frames=DEFAULT_STFT_BLOCK_FRAMES, context_frames=0,
+                     n_fft=N_FFT, hop_length=HOP_LENGTH, dtype=None, state=None):
+    """
+    Streaming STFT -> ``process`` -> ISTFT with overlap-add across block boundaries.
+
+    Produces the same samples as ``librosa.istft(process(librosa.stft(y)),
+    length=len(y))`` for centered, zero-padded, Hann-windowed STFTs (up to
+    rounding: every stage runs in the precision policy's dtypes, where
+    librosa windows in float64), while only ``block_frames + 2 *
+    context_frames`` frames of spectrogram exist at any time. The result does
+    not depend on ``block_frames``. ``y`` may be any array-like of shape
+    (..., samples), including a memory map.
+
+    Args:
+        y (np.ndarray): Input signal(s)
+        process (callable): Maps a complex block of shape (..., freq, frames)
+            to a complex block with the same trailing axes. It may add leading
+            axes (e.g. stack several outputs).
+        block_frames (int): STFT frames finalised per block
+        context_frames (int): Extra frames given to ``process`` on each side
+            of a block, for operations that look along time (e.g. a median
+            filter); only the central frames are kept
+        dtype: Output sample dtype (default: the precision policy's float dtype)
+        state (dict): Updated before each yield with the next block's frame and
+            the overlap-add tail carried into it; passing a saved copy resumes
+            after the last block yielded (see checkpoint.py)
+
+    Yields:
+        tuple: (start_sample, samples) with samples of shape (..., count)
+    """
+    if n_fft % hop_length:
+        raise ValueError("n_fft must be a multiple of hop_length for block overlap-add")
+
+    n = y.shape[-1]
+    lead = y.shape[:-1]
+    dtype = np.dtype(dtype or float_dtype())
+    pad = n_fft // 2
+    overlap = n_fft // hop_length
+    total_frames = 1 + n // hop_length
+    block_frames = max(1, int(block_frames))
+
+    window = librosa.filters.get_window('hann', n_fft, fftbins=True).astype(dtype)
+    window_sq = (window * window).reshape(overlap, hop_length)
+
+    carry = None
+    carry_norm = np.zeros((overlap - 1, hop_length), dtype=dtype)
+    first = 0
+    if state and 'frame' in state:
+        first, carry, carry_norm = int(state['frame']), state['carry'], state['carry_norm']
+
+    for t0 in range(first, total_frames, block_frames):
+        t1 = min(t0 + block_frames, total_frames)
+        a = max(0, t0 - context_frames)
+        b = min(total_frames, t1 + context_frames)
+
+        # Samples behind frames [a, b), zero-filled where they fall in the center padding
+        seg_start = a * hop_length - pad
+        seg_end = (b - 1) * hop_length + n_fft - pad
+        segment = np.zeros(lead + (seg_end - seg_start,), dtype=dtype)
+        src_start, src_end = max(0, seg_start), min(n, seg_end)
+        if src_end > src_start:
+            segment[..., src_start - seg_start:src_end - seg_start] = y[..., src_start:src_end]
+
+        # scipy.fft keeps float32 input in complex64 (numpy < 2 would promote)
+        frames_in = sliding_window_view(segment, n_fft, axis=-1)[..., ::hop_length, :]
+        S = np.swapaxes(scipy.fft.rfft(frames_in * window, axis=-1), -1, -2)
+        S_out = process(S)[..., t0 - a:t1 - a]
+        frames = t1 - t0
+
+        # Invert and window each frame, then split it into hop-sized pieces
+        ytmp = scipy.fft.irfft(np.swapaxes(S_out, -1, -2), n=n_fft, axis=-1)
+        ytmp *= window
+        pieces = ytmp.reshape(ytmp.shape[:-2] + (frames, overlap, hop_length))
+
+        if carry is None:
+            carry = np.zeros(pieces.shape[:-3] + (overlap - 1, hop_length), dtype=dtype)
+
+        acc = np.zeros(pieces.shape[:-3] + (frames + overlap - 1, hop_length), dtype=dtype)
+        acc[..., :overlap - 1, :] = carry
+        norm = np.zeros((frames + overlap - 1, hop_length), dtype=dtype)
+        norm[:overlap - 1] = carry_norm
+
+        # Add frames in increasing order per sample, as librosa's overlap-add does
+        for k in reversed(range(overlap)):
+            acc[..., k:k + frames, :] += pieces[..., k, :]
+            norm[k:k + frames] += window_sq[k]
+
+        done = frames if t1 < total_frames else frames + overlap - 1
+        carry = acc[..., done:, :]
+        carry_norm = norm[done:]
+        if state is not None:
+            state.update(frame=t1, carry=carry, carry_norm=carry_norm)
+
+        out = acc[..., :done, :].reshape(acc.shape[:-2] + (done * hop_length,))
+        out_norm = norm[:done].reshape(-1)
+        nonzero = out_norm > librosa.util.tiny(out_norm)
+        out[..., nonzero] /= out_norm[nonzero]
+
+        # Map padded positions back to the signal and drop the padding
+        start = t0 * hop_length - pad
+        lo = max(0, -start)
+        hi = min(out.shape[-1], n - start)
+        if hi > lo:
+            yield start + lo, out[..., lo:hi]
+
+
+def process_stft(y, process, block_frames=DEFAULT_STFT_BLOCK_FRAMES, context_frames=0,
+                 n_fft=N_FFT, hop_length=HOP_LENGTH, dtype=None):
+    """Run ``iter_stft_blocks`` and collect the result into one array of shape (..., samples)."""
+    result = None
+    for start, samples in iter_stft_blocks(y, process, block_frames, context_frames,
+                                           n_fft, hop_length, dtype):
+        if result is None:
+            result = np.zeros(samples.shape[:-1] + (y.shape[-1],), dtype=samples.dtype)
+        result[..., start:start + samples.shape[-1]] = samples
+    return result
+
+
+def apply_gains(S, gains, out=None):
+    """
+    Apply real gains to a complex spectrogram by broadcasting, one output per gain.
+
+    Args:
+        S (np.ndarray): Complex spectrogram of shape (..., freq, frames)
+        gains (sequence): Gain arrays, each either per-bin with shape (freq,)
+            or per-bin-per-frame, broadcastable to ``S``
+        out (np.ndarray): Optional preallocated buffer of shape (len(gains),) + S.shape
+
+    Returns:
+        np.ndarray: ``out`` holding ``S * gains[i]`` in ``out[i]``
+    """
+    if out is None:
+        out = np.empty((len(gains),) + S.shape, dtype=S.dtype)
+
+    for i, gain in enumerate(gains):
+        gain = np.asarray(gain, dtype=float_dtype())
+        if gain.ndim == 1:
+            gain = gain[:, np.newaxis]
+        np.multiply(S, gain, out=out[i])
+
+    return out
+
+
+class SpectralMasker:
+    """
+    ``process`` callable for the block STFT engine that applies fixed gains.
+
+    The output buffer is allocated once and reused for every block of the
+    same shape, so each block costs the STFT itself plus this one buffer;
+    magnitude, phase and masks are never materialised. The engine consumes
+    each block's output before requesting the next, so reuse is safe there.
+    """
+
+    def __init__(self, gains):
+        self.gains = [np.asarray(gain, dtype=float_dtype()) for gain in gains]
+        self._out = None
+
+    def __call__(self, S):
+        shape = (len(self.gains),) + S.shape
+        if self._out is None or self._out.shape != shape or self._out.dtype != S.dtype:
+            self._out = np.empty(shape, dtype=S.dtype)
+        return apply_gains(S, self.gains, out=self._out)
+
+
+def normalize_peak(y):
+    """
+    Scale ``y`` in place so its peak absolute value is 1.
+
+    Same result as ``librosa.util.normalize`` for 1-D signals, without
+    allocating a magnitude copy or a new output array.
+    """
+    if y.size == 0:
+        return y
+    peak = max(y.max(), -y.min())
+    if peak >= librosa.util.tiny(y):
+        y /= y.dtype.type(peak)
+    return y
+
+
+class FrameEnergy:
+    """
+    Per-hop sums of squares of a signal, fed in pieces of any size.
+
+    ``trim_bounds`` uses them to find the loudest frames without framing the
+    whole signal; a producer can update one while it streams its output and
+    hand it over instead of having the signal read again.
+    """
+
+    def __init__(self, hop_length=HOP_LENGTH):
+        self.hop_length = hop_length
+        self.length = 0
+        self._sums = []
+        self._tail = None
+
+    def update(self, samples):
+        samples = np.asarray(samples)
+        self.length += samples.shape[-1]
+        if self._tail is not None and self._tail.size:
+            samples = np.concatenate([self._tail, samples])
+        whole = samples.shape[-1] // self.hop_length * self.hop_length
+        hops = samples[:whole].reshape(-1, self.hop_length)
+        self._sums.append(np.einsum('ij,ij->i', hops, hops))
+        self._tail = samples[whole:]
+
+    def hop_sums(self):
+        sums = list(self._sums)
+        if self._tail is not None and self._tail.size:
+            sums.append(np.atleast_1d(np.dot(self._tail, self._tail)))
+        return np.concatenate(sums) if sums else np.zeros(0)
+
+
+def frame_rms(y, start, stop, frame_length=N_FFT, hop_length=HOP_LENGTH):
+    """
+    ``librosa.feature.rms`` of centered frames [start, stop) of a 1-D signal.
+
+    Only the samples behind those frames are read, and the values are
+    computed exactly as librosa computes them for the whole signal.
+    """
+    pad = frame_length // 2
+    seg_start = start * hop_length - pad
+    seg_end = (stop - 1) * hop_length + frame_length - pad
+    segment = np.zeros(seg_end - seg_start, dtype=y.dtype)
+    src_start, src_end = max(0, seg_start), min(y.shape[-1], seg_end)
+    if src_end > src_start:
+        segment[src_start - seg_start:src_end - seg_start] = y[src_start:src_end]
+    return librosa.feature.rms(y=segment, frame_length=frame_length, hop_length=hop_length,
+                               center=False)[0]
+
+
+# Frames whose hop-sum energy is this close to the largest are checked exactly;
+# far above the rounding error of either computation
+TRIM_CANDIDATE_TOLERANCE = 1e-3
+
+# Samples read per block by the energy pass, and frames per block by the edge scan
+TRIM_READ_BLOCK = 1 << 20
+TRIM_SCAN_FRAMES = 256
+
+
+def trim_bounds(y, top_db=60, frame_length=N_FFT, hop_length=HOP_LENGTH, energy=None):
+    """
+    ``librosa.effects.trim(y, top_db=top_db)[1]`` without framing the whole signal.
+
+    librosa measures every frame's RMS against the loudest one. Here a single
+    cheap pass of per-hop sums of squares (or a FrameEnergy the caller
+    already filled) locates the loudest frames, whose exact RMS gives the
+    same reference level, and then frames are measured exactly only from
+    each end inward until the first non-silent one. The signal (1-D, any
+    array-like such as a memory map) is read in blocks.
+
+    Returns:
+        tuple: (start, end) sample bounds of the non-silent region
+    """
+    pad_hops, rem = divmod(frame_length // 2, hop_length)
+    if y.ndim != 1 or rem or frame_length % hop_length:
+        return tuple(int(i) for i in librosa.effects.trim(
+            np.asarray(y), top_db=top_db, frame_length=frame_length, hop_length=hop_length)[1])
+
+    n = y.shape[-1]
+    if energy is None:
+        energy = FrameEnergy(hop_length)
+        for i in range(0, n, TRIM_READ_BLOCK):
+            energy.update(y[i:i + TRIM_READ_BLOCK])
+
+    # Frame energies from hop sums, with the centering pad as empty hops
+    total_frames = 1 + n // hop_length
+    frame_hops = frame_length // hop_length
+    hops = energy.hop_sums()
+    padded = np.zeros(total_frames + frame_hops - 1, dtype=hops.dtype)
+    count = min(len(hops), len(padded) - pad_hops)
+    padded[pad_hops:pad_hops + count] = hops[:count]
+    frame_energy = sliding_window_view(padded, frame_hops).sum(axis=-1)
+
+    # Reference: the exact RMS of the loudest frames
+    loudest = frame_energy.max()
+    if loudest > 0:
+        candidates = np.flatnonzero(frame_energy >= loudest * (1 - TRIM_CANDIDATE_TOLERANCE))
+    else:
+        # Silent throughout: every frame's RMS is exactly zero
+        candidates = np.zeros(1, dtype=int)
+    runs = np.split(candidates, np.flatnonzero(np.diff(candidates) > 1) + 1)
+    ref = max(frame_rms(y, run[0], run[-1] + 1, frame_length, hop_length).max() for run in runs)
+
+    def non_silent(start, stop):
+        rms = frame_rms(y, start, stop, frame_length, hop_length)
+        return np.flatnonzero(librosa.amplitude_to_db(rms, ref=ref, top_db=None) > -top_db) + start
+
+    first = None
+    for start in range(0, total_frames, TRIM_SCAN_FRAMES):
+        found = non_silent(start, min(start + TRIM_SCAN_FRAMES, total_frames))
+        if found.size:
+            first = found[0]
+            break
+    if first is None:
+        return 0, 0
+
+    last = first
+    for stop in range(total_frames, first, -TRIM_SCAN_FRAMES):
+        found = non_silent(max(first, stop - TRIM_SCAN_FRAMES), stop)
+        if found.size:
+            last = found[-1]
+            break
+
+    return int(first * hop_length), min(n, int((last + 1) * hop_length))
+
+
+def trim_silence(y, top_db=60, frame_length=N_FFT, hop_length=HOP_LENGTH, energy=None):
+    """Same result as ``librosa.effects.trim``, found with ``trim_bounds``."""
+    start, end = trim_bounds(y, top_db, frame_length, hop_length, energy)
+    return y[..., start:end], np.asarray([start, end])
+
+
+def hpss_masks(S, kernel_size=31, power=2.0, margin=1.0):
+    """
+    Harmonic and percussive soft masks for a spectrogram, as in ``librosa.decompose.hpss``.
+
+    ``S`` may be complex or magnitude and have any number of leading
+    (channel) axes; all channels are processed in one batched call.
+    """
+    magnitude = np.abs(S)
+
+    harm = median_filter_1d(magnitude, kernel_size, axis=-1)
+    perc = median_filter_1d(magnitude, kernel_size, axis=-2)
+
+    split_zeros = margin == 1
+    mask_harm = librosa.util.softmask(harm, perc * margin, power=power, split_zeros=split_zeros)
+    mask_perc = librosa.util.softmask(perc, harm * margin, power=power, split_zeros=split_zeros)
+
+    return mask_harm, mask_perc
+
+
+def hpss(y, kernel_size=31, power=2.0, margin=1.0, block_frames=DEFAULT_STFT_BLOCK_FRAMES):
+    """Harmonic-percussive separation of a signal; drop-in for ``librosa.effects.hpss``."""
+    def separate(S):
+        return apply_gains(S, hpss_masks(S, kernel_size, power, margin))
+
+    # The harmonic median filter looks kernel_size // 2 frames either way along time
+    y_harm, y_perc = process_stft(y, separate, block_frames, context_frames=kernel_size // 2)
+
+    return y_harm, y_perc
+
+
+def hpss_select(y, keep, kernel_size=31, power=2.0, margin=1.0, block_frames=DEFAULT_STFT_BLOCK_FRAMES):
+    """
+    Batched HPSS that only inverts the components that are needed.
+
+    Args:
+        y (np.ndarray): Signals of shape (channels, samples)
+        keep (sequence): 'harmonic' or 'percussive' for each channel
+
+    Returns:
+        np.ndarray: The selected component of each channel, shape (channels, samples)
+    """
+    if len(keep) != y.shape[0]:
+        raise ValueError(f"Expected {y.shape[0]} components to keep, got {len(keep)}")
+    for component in keep:
+        if component not in ('harmonic', 'percussive'):
+            raise ValueError(f"Unknown HPSS component: {component}")
+
+    def separate(S):
+        # One STFT for every channel, then one batched median/mask pass
+        mask_harm, mask_perc = hpss_masks(S, kernel_size, power, margin)
+        for channel, component in enumerate(keep):
+            S[channel] *= mask_harm[channel] if component == 'harmonic' else mask_perc[channel]
+        return S
+
+    return process_stft(y, separate, block_frames, context_frames=kernel_size // 2)
@@ -0,0 +1,75 @@
+"""
+Lazily evaluated pipeline stages
+
+A ``Stages`` object maps names to stage functions. A stage runs the first
+time its value is requested, pulling in the stages it reads, and its result
+is kept for later requests. Stages that no requested output depends on never
+run. Every run is counted on the object and process-wide (``stage_counts``),
+so tests and benchmarks can check exactly which stages did work.
+
+    stages = Stages(signal=y)
+    stages.add('hpss', lambda s: hpss(s['signal']))
+    stages.add('harmonic', lambda s: s['hpss'][0])
+    harmonic = stages['harmonic']      # runs 'hpss', then 'harmonic'
+"""
+
+import threading
+from collections import Counter
+
+_counts = Counter()
+_counts_lock = threading.Lock()
+
+
+def stage_counts():
+    """Process-wide number of runs of each stage name."""
+    with _counts_lock:
+        return Counter(_counts)
+
+
+def reset_stage_counts():
+    with _counts_lock:
+        _counts.clear()
+
+
+class Stages:
+    """Named stages, each computed on first use and then kept."""
+
+    def __init__(self, **inputs):
+        """
+        Args:
+            **inputs: Values available as already computed stages
+        """
+        self._values = dict(inputs)
+        self._functions = {}
+        self._running = set()
+        self.runs = Counter()
+
+    def add(self, name, function):
+        """Register ``function(stages)`` as the stage ``name``."""
+        self._functions[name] = function
+        return self
+
+    def __contains__(self, name):
+        return name in self._values or name in self._functions
+
+    def computed(self, name):
+        return name in self._values
+
+    def __getitem__(self, name):
+        if name in self._values:
+            return self._values[name]
+        if name not in self._functions:
+            raise KeyError(f"Unknown stage: {name}")
+        if name in self._running:
+            raise RuntimeError(f"Stage {name} depends on itself")
+
+        self._running.add(name)
+        try:
+            value = self._functions[name](self)
+        finally:
+            self._running.discard(name)
+        self._values[name] = value
+        self.runs[name] += 1
+        with _counts_lock:
+            _counts[name] += 1
+        return value
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Checks that batch outputs never overwrite each other
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the current directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from batch import output_dirs, run_batch
+from benchmark import create_test_wav
+
+
+def test_same_names_are_mirrored_under_the_output_dir(tmp_path):
+    files = []
+    for folder in ('a', 'b'):
+        (tmp_path / folder).mkdir()
+        files.append(create_test_wav(tmp_path / folder / 'song.wav', 0.01))
+    out = tmp_path / 'out'
+
+    results = run_batch(files, 'simple', out, workers=1, use_cache=False)
+
+    assert [r['status'] for r in results] == ['done', 'done']
+    assert [Path(r['vocals']) for r in results] == [out / 'a' / 'song_vocals.wav',
+                                                    out / 'b' / 'song_vocals.wav']
+
+
+def test_one_directory_goes_straight_into_the_output_dir(tmp_path):
+    files = [tmp_path / 'x.wav', tmp_path / 'y.flac']
+    assert output_dirs(files, tmp_path / 'out') == [str(tmp_path / 'out')] * 2
+    assert output_dirs(files) == [None, None]
+
+
+@pytest.mark.parametrize('output_dir', [None, 'out'])
+def test_inputs_writing_the_same_stems_are_rejected(tmp_path, output_dir):
+    files = [tmp_path / 'song.wav', tmp_path / 'song.mp3']
+    with pytest.raises(ValueError, match='song.mp3'):
+        output_dirs(files, output_dir and tmp_path / output_dir)
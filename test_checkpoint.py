@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Checks that interrupted long separations resume from their checkpoint with identical stems
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the current directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import checkpoint
+import enhanced_audio_splitter
+from audio_splitter_librosa import AudioSplitter
+from benchmark import create_test_wav
+from enhanced_audio_splitter import EnhancedAudioSplitter
+from spectral import SpectralMasker
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.setenv('MUSIC_SPLITTER_CHECKPOINTS', str(tmp_path / 'checkpoints'))
+    # Save state after every block
+    monkeypatch.setattr(checkpoint, 'CHECKPOINT_INTERVAL', 0)
+    return create_test_wav(tmp_path / 'long.wav', 0.5)
+
+
+def crash_after(calls, function):
+    """Wrap ``function`` to raise on call number ``calls + 1``, counting calls."""
+    def wrapper(*args, **kwargs):
+        wrapper.calls += 1
+        if wrapper.calls > calls:
+            raise MemoryError("simulated crash")
+        return function(*args, **kwargs)
+    wrapper.calls = 0
+    return wrapper
+
+
+def test_advanced_resumes_with_identical_stems(source, tmp_path, monkeypatch):
+    splitter = AudioSplitter()
+    expected = splitter.split_audio_advanced(source, tmp_path / 'full', block_frames=256,
+                                             use_cache=False, checkpoint=False)
+
+    masker_call = SpectralMasker.__call__
+    monkeypatch.setattr(SpectralMasker, '__call__', crash_after(3, masker_call))
+    with pytest.raises(MemoryError):
+        splitter.split_audio_advanced(source, tmp_path / 'resumed', block_frames=256,
+                                      use_cache=False, checkpoint=True)
+
+    resumed_call = crash_after(float('inf'), masker_call)
+    monkeypatch.setattr(SpectralMasker, '__call__', resumed_call)
+    resumed = splitter.split_audio_advanced(source, tmp_path / 'resumed', block_frames=256,
+                                            use_cache=False, checkpoint=True)
+
+    # 0.5 min at 44.1 kHz is 2584 frames, 11 blocks; the first three were kept
+    assert resumed_call.calls == 8
+    for a, b in zip(expected, resumed):
+        assert Path(a).read_bytes() == Path(b).read_bytes()
+    assert not any((tmp_path / 'checkpoints').iterdir())
+
+
+def test_enhanced_resumes_with_identical_stems(source, tmp_path, monkeypatch):
+    splitter = EnhancedAudioSplitter()
+    expected = splitter.split_audio_enhanced(source, tmp_path / 'full', use_cache=False,
+                                             checkpoint=False)
+
+    # Three blocks per spectral subtraction pass: crash in the second pass's second block
+    irfft = enhanced_audio_splitter.irfft
+    monkeypatch.setattr(enhanced_audio_splitter, 'irfft', crash_after(4, irfft))
+    with pytest.raises(MemoryError):
+        splitter.split_audio_enhanced(source, tmp_path / 'resumed', use_cache=False,
+                                      checkpoint=True)
+
+    resumed_irfft = crash_after(float('inf'), irfft)
+    monkeypatch.setattr(enhanced_audio_splitter, 'irfft', resumed_irfft)
+    resumed = splitter.split_audio_enhanced(source, tmp_path / 'resumed', use_cache=False,
+                                            checkpoint=True)
+
+    assert resumed_irfft.calls == 2
+    for a, b in zip(expected, resumed):
+        assert Path(a).read_bytes() == Path(b).read_bytes()
+
+
+def test_concurrent_split_does_not_share_the_checkpoint(source, tmp_path):
+    first = checkpoint.open_checkpoint(True, source, 'advanced', 30)
+    stems = first.array('stems', (2, 8), 'float32')
+    stems[:] = 1
+
+    # Same file and parameters while the first split holds the checkpoint
+    assert checkpoint.open_checkpoint(True, source, 'advanced', 30) is None
+
+    first.save('stems', stems, {'block': 1}, force=True)
+    first.close()
+    second = checkpoint.open_checkpoint(True, source, 'advanced', 30)
+    assert second.state('stems') == {'block': 1}
+    assert second.array('stems', (2, 8), 'float32').sum() == 16
+
+    second.remove()
+    assert not any((tmp_path / 'checkpoints').iterdir())
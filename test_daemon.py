@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Checks for the Unix socket split daemon and its client
+"""
+
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add the current directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark import create_test_wav
+from daemon import SplitDaemon, ping, submit
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason="needs Unix domain sockets")
+
+
+@pytest.fixture
+def daemon():
+    # Socket paths are limited to ~100 characters, so avoid deep pytest temp dirs
+    with tempfile.TemporaryDirectory(prefix='ms-') as tmp:
+        server = SplitDaemon(Path(tmp) / 'daemon.sock', preload=('simple',), warm=False)
+        thread = threading.Thread(target=server.serve, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        thread.join(timeout=5)
+
+
+def test_split_job_streams_progress(daemon, tmp_path):
+    source = create_test_wav(tmp_path / 'clip.wav', 0.01)
+    events = []
+
+    result = submit({'op': 'split', 'input': str(source), 'engine': 'simple',
+                     'output_dir': str(tmp_path / 'out'), 'use_cache': False},
+                    daemon.socket_path, on_event=events.append)
+
+    assert result['event'] == 'done'
+    assert Path(result['vocals']).is_file() and Path(result['instrumental']).is_file()
+    assert events[0]['event'] == 'accepted'
+    assert any(e['event'] == 'progress' for e in events)
+
+
+def test_failed_and_invalid_jobs_report_errors(daemon, tmp_path):
+    missing = submit({'op': 'split', 'input': str(tmp_path / 'missing.wav'), 'engine': 'simple'},
+                     daemon.socket_path)
+    assert missing['event'] == 'error'
+
+    assert submit({'op': 'explode'}, daemon.socket_path)['event'] == 'error'
+    assert ping(daemon.socket_path)
+
+
+def test_client_without_daemon_fails_clearly(tmp_path):
+    with pytest.raises(ConnectionError):
+        submit({'op': 'ping'}, tmp_path / 'none.sock')
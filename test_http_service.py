@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Checks for the local HTTP job API
+"""
+
+import json
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+# Add the current directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark import create_test_wav
+from http_service import JobService
+
+
+def call(service, method, path, body=None, headers=None):
+    """(status, headers, JSON body) of a request to the service."""
+    data = json.dumps(body).encode() if body is not None else None
+    if method == 'POST':
+        headers = dict({'Content-Type': 'application/json'}, **(headers or {}))
+    request = urllib.request.Request(service.url + path, data=data, method=method,
+                                     headers=headers or {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, response.headers, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, json.load(e)
+
+
+def wait_for(service, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        _, _, job = call(service, 'GET', f'/jobs/{job_id}')
+        if job['status'] in ('done', 'failed', 'cancelled'):
+            return job
+        time.sleep(0.05)
+    raise TimeoutError(f"Job {job_id} did not finish")
+
+
+class BlockingRunner:
+    """Holds every job until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def __call__(self, job):
+        self.release.wait(10)
+        return {'vocals': 'v.wav', 'instrumental': 'i.wav'}
+
+
+def test_split_job_round_trip(tmp_path):
+    source = create_test_wav(tmp_path / 'clip.wav', 0.01)
+
+    with JobService(port=0, workers=1) as service:
+        status, headers, body = call(service, 'POST', '/jobs', {
+            'input': str(source), 'engine': 'simple', 'output_dir': str(tmp_path / 'out'),
+            'use_cache': False})
+        assert status == 202 and headers['Location'] == f"/jobs/{body['id']}"
+
+        assert wait_for(service, body['id'])['status'] == 'done'
+        status, _, result = call(service, 'GET', f"/jobs/{body['id']}/result")
+
+    assert status == 200
+    assert Path(result['vocals']).is_file() and Path(result['instrumental']).is_file()
+
+
+def test_saturated_queue_answers_429_and_queued_jobs_cancel():
+    runner = BlockingRunner()
+    with JobService(port=0, workers=1, max_queue=2, runner=runner) as service:
+        ids = [call(service, 'POST', '/jobs', {'input': f'{i}.wav', 'engine': 'simple'})[2]['id']
+               for i in range(3)]
+        while service.running == 0:
+            time.sleep(0.01)
+
+        status, headers, _ = call(service, 'POST', '/jobs', {'input': 'x.wav', 'engine': 'simple'})
+        assert status == 429
+        assert headers['X-Queue-Depth'] == '2' and headers['X-Queue-Capacity'] == '2'
+        assert 'Retry-After' in headers
+
+        assert call(service, 'POST', f'/jobs/{ids[0]}/cancel')[0] == 409
+        assert call(service, 'POST', f'/jobs/{ids[1]}/cancel')[2]['status'] == 'cancelled'
+        assert call(service, 'GET', f'/jobs/{ids[2]}/result')[0] == 409
+
+        runner.release.set()
+        assert wait_for(service, ids[2])['status'] == 'done'
+        assert wait_for(service, ids[1])['status'] == 'cancelled'
+
+
+def test_invalid_and_unknown_requests(tmp_path):
+    with JobService(port=0, runner=BlockingRunner()) as service:
+        assert call(service, 'POST', '/jobs', {'engine': 'simple'})[0] == 400
+        assert call(service, 'POST', '/jobs', {'input': 'a.wav', 'engine': 'nope'})[0] == 400
+        assert call(service, 'GET', '/jobs/99')[0] == 404
+        assert call(service, 'GET', '/health')[2]['capacity'] == service.max_queue
+
+
+def test_cross_site_requests_are_refused():
+    with JobService(port=0, runner=BlockingRunner()) as service:
+        job = {'input': 'a.wav', 'engine': 'simple'}
+        form = {'Content-Type': 'application/x-www-form-urlencoded'}
+        assert call(service, 'POST', '/jobs', job, headers=form)[0] == 415
+        assert call(service, 'POST', '/jobs/1/cancel', headers={'Content-Type': 'text/plain'})[0] == 415
+
+        rebound = {'Host': f'attacker.example:{service.url.rsplit(":", 1)[1]}'}
+        assert call(service, 'POST', '/jobs', job, headers=rebound)[0] == 403
+        assert call(service, 'GET', '/health', headers=rebound)[0] == 403
+
+        local = {'Host': f'localhost:{service.url.rsplit(":", 1)[1]}'}
+        assert call(service, 'GET', '/health', headers=local)[0] == 200
+        assert service.queued == 0
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Checks for the SQLite batch job store: leases, requeueing and resuming
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add the current directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark import create_test_wav
+from job_store import JobStore, batch_name, run_stored_batch
+
+
+def test_lease_hands_each_job_out_once(tmp_path):
+    first, second = JobStore(tmp_path / 'jobs.db'), JobStore(tmp_path / 'jobs.db')
+    assert first.add('b', ['a.wav', 'b.wav'], 'simple') == 2
+    assert first.add('b', ['a.wav'], 'simple') == 0
+
+    leased = [first.lease('b', 'host:1'), second.lease('b', 'host:2'), first.lease('b', 'host:1')]
+
+    assert [job['input'] for job in leased[:2]] == ['a.wav', 'b.wav']
+    assert leased[2] is None
+    assert first.counts('b')['leased'] == 2
+
+
+def test_expired_lease_is_requeued_then_failed(tmp_path):
+    store = JobStore(tmp_path / 'jobs.db', max_attempts=2)
+    store.add('b', ['a.wav'], 'simple')
+
+    job = store.lease('b', 'other-host:1', lease_seconds=0.01)
+    time.sleep(0.05)
+    again = store.lease('b', 'other-host:2', lease_seconds=0.01)
+    assert again['id'] == job['id'] and again['attempts'] == 2
+    # The first worker lost its lease and cannot overwrite the job
+    assert not store.finish(job['id'], 'other-host:1', {
+        'status': 'done', 'vocals': None, 'instrumental': None,
+        'seconds': 0.0, 'duration': None, 'error': None})
+
+    time.sleep(0.05)
+    assert store.lease('b', 'other-host:3') is None
+    assert store.get(job['id'])['state'] == 'failed'
+
+
+def test_rerun_skips_finished_jobs(tmp_path):
+    files = [create_test_wav(tmp_path / f'clip{i}.wav', 0.01) for i in range(2)]
+    store_path = tmp_path / 'jobs.db'
+    out = tmp_path / 'out'
+
+    first = run_stored_batch(store_path, files, 'simple', out, workers=1, use_cache=False)
+    assert [r['status'] for r in first] == ['done', 'done']
+
+    # A third file joins the batch; only it is split on the second run
+    files.append(create_test_wav(tmp_path / 'clip2.wav', 0.01))
+    split = []
+    second = run_stored_batch(store_path, files, 'simple', out, workers=1, use_cache=False,
+                              on_start=split.append)
+
+    assert split == [str(files[2])]
+    assert [r['status'] for r in second] == ['done', 'done', 'done']
+    assert [r['attempts'] for r in second] == [1, 1, 1]
+
+
+def test_other_files_queued_in_the_batch_are_left_alone(tmp_path):
+    for folder in ('a', 'b'):
+        (tmp_path / folder).mkdir()
+    leftover = create_test_wav(tmp_path / 'a' / 'x.wav', 0.01)
+    wanted = create_test_wav(tmp_path / 'b' / 'y.wav', 0.01)
+    store_path = tmp_path / 'jobs.db'
+    store = JobStore(store_path)
+    store.add(batch_name('simple'), [str(leftover)], 'simple', {'output_dir': None, 'use_cache': False})
+    store.close()
+
+    split, summaries = [], []
+    results = run_stored_batch(store_path, [wanted], 'simple', workers=1, use_cache=False,
+                               on_start=split.append,
+                               on_result=lambda result, progress: summaries.append(progress.summary()))
+
+    assert split == [str(wanted)]
+    assert [r['input'] for r in results] == [str(wanted)]
+    assert summaries[-1].startswith('1/1 files')
+    assert not (tmp_path / 'a' / 'x_vocals.wav').exists()
+
+    store = JobStore(store_path)
+    assert store.counts(batch_name('simple'))['queued'] == 1
+    store.close()
+
+
+def test_changed_or_deleted_outputs_are_split_again(tmp_path):
+    files = [create_test_wav(tmp_path / f'clip{i}.wav', 0.01) for i in range(2)]
+    store_path = tmp_path / 'jobs.db'
+    first = run_stored_batch(store_path, files, 'simple', tmp_path / 'out', workers=1,
+                             use_cache=False)
+
+    Path(first[0]['vocals']).unlink()
+    create_test_wav(files[1], 0.02)
+    split = []
+    run_stored_batch(store_path, files, 'simple', tmp_path / 'out', workers=1, use_cache=False,
+                     on_start=split.append)
+
+    assert split == [str(f) for f in files]
+
+
+def test_unfinished_batches(tmp_path):
+    store = JobStore(tmp_path / 'jobs.db')
+    store.add('gui:a', ['a.wav', 'b.wav'], 'simple')
+    store.add('gui:b', ['c.wav'], 'simple')
+    store.add('cli', ['d.wav'], 'simple')
+    job = store.lease('gui:b', 'host:1')
+    store.finish(job['id'], 'host:1', {'status': 'done', 'vocals': None, 'instrumental': None,
+                                       'seconds': 0.0, 'duration': None, 'error': None})
+
+    assert store.unfinished_batches('gui:') == [('gui:a', ['a.wav', 'b.wav'])]
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Checks that every separation stage keeps the precision policy's dtypes
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add the current directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import precision
+import spectral
+from audio_splitter_librosa import AudioSplitter
+from enhanced_audio_splitter import EnhancedAudioSplitter
+
+SAMPLE_RATE = 22050
+
+
+@pytest.fixture(params=['float32', 'float64'])
+def policy(request):
+    """Run a test under each precision, restoring the previous one afterwards."""
+    previous = precision.get_precision()
+    precision.set_precision(request.param)
+    yield precision.float_dtype(), precision.complex_dtype()
+    precision.set_precision(previous)
+
+
+def make_signal(dtype, channels=None, seconds=1):
+    rng = np.random.default_rng(0)
+    shape = (int(seconds * SAMPLE_RATE),) if channels is None else (channels, int(seconds * SAMPLE_RATE))
+    return (0.1 * rng.standard_normal(shape)).astype(dtype)
+
+
+def test_stft_engine_keeps_dtype(policy):
+    real, complex_ = policy
+    seen = []
+
+    def process(S):
+        seen.append(S.dtype)
+        return S
+
+    out = spectral.process_stft(make_signal(real, channels=2), process, block_frames=16)
+    assert set(seen) == {complex_}
+    assert out.dtype == real
+
+
+def test_hpss_keeps_dtype(policy):
+    real, _ = policy
+    harmonic, percussive = spectral.hpss(make_signal(real))
+    selected = spectral.hpss_select(make_signal(real, channels=2), ('harmonic', 'percussive'))
+    assert harmonic.dtype == percussive.dtype == selected.dtype == real
+
+
+def test_normalize_peak_in_place(policy):
+    real, _ = policy
+    y = make_signal(real)
+    out = spectral.normalize_peak(y)
+    assert out is y and out.dtype == real
+    assert np.isclose(np.abs(out).max(), 1)
+
+
+def test_frequency_masks_keep_dtype(policy):
+    real, complex_ = policy
+    gains = AudioSplitter()._frequency_gains(SAMPLE_RATE)
+    masker = spectral.SpectralMasker(gains)
+    masked = masker(np.ones((1025, 8), dtype=complex_))
+    assert gains.dtype == real
+    assert masked.dtype == complex_
+    # The output buffer is reused for blocks of the same shape
+    assert masker(np.ones((1025, 8), dtype=complex_)) is masked
+
+
+def test_enhanced_stages_keep_dtype(policy):
+    real, _ = policy
+    splitter = EnhancedAudioSplitter()
+    audio = make_signal(real)
+
+    assert splitter.estimate_noise_profile(audio).dtype == real
+    assert splitter.apply_spectral_subtraction(audio).dtype == real
+    assert splitter.apply_bandpass_filter(audio, SAMPLE_RATE).dtype == real
+    assert splitter.apply_compression(audio).dtype == real
+
+    # Integer PCM channels go straight to the working float dtype
+    pcm = (make_signal(np.float64, channels=2) * 32767).astype(np.int16)
+    vocals, instrumental = splitter.enhanced_vocal_isolation(pcm[0], pcm[1], SAMPLE_RATE)
+    assert vocals.dtype == instrumental.dtype == real
+
+
+def test_unknown_precision_rejected():
+    with pytest.raises(ValueError):
+        precision.set_precision('float16')
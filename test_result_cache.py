@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Checks for the content-addressed split result cache
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the current directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import result_cache
+from result_cache import ResultCache, cached_split
+
+
+class CountingSplitter:
+    """Writes the input bytes as both stems and counts real runs."""
+
+    def __init__(self):
+        self.runs = 0
+
+    @cached_split('test', suffix='_test')
+    def split(self, input_path, output_dir=None, block_frames=1, sample_rate=None):
+        self.runs += 1
+        input_path = Path(input_path)
+        output_dir = Path(output_dir) if output_dir else input_path.parent / "split_output"
+        output_dir.mkdir(exist_ok=True)
+        paths = (output_dir / f"{input_path.stem}_vocals_test.wav",
+                 output_dir / f"{input_path.stem}_instrumental_test.wav")
+        for path in paths:
+            path.write_bytes(input_path.read_bytes())
+        return str(paths[0]), str(paths[1])
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('MUSIC_SPLITTER_CACHE', str(tmp_path / 'cache'))
+    monkeypatch.setattr(result_cache, '_enabled', True)
+    return tmp_path / 'cache'
+
+
+def test_identical_content_is_split_once(tmp_path, cache_dir):
+    first = tmp_path / 'a.wav'
+    second = tmp_path / 'b.wav'
+    first.write_bytes(b'same audio')
+    second.write_bytes(b'same audio')
+
+    splitter = CountingSplitter()
+    splitter.split(first)
+    vocals, instrumental = splitter.split(second, tmp_path / 'out', block_frames=7)
+
+    assert splitter.runs == 1
+    assert Path(vocals) == tmp_path / 'out' / 'b_vocals_test.wav'
+    assert Path(instrumental).read_bytes() == b'same audio'
+
+
+def test_changed_content_or_no_cache_recomputes(tmp_path, cache_dir):
+    path = tmp_path / 'a.wav'
+    path.write_bytes(b'one')
+    splitter = CountingSplitter()
+    splitter.split(path)
+
+    path.write_bytes(b'two')
+    os.utime(path, ns=(0, 0))
+    splitter.split(path)
+    splitter.split(path, use_cache=False)
+
+    assert splitter.runs == 3
+
+
+def test_sample_rate_is_keyed_by_keyword_or_position(tmp_path, cache_dir):
+    path = tmp_path / 'a.wav'
+    path.write_bytes(b'audio')
+    splitter = CountingSplitter()
+    splitter.split(path, tmp_path / 'out', 1, 22050)
+    splitter.split(path, tmp_path / 'out', sample_rate=22050)
+    splitter.split(path, tmp_path / 'out', 1, 44100)
+    splitter.split(path, tmp_path / 'out')
+
+    assert splitter.runs == 3
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(tmp_path / 'cache', max_bytes=2500)
+    stem = tmp_path / 'stem.wav'
+    stem.write_bytes(b'x' * 1000)
+
+    cache.put('aa01', [stem])
+    cache.put('aa02', [stem])
+    os.utime(cache._entry_dir('aa01') / result_cache.META_FILE, (0, 0))
+    os.utime(cache._entry_dir('aa02') / result_cache.META_FILE, (1, 1))
+    assert cache.get('aa01') is not None  # now the most recently used
+    cache.put('aa03', [stem])
+
+    assert cache.get('aa02') is None
+    assert cache.get('aa01') is not None and cache.get('aa03') is not None
+    assert cache.size() <= 2500
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Checks that the streaming simple splitter writes the same files as the
+original whole-file implementation
+"""
+
+import sys
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add the current directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from simple_audio_splitter import SimpleAudioSplitter
+
+DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+def whole_file_split(input_path, output_dir):
+    """The original algorithm: read every frame, separate, write each stem at once."""
+    with wave.open(str(input_path), 'rb') as wav_file:
+        frames = wav_file.readframes(-1)
+        sample_rate = wav_file.getframerate()
+        audio_data = np.frombuffer(frames, dtype=DTYPES[wav_file.getsampwidth()]).reshape(-1, 2)
+
+    left = audio_data[:, 0].astype(np.float32)
+    right = audio_data[:, 1].astype(np.float32)
+    center = np.clip((left - right) / 2, -32767, 32767).astype(np.int16)
+    sides = np.clip((left + right) / 2, -32767, 32767).astype(np.int16)
+
+    paths = []
+    for name, samples in (('vocals', center), ('instrumental', sides)):
+        path = Path(output_dir) / f"{Path(input_path).stem}_{name}.wav"
+        with wave.open(str(path), 'w') as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(sample_rate)
+            out.writeframes(samples.tobytes())
+        paths.append(path)
+    return paths
+
+
+def write_stereo(path, sample_width, frames=10_007):
+    info = np.iinfo(DTYPES[sample_width])
+    data = np.random.default_rng(sample_width).integers(info.min, info.max, (frames, 2),
+                                                        endpoint=True, dtype=DTYPES[sample_width])
+    # Full-scale opposite samples, so the clipping path is exercised
+    data[:2] = [[info.max, info.min], [info.min, info.max]]
+    with wave.open(str(path), 'wb') as w:
+        w.setnchannels(2)
+        w.setsampwidth(sample_width)
+        w.setframerate(22050)
+        w.writeframes(data.tobytes())
+    return path
+
+
+@pytest.mark.parametrize('sample_width', [1, 2, 4])
+@pytest.mark.parametrize('block_frames', [None, 1, 1000, 65536])
+def test_streaming_matches_whole_file_output(tmp_path, sample_width, block_frames):
+    source = write_stereo(tmp_path / 'song.wav', sample_width)
+    (tmp_path / 'expected').mkdir()
+    expected = whole_file_split(source, tmp_path / 'expected')
+
+    outputs = SimpleAudioSplitter().split_audio_simple(source, tmp_path / 'streamed', block_frames,
+                                                       use_cache=False)
+
+    for out, reference in zip(outputs, expected):
+        assert Path(out).read_bytes() == reference.read_bytes()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Checks the block STFT engine, median filter, HPSS and trimming against librosa and scipy
+"""
+
+import sys
+from pathlib import Path
+
+import librosa
+import numpy as np
+import pytest
+
+# Add the current directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import precision
+import spectral
+
+SAMPLE_RATE = 22050
+
+
+@pytest.fixture
+def float64():
+    previous = precision.get_precision()
+    precision.set_precision('float64')
+    yield
+    precision.set_precision(previous)
+
+
+def make_signal(shape, seed=0):
+    return 0.1 * np.random.default_rng(seed).standard_normal(shape)
+
+
+def reference(y, process):
+    """The whole-signal result the block engine must reproduce."""
+    return librosa.istft(process(librosa.stft(y)), length=y.shape[-1])
+
+
+def time_median(S, kernel_size=9):
+    """A process that looks along time: a soft mask from a median over frames."""
+    magnitude = np.abs(S)
+    smoothed = spectral.median_filter_1d(magnitude, kernel_size, axis=-1)
+    return S * (smoothed / (smoothed + magnitude + 1e-12))
+
+
+@pytest.mark.filterwarnings('ignore:n_fft=.* is too large')
+@pytest.mark.parametrize('shape', [(SAMPLE_RATE + 123,), (2, 3 * spectral.HOP_LENGTH), (2, SAMPLE_RATE)])
+def test_block_stft_matches_librosa(float64, shape):
+    y = make_signal(shape)
+    gains = np.linspace(0, 1, 1 + spectral.N_FFT // 2)[:, None]
+
+    def process(S):
+        return S * gains
+
+    for process_fn in (lambda S: S, process):
+        expected = reference(y, process_fn)
+        out = spectral.process_stft(y, process_fn, block_frames=16)
+        assert out.shape == y.shape
+        np.testing.assert_allclose(out, expected, rtol=0, atol=1e-10)
+
+
+def test_context_frames_match_whole_signal_processing(float64):
+    y = make_signal(SAMPLE_RATE)
+    expected = reference(y, time_median)
+
+    out = spectral.process_stft(y, time_median, block_frames=10, context_frames=4)
+    np.testing.assert_allclose(out, expected, rtol=0, atol=1e-10)
+
+
+@pytest.mark.parametrize('context_frames', [0, 4])
+def test_output_does_not_depend_on_block_size(context_frames):
+    y = make_signal((2, SAMPLE_RATE + 77)).astype(precision.float_dtype())
+    process = time_median if context_frames else (lambda S: 0.5 * S)
+
+    results = [spectral.process_stft(y, process, block_frames, context_frames)
+               for block_frames in (1, 3, 16, 100, 10_000)]
+
+    for out in results[1:]:
+        np.testing.assert_array_equal(out, results[0])
+
+
+def test_processes_may_add_leading_axes():
+    y = make_signal(SAMPLE_RATE).astype(precision.float_dtype())
+    both = spectral.process_stft(y, lambda S: np.stack([S, 2 * S]), block_frames=8)
+
+    assert both.shape == (2, SAMPLE_RATE)
+    np.testing.assert_allclose(both[1], 2 * both[0], rtol=1e-6, atol=1e-7)
+
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_trim_matches_librosa(dtype, tmp_path):
+    y = make_signal(3 * SAMPLE_RATE).astype(dtype)
+    y[:SAMPLE_RATE // 2] *= 1e-3
+    y[-SAMPLE_RATE // 3:] *= 1e-3
+    _, expected = librosa.effects.trim(y, top_db=20)
+
+    trimmed, bounds = spectral.trim_silence(y, top_db=20)
+    assert list(bounds) == list(expected) and trimmed.dtype == dtype
+
+    # Memory-mapped, with the frame energies fed in pieces as a stream would
+    np.save(tmp_path / 'y.npy', y)
+    energy = spectral.FrameEnergy()
+    for chunk in np.array_split(y, 7):
+        energy.update(chunk)
+    assert spectral.trim_bounds(np.load(tmp_path / 'y.npy', mmap_mode='r'), 20,
+                                energy=energy) == tuple(expected)
+
+    silent = np.zeros_like(y)
+    assert spectral.trim_bounds(silent, 20) == tuple(librosa.effects.trim(silent, top_db=20)[1])
+
+
+@pytest.mark.parametrize('size', [1, 2, 3, 4, 17, 31])
+@pytest.mark.parametrize('axis', [0, 1])
+def test_median_filter_matches_scipy(size, axis):
+    from scipy.ndimage import median_filter
+
+    # Few distinct values, so windows hold ties; short rows exercise edge padding
+    x = np.random.default_rng(size).integers(0, 5, (13, 40)).astype(float)
+    kernel = (size, 1) if axis == 0 else (1, size)
+
+    np.testing.assert_array_equal(spectral.median_filter_1d(x, size, axis=axis),
+                                  median_filter(x, size=kernel, mode='reflect'))
+
+
+@pytest.mark.parametrize('margin', [1.0, 2.0])
+@pytest.mark.parametrize('power', [2.0, np.inf])
+def test_hpss_masks_match_librosa(margin, power):
+    S = librosa.stft(make_signal(SAMPLE_RATE))
+    expected = librosa.decompose.hpss(S, kernel_size=31, power=power, margin=margin, mask=True)
+
+    masks = spectral.hpss_masks(S, kernel_size=31, power=power, margin=margin)
+    for mask, reference_mask in zip(masks, expected):
+        np.testing.assert_allclose(mask, reference_mask, rtol=1e-6, atol=1e-6)
+
+
+def test_hpss_select_matches_librosa(float64):
+    y = make_signal((2, SAMPLE_RATE))
+    harmonic, percussive = librosa.effects.hpss(y)
+
+    selected = spectral.hpss_select(y, ('harmonic', 'percussive'), block_frames=16)
+    np.testing.assert_allclose(selected[0], harmonic[0], rtol=0, atol=1e-10)
+    np.testing.assert_allclose(selected[1], percussive[1], rtol=0, atol=1e-10)
+
+    both = spectral.hpss(y[0], block_frames=16)
+    np.testing.assert_allclose(both[0], harmonic[0], rtol=0, atol=1e-10)
+    np.testing.assert_allclose(both[1], percussive[0], rtol=0, atol=1e-10)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Checks the block-wise spectral subtraction against whole-signal references
+"""
+
+import sys
+from pathlib import Path
+
+import librosa
+import numpy as np
+import pytest
+import scipy.signal
+from scipy.fft import rfft
+
+# Add the current directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import precision
+from benchmark import global_fft_spectral_subtraction
+from enhanced_audio_splitter import (SS_FRAME_LENGTH, SS_HOP_LENGTH, SS_NOISE_PERCENTILE,
+                                     EnhancedAudioSplitter)
+
+SAMPLE_RATE = 44100
+
+
+@pytest.fixture
+def float64():
+    previous = precision.get_precision()
+    precision.set_precision('float64')
+    yield
+    precision.set_precision(previous)
+
+
+def tone_in_noise(seconds=4, dtype=np.float32):
+    """The benchmark's input: a tone switched on half of the time, buried in white noise."""
+    n = int(seconds * SAMPLE_RATE)
+    t = np.arange(n) / SAMPLE_RATE
+    clean = (0.3 * np.sin(2 * np.pi * 440 * t) * (np.sin(2 * np.pi * 0.25 * t) > 0)).astype(dtype)
+    noisy = clean + (0.05 * np.random.default_rng(0).standard_normal(n)).astype(dtype)
+    return clean, noisy
+
+
+def whole_signal_subtraction(audio, noise_factor):
+    """The same short-time subtraction with every frame in memory at once, via librosa."""
+    window = scipy.signal.get_window('hann', SS_FRAME_LENGTH)
+    frames = librosa.util.frame(np.pad(audio, SS_FRAME_LENGTH // 2), frame_length=SS_FRAME_LENGTH,
+                                hop_length=SS_HOP_LENGTH, axis=0)
+    spectrum = rfft(frames * window, axis=-1)
+    magnitude = np.abs(spectrum)
+
+    energies = (frames * frames) @ (window * window)
+    noise = magnitude[energies <= np.percentile(energies, SS_NOISE_PERCENTILE)].mean(axis=0)
+
+    gain = np.maximum(magnitude - noise_factor * noise, 0.1 * magnitude) / np.maximum(magnitude, 1e-300)
+    return librosa.istft((spectrum * gain).T, hop_length=SS_HOP_LENGTH, n_fft=SS_FRAME_LENGTH,
+                         window='hann', length=len(audio))
+
+
+def test_matches_whole_signal_short_time_subtraction(float64):
+    _, noisy = tone_in_noise(dtype=np.float64)
+    expected = whole_signal_subtraction(noisy, 0.5)
+
+    out = EnhancedAudioSplitter().apply_spectral_subtraction(noisy, noise_factor=0.5)
+    np.testing.assert_allclose(out, expected, rtol=0, atol=1e-9)
+
+
+def test_output_does_not_depend_on_block_size():
+    _, noisy = tone_in_noise(seconds=2)
+    splitter = EnhancedAudioSplitter()
+
+    results = [splitter.apply_spectral_subtraction(noisy, noise_factor=0.3, block_frames=block_frames)
+               for block_frames in (1, 7, 64, 1024, 100_000)]
+
+    for out in results[1:]:
+        np.testing.assert_allclose(out, results[0], rtol=0, atol=1e-6)
+
+
+def test_close_to_the_previous_global_fft_version():
+    # Different algorithms (the old one subtracted one mean level from a
+    # single whole-signal FFT), so only close on a steady input like this one
+    clean, noisy = tone_in_noise()
+
+    def snr(signal):
+        return 10 * np.log10(np.sum(clean ** 2) / np.sum((signal - clean) ** 2))
+
+    frames = EnhancedAudioSplitter().apply_spectral_subtraction(noisy, noise_factor=0.5)
+    previous = global_fft_spectral_subtraction(noisy, noise_factor=0.5)
+
+    assert np.linalg.norm(frames - previous) / np.linalg.norm(previous) < 0.1
+    assert abs(snr(frames) - snr(previous)) < 1.5
+    assert snr(frames) > snr(noisy) + 3
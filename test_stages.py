@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Checks that separation stages run only when an output needs them
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add the current directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from audio_splitter_librosa import AudioSplitter
+from stages import Stages, reset_stage_counts, stage_counts
+
+
+def signal(shape):
+    return (0.1 * np.random.default_rng(0).standard_normal(shape)).astype(np.float32)
+
+
+def test_stages_run_once_and_only_when_needed():
+    stages = Stages(x=2)
+    stages.add('square', lambda s: s['x'] ** 2)
+    stages.add('cube', lambda s: s['x'] * s['square'])
+    stages.add('unused', lambda s: 1 / 0)
+
+    assert stages['cube'] == 8 and stages['cube'] == 8 and stages['square'] == 4
+    assert stages.runs == {'square': 1, 'cube': 1}
+    assert not stages.computed('unused')
+
+    stages.add('loop', lambda s: s['loop'])
+    with pytest.raises(RuntimeError):
+        stages['loop']
+
+
+def test_mono_split_skips_hpss(tmp_path):
+    reset_stage_counts()
+    AudioSplitter().split_signal(signal(22050), 22050, 'mono', tmp_path)
+
+    counts = stage_counts()
+    assert counts['hpss'] == 0
+    assert counts['vocals_trimmed'] == counts['instrumental_trimmed'] == 1
+    assert max(counts.values()) == 1
+
+
+def test_single_channel_split_uses_hpss():
+    stages = AudioSplitter().separation_stages(signal((1, 22050)), block_frames=16)
+
+    assert stages['vocals'].shape == stages['instrumental'].shape == (1, 22050)
+    assert stages.runs['hpss'] == 1
+    assert not stages.computed('center') and not stages.computed('sides')
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Checks that entry points and GUIs start without importing the DSP and download backends
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the current directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark import GUI_WINDOWS, run_entry_point, run_startup
+
+
+@pytest.mark.parametrize('script, flag', [
+    ('main.py', '--help'), ('main.py', '--version'),
+    ('main_enhanced.py', '--help'), ('main_exe.py', '--help'),
+    ('youtube_downloader.py', '--help'),
+])
+def test_entry_points_start_without_backends(script, flag):
+    _, heavy = run_entry_point(script, flag)
+    assert heavy == []
+
+
+@pytest.mark.parametrize('module', list(GUI_WINDOWS))
+def test_gui_modules_import_without_backends(module):
+    _, heavy = run_startup(f"import {module}")
+    assert heavy == []
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Checks MemmapWav's RIFF parsing against hand-built WAV files
+"""
+
+import struct
+import sys
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add the current directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from wav_io import WAVE_FORMAT_EXTENSIBLE, WAVE_FORMAT_PCM, open_wav
+
+# Sub-format GUID tail shared by the KSDATAFORMAT_SUBTYPE_* GUIDs
+GUID_TAIL = b'\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71'
+
+
+def chunk(chunk_id, payload, size=None):
+    """A RIFF chunk, padded to an even length; ``size`` overrides the header field."""
+    header = struct.pack('<4sI', chunk_id, len(payload) if size is None else size)
+    return header + payload + (b'\x00' if len(payload) & 1 else b'')
+
+
+def fmt_chunk(channels=2, sample_rate=22050, bits=16, format_tag=WAVE_FORMAT_PCM, sub_format=None):
+    block_align = channels * bits // 8
+    payload = struct.pack('<HHIIHH', format_tag, channels, sample_rate,
+                          sample_rate * block_align, block_align, bits)
+    if sub_format is not None:
+        payload += struct.pack('<HHI', 22, bits, 0x3) + struct.pack('<H', sub_format) + GUID_TAIL
+    return chunk(b'fmt ', payload)
+
+
+def write_wav(path, *chunks):
+    body = b'WAVE' + b''.join(chunks)
+    path.write_bytes(b'RIFF' + struct.pack('<I', len(body)) + body)
+    return path
+
+
+def samples(frames=100, channels=2):
+    return np.arange(frames * channels, dtype='<i2').reshape(frames, channels) - 50
+
+
+def test_matches_the_wave_module(tmp_path):
+    expected = samples()
+    path = tmp_path / 'plain.wav'
+    with wave.open(str(path), 'wb') as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(22050)
+        w.writeframes(expected.tobytes())
+
+    with open_wav(path) as wav:
+        assert (wav.sample_rate, wav.channels, wav.frames) == (22050, 2, 100)
+        np.testing.assert_array_equal(wav.left, expected[:, 0])
+        np.testing.assert_array_equal(wav.right, expected[:, 1])
+
+
+def test_odd_sized_chunks_are_skipped_with_their_pad_byte(tmp_path):
+    expected = samples()
+    path = write_wav(tmp_path / 'odd.wav', chunk(b'LIST', b'abc'), fmt_chunk(),
+                     chunk(b'junk', b'x' * 7), chunk(b'data', expected.tobytes()))
+
+    with open_wav(path) as wav:
+        np.testing.assert_array_equal(wav.data, expected)
+
+
+def test_extensible_pcm_is_read(tmp_path):
+    expected = samples(channels=1)
+    path = write_wav(tmp_path / 'ext.wav',
+                     fmt_chunk(channels=1, format_tag=WAVE_FORMAT_EXTENSIBLE, sub_format=WAVE_FORMAT_PCM),
+                     chunk(b'data', expected.tobytes()))
+
+    with open_wav(path) as wav:
+        np.testing.assert_array_equal(wav.data, expected)
+
+
+@pytest.mark.parametrize('size', [0, 0xFFFFFFFF])
+def test_streamed_data_size_runs_to_end_of_file(tmp_path, size):
+    expected = samples()
+    # A trailing partial frame is ignored
+    path = write_wav(tmp_path / 'streamed.wav', fmt_chunk(),
+                     chunk(b'data', expected.tobytes() + b'\x01', size=size))
+
+    with open_wav(path) as wav:
+        assert wav.frames == 100
+        np.testing.assert_array_equal(wav.data, expected)
+
+
+def test_empty_data_chunk(tmp_path):
+    path = write_wav(tmp_path / 'empty.wav', fmt_chunk(), struct.pack('<4sI', b'data', 0))
+
+    with open_wav(path) as wav:
+        assert wav.frames == 0 and wav.data.shape == (0, 2)
+
+
+@pytest.mark.parametrize('chunks, message', [
+    ((fmt_chunk(format_tag=0x0003, bits=32), chunk(b'data', b'\x00' * 8)), 'format tag'),
+    ((fmt_chunk(format_tag=WAVE_FORMAT_EXTENSIBLE, bits=32, sub_format=0x0003),
+      chunk(b'data', b'\x00' * 8)), 'format tag'),
+    ((fmt_chunk(bits=24), chunk(b'data', b'\x00' * 6)), 'sample width'),
+    ((chunk(b'data', b'\x00' * 4), fmt_chunk()), 'before fmt'),
+    ((fmt_chunk(),), 'no data chunk'),
+    ((chunk(b'fmt ', b'\x01\x00'), chunk(b'data', b'')), 'Truncated'),
+])
+def test_unsupported_files_are_rejected(tmp_path, chunks, message):
+    path = write_wav(tmp_path / 'bad.wav', *chunks)
+    with pytest.raises(ValueError, match=message):
+        open_wav(path)
+
+
+def test_non_riff_files_are_rejected(tmp_path):
+    path = tmp_path / 'not.wav'
+    path.write_bytes(b'ID3\x03' + b'\x00' * 60)
+    with pytest.raises(ValueError, match='RIFF'):
+        open_wav(path)
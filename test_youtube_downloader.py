@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Checks for YouTubeDownloader's single extraction, video-ID download cache,
+parallel downloads and streaming split
+"""
+
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add the current directory to the path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import precision
+from benchmark import MediaServer, create_test_wav
+from download_cache import DownloadCache
+from pcm_stream import decode_stream, ffmpeg_available, iter_pcm_blocks
+from youtube_downloader import YouTubeDownloader, host_key
+
+VIDEO_ID = 'dQw4w9WgXcQ'
+URL = f'https://www.youtube.com/watch?v={VIDEO_ID}'
+
+
+class StubYoutubeDL:
+    """Stands in for yt_dlp.YoutubeDL, serving a local file as the video's audio."""
+
+    source = None
+    calls = []
+    report_downloads = True
+
+    def __init__(self, params):
+        self.params = params
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url, download=True):
+        self.calls.append(('extract_info', url))
+        if 'list=' in url:
+            return {'_type': 'playlist', 'id': 'PL1', 'entries': [
+                {'_type': 'url', 'url': URL, 'id': VIDEO_ID},
+                {'_type': 'url', 'url': 'https://www.youtube.com/watch?v=aaaaaaaaaaa', 'id': 'aaaaaaaaaaa'},
+            ]}
+        return {'id': VIDEO_ID, 'title': 'Stub Song', 'ext': 'wav', 'duration': 61,
+                'uploader': 'Stub', 'view_count': 5, 'upload_date': '20240101',
+                'webpage_url': url}
+
+    def prepare_filename(self, info):
+        filename = self.params['outtmpl']
+        for field in ('title', 'id', 'ext'):
+            filename = filename.replace(f'%({field})s', info[field])
+        return filename
+
+    def process_ie_result(self, info, download=True):
+        self.calls.append(('process_ie_result', info['id']))
+        filepath = self.prepare_filename(info)
+        shutil.copyfile(self.source, filepath)
+        if not self.report_downloads:
+            return dict(info)
+        return dict(info, requested_downloads=[{'filepath': filepath}])
+
+    def download(self, urls):
+        raise AssertionError("URLs should not be resolved a second time")
+
+
+@pytest.fixture(autouse=True)
+def result_cache_dir(tmp_path, monkeypatch):
+    # Splits in these tests must not write stems into the user's cache
+    monkeypatch.setenv('MUSIC_SPLITTER_CACHE', str(tmp_path / 'result-cache'))
+
+
+@pytest.fixture
+def downloader(tmp_path):
+    source = tmp_path / 'source.wav'
+    source.write_bytes(b'RIFF stub audio')
+    StubYoutubeDL.source = source
+    StubYoutubeDL.calls = []
+    StubYoutubeDL.report_downloads = True
+    return YouTubeDownloader(ydl_class=StubYoutubeDL, cache_dir=tmp_path / 'cache')
+
+
+def test_download_extracts_once(downloader, tmp_path):
+    path = downloader.download_audio(URL, tmp_path / 'downloads')
+
+    assert Path(path).read_bytes() == b'RIFF stub audio'
+    assert StubYoutubeDL.calls == [('extract_info', URL), ('process_ie_result', VIDEO_ID)]
+
+
+def test_repeat_requests_skip_the_extractor(downloader, tmp_path):
+    first = downloader.download_audio(URL, tmp_path / 'downloads')
+    StubYoutubeDL.calls = []
+
+    assert downloader.download_audio(URL, tmp_path / 'downloads') == first
+    # Another URL form of the same video ID is also known
+    assert downloader.download_audio(f'https://youtu.be/{VIDEO_ID}', tmp_path / 'downloads') == first
+    assert downloader.get_video_info(URL)['title'] == 'Stub Song'
+    assert StubYoutubeDL.calls == []
+
+
+def test_video_info_is_cached(downloader):
+    info = downloader.get_video_info(URL)
+    assert downloader.get_video_info(URL) == info
+    assert info['duration'] == 61
+    assert StubYoutubeDL.calls == [('extract_info', URL)]
+
+
+def test_missing_download_is_fetched_again(downloader, tmp_path):
+    Path(downloader.download_audio(URL, tmp_path / 'downloads')).unlink()
+    downloader.download_audio(URL, tmp_path / 'downloads')
+    assert StubYoutubeDL.calls.count(('process_ie_result', VIDEO_ID)) == 2
+
+
+@pytest.mark.parametrize('report_downloads', [True, False])
+def test_downloaded_file_is_resolved_exactly(downloader, tmp_path, report_downloads):
+    StubYoutubeDL.report_downloads = report_downloads
+    downloads = tmp_path / 'downloads'
+    downloads.mkdir()
+    # Newer files with a matching title must not be picked up
+    (downloads / 'Stub Song (other job).wav').write_bytes(b'other')
+    (downloads / 'zzz.wav').write_bytes(b'newest')
+
+    path = downloader.download_audio(URL, downloads)
+
+    assert Path(path) == downloads / f'Stub Song [{VIDEO_ID}].wav'
+    assert Path(path).read_bytes() == b'RIFF stub audio'
+
+
+def test_download_and_split_decodes_at_target_rate(downloader, tmp_path):
+    import soundfile as sf
+
+    StubYoutubeDL.source = create_test_wav(tmp_path / 'source.wav', 0.02)
+    downloader.sample_rate = 22050
+
+    vocals, instrumental = downloader.download_and_split(URL, tmp_path / 'out')
+
+    assert sf.info(vocals).samplerate == sf.info(instrumental).samplerate == 22050
+    assert not any(key in downloader.download_opts for key in ('extractaudio', 'audioformat'))
+    assert downloader.download_opts['postprocessors'] == []
+
+def test_deleted_original_is_dropped_from_the_cache(downloader, tmp_path):
+    StubYoutubeDL.source = create_test_wav(tmp_path / 'source.wav', 0.01)
+
+    downloader.download_and_split(URL, tmp_path / 'out', keep_original=False)
+
+    assert downloader.cache.cached_file(downloader.cache.lookup(URL)) is None
+    assert downloader.cache.lookup(URL)['info']['title'] == 'Stub Song'
+    StubYoutubeDL.calls = []
+    assert Path(downloader.download_audio(URL, tmp_path / 'downloads')).is_file()
+    assert ('process_ie_result', VIDEO_ID) in StubYoutubeDL.calls
+
+
+def test_removing_another_copy_keeps_the_cached_file(downloader, tmp_path):
+    StubYoutubeDL.source = create_test_wav(tmp_path / 'source.wav', 0.01)
+    cached = downloader.download_audio(URL, tmp_path / 'downloads')
+    copy = shutil.copyfile(cached, tmp_path / 'copy.wav')
+
+    downloader.remove_original(copy, URL)
+    assert downloader.cache.cached_file(downloader.cache.lookup(URL)) == str(Path(cached).resolve())
+
+    downloader.remove_original(cached, URL)
+    assert downloader.cache.cached_file(downloader.cache.lookup(URL)) is None
+
+
+def record_videos(cache_dir, first, count):
+    cache = DownloadCache(cache_dir)
+    for i in range(first, first + count):
+        cache.record(f'https://www.youtube.com/watch?v={i:011d}', {'id': f'{i:011d}'})
+
+
+def test_processes_sharing_the_index_lose_no_updates(tmp_path):
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(record_videos, [tmp_path] * 4, range(0, 100, 25), [25] * 4))
+
+    assert all(DownloadCache(tmp_path).get(f'{i:011d}') for i in range(100))
+
+
+def test_playlists_are_expanded_without_duplicates(downloader):
+    urls = downloader.expand_urls([URL, 'https://www.youtube.com/playlist?list=PL1'])
+    assert urls == [URL, 'https://www.youtube.com/watch?v=aaaaaaaaaaa']
+    # Single video URLs are not sent to the extractor
+    assert StubYoutubeDL.calls == [('extract_info', 'https://www.youtube.com/playlist?list=PL1')]
+
+
+def test_info_for_a_playlist_downloads_nothing(downloader, monkeypatch, capsys):
+    import youtube_downloader
+    monkeypatch.setattr(youtube_downloader, 'YouTubeDownloader', lambda **kwargs: downloader)
+    monkeypatch.setattr(sys, 'argv', ['youtube_downloader.py', '--info',
+                                      '--url', 'https://www.youtube.com/playlist?list=PL1'])
+
+    youtube_downloader.main()
+
+    assert capsys.readouterr().out.count('Title: Stub Song') == 2
+    assert not [call for call in StubYoutubeDL.calls if call[0] == 'process_ie_result']
+
+
+def test_host_key_groups_youtube_domains():
+    assert host_key('https://youtu.be/x') == host_key('https://m.youtube.com/watch?v=x') == 'youtube.com'
+
+
+def test_download_many_limits_hosts_and_retries(tmp_path):
+    media = tmp_path / 'media'
+    media.mkdir()
+    for i in range(4):
+        create_test_wav(media / f'track{i}.wav', 0.01)
+
+    downloader = YouTubeDownloader(cache_dir=tmp_path / 'cache')
+    downloader.download_opts.update(quiet=True, noprogress=True)
+
+    with MediaServer(media, latency=0.1) as server:
+        urls = [f'{server.url}/track{i}.wav' for i in range(4)] + [f'{server.url}/missing.wav']
+        results = downloader.download_many(urls, tmp_path / 'downloads', workers=5,
+                                           per_host=2, retries=1, backoff=0)
+
+    assert [r['url'] for r in results] == urls
+    assert [r['status'] for r in results] == ['done'] * 4 + ['failed']
+    assert results[-1]['attempts'] == 2 and results[-1]['error']
+    assert all(Path(r['path']).is_file() for r in results[:4])
+    assert server.max_active <= 2
+
+
+def test_download_and_split_pipeline(tmp_path):
+    media = tmp_path / 'media'
+    media.mkdir()
+    for i in range(3):
+        create_test_wav(media / f'track{i}.wav', 0.01)
+
+    downloader = YouTubeDownloader(cache_dir=tmp_path / 'cache')
+    downloader.download_opts.update(quiet=True, noprogress=True)
+
+    with MediaServer(media) as server:
+        urls = [f'{server.url}/track{i}.wav' for i in range(3)] + [f'{server.url}/missing.wav']
+        results = downloader.download_and_split_many(
+            urls, tmp_path / 'out', engine='simple', download_workers=2, split_workers=2,
+            queue_size=1, retries=0, keep_original=False)
+
+    assert [r['status'] for r in results] == ['done'] * 3 + ['failed']
+    for result in results[:3]:
+        assert Path(result['vocals']).is_file() and Path(result['instrumental']).is_file()
+        assert not Path(result['path']).exists()
+
+
+def test_pipeline_splits_and_deletes_a_shared_file_once(downloader, tmp_path):
+    StubYoutubeDL.source = create_test_wav(tmp_path / 'source.wav', 0.01)
+    split = []
+
+    results = downloader.download_and_split_many(
+        [URL, f'https://youtu.be/{VIDEO_ID}'], tmp_path / 'out', engine='simple',
+        download_workers=1, split_workers=2, queue_size=2, keep_original=False,
+        on_result=split.append)
+
+    assert [r['status'] for r in results] == ['done', 'done']
+    assert results[0]['path'] == results[1]['path'] and not Path(results[0]['path']).exists()
+    assert results[0]['vocals'] == results[1]['vocals'] and len(split) == 2
+
+
+@pytest.mark.skipif(not ffmpeg_available(), reason="ffmpeg not installed")
+def test_stream_and_split_matches_file_split(tmp_path):
+    import soundfile as sf
+    from audio_splitter_librosa import AudioSplitter
+
+    media = tmp_path / 'media'
+    media.mkdir()
+    source = create_test_wav(media / 'track.wav', 0.05)
+
+    downloader = YouTubeDownloader(cache_dir=tmp_path / 'cache')
+    downloader.download_opts.update(quiet=True, noprogress=True)
+
+    with MediaServer(media) as server:
+        streamed = downloader.stream_and_split(f'{server.url}/track.wav', tmp_path / 'out')
+
+    # Only the stems are written, and they match splitting the file itself
+    assert sorted(p.name for p in (tmp_path / 'out').iterdir()) == sorted(Path(p).name for p in streamed)
+    expected = AudioSplitter().split_audio(source, tmp_path / 'expected', use_cache=False)
+    for streamed_path, expected_path in zip(streamed, expected):
+        streamed_audio, streamed_sr = sf.read(streamed_path)
+        expected_audio, expected_sr = sf.read(expected_path)
+        assert streamed_sr == expected_sr
+        assert streamed_audio.shape == expected_audio.shape
+        assert abs(streamed_audio - expected_audio).max() < 1e-3
+
+
+@pytest.mark.skipif(not ffmpeg_available(), reason="ffmpeg not installed")
+@pytest.mark.parametrize('duration', [None, 0, 0.01, 100])
+def test_decode_stream_fills_its_buffer_in_place(tmp_path, duration):
+    path = create_test_wav(tmp_path / 'clip.wav', 0.02)
+    blocks = np.concatenate(list(iter_pcm_blocks(path, 22050, block_frames=1000)))
+
+    stereo = decode_stream(path, 22050, block_frames=1000, duration=duration)
+    mono = decode_stream(path, 22050, mono=True, block_frames=1000, duration=duration)
+
+    np.testing.assert_array_equal(stereo, blocks.T)
+    np.testing.assert_array_equal(mono, blocks.mean(axis=1))
+    assert stereo.flags.c_contiguous and stereo.dtype == mono.dtype == precision.float_dtype()
@@ -0,0 +1,110 @@
+"""
+Warm-up of the librosa separation pipeline and its on-disk JIT cache
+
+librosa's numba-backed kernels compile on first use and its audio loading
+stack is imported lazily, which makes the first split after launch several
+times slower than later ones. ``warm_up`` runs the load/STFT/HPSS/trim
+stages once on a tiny synthetic signal (``start_warm_up`` does it on a
+background thread) so the first real job does not pay that cost.
+
+Compiled kernels are kept in ``~/.cache/music_splitter/numba`` (or
+NUMBA_CACHE_DIR if set), so later runs load them instead of compiling again,
+even when the installed packages are read-only.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_JIT_CACHE_DIR = Path.home() / '.cache' / 'music_splitter' / 'numba'
+
+WARM_UP_SAMPLE_RATE = 22050
+WARM_UP_SECONDS = 0.5
+
+_lock = threading.Lock()
+_warm_up_seconds = None
+
+
+def configure_jit_cache(cache_dir=None):
+    """
+    Point numba's cache at a persistent user directory.
+
+    Must run before librosa first calls into numba to take effect for every
+    kernel; NUMBA_CACHE_DIR set by the user is left alone.
+    """
+    if cache_dir is not None:
+        os.environ['NUMBA_CACHE_DIR'] = str(cache_dir)
+    else:
+        os.environ.setdefault('NUMBA_CACHE_DIR', str(DEFAULT_JIT_CACHE_DIR))
+    cache_dir = os.environ['NUMBA_CACHE_DIR']
+    try:
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    except OSError:
+        # numba falls back to its other cache locations
+        return cache_dir
+
+    if 'numba' in sys.modules:
+        import numba
+        numba.config.CACHE_DIR = cache_dir
+    return cache_dir
+
+
+def warm_up():
+    """
+    Run the separation stages once on a tiny signal; return the seconds it took.
+
+    Later calls return the first call's time without doing any work.
+    """
+    global _warm_up_seconds
+    with _lock:
+        if _warm_up_seconds is not None:
+            return _warm_up_seconds
+
+        start = time.perf_counter()
+        configure_jit_cache()
+
+        import numpy as np
+        import librosa
+        import soundfile as sf
+        from precision import float_dtype
+        from spectral import hpss, trim_silence
+
+        t = np.arange(int(WARM_UP_SECONDS * WARM_UP_SAMPLE_RATE)) / WARM_UP_SAMPLE_RATE
+        tone = (0.3 * np.sin(2 * np.pi * 440 * t)).astype(float_dtype())
+
+        # Load through librosa's file path so its audio backends are imported too
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'warm_up.wav'
+            sf.write(str(path), tone, WARM_UP_SAMPLE_RATE)
+            y, _ = librosa.load(str(path), sr=None, dtype=float_dtype())
+
+        harmonic, percussive = hpss(y)
+        trim_silence(librosa.effects.preemphasis(harmonic), top_db=20)
+        trim_silence(percussive, top_db=20)
+
+        _warm_up_seconds = time.perf_counter() - start
+        return _warm_up_seconds
+
+
+def start_warm_up(on_done=None):
+    """
+    Warm up on a daemon thread and return the thread.
+
+    ``on_done(seconds)`` is called from that thread when it finishes.
+    """
+    def run():
+        try:
+            seconds = warm_up()
+        except Exception as e:
+            # The first real split reports any problem with the backend
+            print(f"⚠️  Warm-up failed: {e}")
+            return
+        if on_done:
+            on_done(seconds)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,128 @@
+"""
+Zero-copy WAV input using memory-mapped PCM data
+"""
+
+import struct
+import numpy as np
+from pathlib import Path
+
+# WAVE format tags
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Little-endian PCM dtypes by sample width in bytes (8-bit WAV is unsigned)
+PCM_DTYPES = {
+    1: np.dtype(np.uint8),
+    2: np.dtype('<i2'),
+    4: np.dtype('<i4'),
+}
+
+
+class MemmapWav:
+    """
+    A PCM WAV file whose data chunk is exposed as an ``np.memmap``.
+
+    ``data`` has shape ``(frames, channels)``; ``left`` and ``right`` are
+    strided column views into it. Samples are only read from disk (through
+    the OS page cache) when they are touched, and nothing is copied until a
+    caller converts them.
+    """
+
+    def __init__(self, file_path):
+        self.path = Path(file_path)
+
+        with open(self.path, 'rb') as f:
+            header = self._parse_header(f, self.path.stat().st_size)
+
+        (self.sample_rate, self.channels, self.sample_width,
+         data_offset, data_size) = header
+
+        if self.sample_width not in PCM_DTYPES:
+            raise ValueError(f"Unsupported sample width: {self.sample_width}")
+
+        self.dtype = PCM_DTYPES[self.sample_width]
+        frame_size = self.channels * self.sample_width
+        self.frames = data_size // frame_size
+
+        if self.frames > 0:
+            self.data = np.memmap(self.path, dtype=self.dtype, mode='r',
+                                  offset=data_offset,
+                                  shape=(self.frames, self.channels))
+        else:
+            self.data = np.zeros((0, self.channels), dtype=self.dtype)
+
+    @staticmethod
+    def _parse_header(f, file_size):
+        """Walk the RIFF chunks and return format fields plus the data chunk location."""
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b'RIFF' or riff[8:12] != b'WAVE':
+            raise ValueError("Not a RIFF/WAVE file")
+
+        fmt = None
+        while True:
+            chunk_header = f.read(8)
+            if len(chunk_header) < 8:
+                break
+
+            chunk_id, chunk_size = struct.unpack('<4sI', chunk_header)
+            chunk_start = f.tell()
+
+            if chunk_id == b'fmt ':
+                fmt_data = f.read(chunk_size)
+                if len(fmt_data) < 16:
+                    raise ValueError("Truncated fmt chunk")
+
+                format_tag, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', fmt_data[:16])
+                if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt_data) >= 26:
+                    # The real format tag is the first field of the sub-format GUID
+                    format_tag = struct.unpack('<H', fmt_data[24:26])[0]
+
+                if format_tag != WAVE_FORMAT_PCM:
+                    raise ValueError(f"Unsupported WAV format tag: {format_tag:#06x} (PCM only)")
+
+                fmt = (sample_rate, channels, (bits + 7) // 8)
+
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError("WAV data chunk appears before fmt chunk")
+
+                # Streaming writers may leave the size as 0 or 0xFFFFFFFF
+                data_size = min(chunk_size, file_size - chunk_start)
+                if chunk_size == 0:
+                    data_size = file_size - chunk_start
+
+                return fmt + (chunk_start, data_size)
+
+            # Chunks are word aligned
+            f.seek(chunk_start + chunk_size + (chunk_size & 1))
+
+        raise ValueError("WAV file has no data chunk")
+
+    @property
+    def left(self):
+        """Strided view of the first channel."""
+        return self.data[:, 0]
+
+    @property
+    def right(self):
+        """Strided view of the second channel."""
+        return self.data[:, 1]
+
+    @property
+    def duration(self):
+        return self.frames / self.sample_rate
+
+    def close(self):
+        """Drop the mapping; views handed out earlier keep it alive until released."""
+        self.data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_wav(file_path):
+    """Open a PCM WAV file as a memory-mapped ``MemmapWav``."""
+    return MemmapWav(file_path)
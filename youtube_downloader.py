@@ -1,24 +1,82 @@
-import yt_dlp
 import os
+import re
 import sys
+import time
+import random
+import shutil
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from urllib.parse import urlparse
 import argparse
-from audio_splitter_librosa import AudioSplitter
+from download_cache import DownloadCache
+
+# yt-dlp, the splitter and the stream decoder are imported when first needed,
+# so URL checks and --help stay fast
+
+# The video ID keeps names unique when downloads share a directory
+OUTPUT_TEMPLATE = '%(title)s [%(id)s].%(ext)s'
+
+# Multi-URL download settings
+DEFAULT_DOWNLOAD_WORKERS = 4
+DEFAULT_PER_HOST = 2
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 2.0
+DEFAULT_FRAGMENT_CONCURRENCY = 4
+
+# Downloaded files allowed to wait for a split worker in pipelined mode
+DEFAULT_PIPELINE_QUEUE = 4
+
+# Per-item fields written to CSV manifests in multi-URL mode
+DOWNLOAD_MANIFEST_FIELDS = ('url', 'status', 'path', 'attempts', 'seconds',
+                            'split_seconds', 'vocals', 'instrumental', 'error')
+
+# Download profile: the native audio stream, saved as served with no
+# postprocessing (no transcode), to be decoded once for splitting
+AUDIO_DOWNLOAD_PROFILE = {
+    'format': 'bestaudio[ext=m4a]/bestaudio[ext=webm]/bestaudio',
+    'postprocessors': [],
+    'keepvideo': False,
+}
+
+# Containers the native profile can produce (plus plain files served directly)
+AUDIO_EXTENSIONS = {'.m4a', '.webm', '.opus', '.ogg', '.mp3', '.aac', '.flac', '.wav'}
+
+# Rate downloaded audio is decoded at for splitting
+SPLIT_SAMPLE_RATE = 44100
+
+# Streaming mode reads the audio over plain HTTP(S)
+STREAM_FORMAT = 'bestaudio[protocol^=http]/best[protocol^=http]'
+
+# Playlist and channel URLs, which are expanded into their videos
+COLLECTION_URL_PATTERN = re.compile(r'[?&]list=|/playlist\b|/@|/channel/|/c/|/user/')
 
 class YouTubeDownloader:
-    def __init__(self):
-        """Initialize YouTube downloader with optimal settings."""
-        self.download_opts = {
-            'format': 'bestaudio[ext=m4a]/bestaudio[ext=mp3]/bestaudio',
-            'outtmpl': '%(title)s.%(ext)s',
-            'extractaudio': True,
-            'audioformat': 'mp3',
-            'audioquality': '192',
-            'noplaylist': True,
-            'no_warnings': False,
-            'prefer_ffmpeg': True,
-            'keepvideo': False,
-        }
+    def __init__(self, ydl_class=None, cache_dir=None, use_cache=True,
+                 sample_rate=SPLIT_SAMPLE_RATE):
+        """
+        Initialize YouTube downloader with optimal settings.
+        
+        Args:
+            ydl_class: YoutubeDL-compatible class (default: yt_dlp.YoutubeDL)
+            cache_dir (str): Directory of the video-ID download index (optional)
+            use_cache (bool): Reuse earlier downloads and metadata for known videos
+            sample_rate (int): Rate downloads are decoded at for splitting
+        """
+        if ydl_class is None:
+            import yt_dlp
+            ydl_class = yt_dlp.YoutubeDL
+        self.ydl_class = ydl_class
+        self.cache = DownloadCache(cache_dir) if use_cache else None
+        self.sample_rate = sample_rate
+        self.download_opts = dict(
+            AUDIO_DOWNLOAD_PROFILE,
+            outtmpl=OUTPUT_TEMPLATE,
+            noplaylist=True,
+            no_warnings=False,
+            concurrent_fragment_downloads=DEFAULT_FRAGMENT_CONCURRENCY,
+        )
     
     def download_audio(self, url, output_dir=None):
         """
@@ -39,65 +97,331 @@ class YouTubeDownloader:
             
             output_dir.mkdir(exist_ok=True)
             
-            # Update output template with directory
-            self.download_opts['outtmpl'] = str(output_dir / '%(title)s.%(ext)s')
+            # Output template with directory, per call so concurrent downloads don't share it
+            download_opts = dict(self.download_opts, outtmpl=str(output_dir / OUTPUT_TEMPLATE))
             
             print(f"🌐 Downloading from: {url}")
             print(f"📁 Download directory: {output_dir}")
             
-            with yt_dlp.YoutubeDL(self.download_opts) as ydl:
+            # A URL or video ID fetched before needs no extractor or network work
+            if self.cache:
+                cached_file = self._use_cached_download(self.cache.lookup(url), output_dir)
+                if cached_file:
+                    return cached_file
+            
+            with self.ydl_class(download_opts) as ydl:
                 # Extract video info
                 print("📋 Extracting video information...")
                 info = ydl.extract_info(url, download=False)
+                
+                # A new URL for a video that was already downloaded
+                if self.cache:
+                    cached_file = self._use_cached_download(self.cache.get(info.get('id')), output_dir)
+                    if cached_file:
+                        self.cache.record(url, info)
+                        return cached_file
+                
                 video_title = info.get('title', 'Unknown')
-                duration = info.get('duration', 0)
+                duration = int(info.get('duration') or 0)
                 
                 print(f"🎵 Title: {video_title}")
                 print(f"⏱️  Duration: {duration // 60}:{duration % 60:02d}")
                 
-                # Download the audio
+                # Download from the extracted info instead of resolving the URL again
                 print("⬇️  Downloading audio...")
-                ydl.download([url])
+                info = ydl.process_ie_result(info, download=True)
                 
-                # Find the downloaded file
-                downloaded_files = list(output_dir.glob(f"*{video_title[:50]}*"))
-                if not downloaded_files:
-                    # Fallback: find the most recent file
-                    downloaded_files = sorted(output_dir.glob("*"), key=os.path.getctime, reverse=True)
+                # The exact file yt-dlp wrote, without scanning the directory
+                downloaded_file = self._downloaded_path(ydl, info)
+                if not downloaded_file.is_file():
+                    raise FileNotFoundError(f"Downloaded file not found: {downloaded_file}")
                 
-                if downloaded_files:
-                    downloaded_file = downloaded_files[0]
-                    
-                    # Check if it's actually an audio file
-                    audio_extensions = {'.mp3', '.wav', '.m4a', '.aac', '.ogg', '.flac'}
-                    if downloaded_file.suffix.lower() not in audio_extensions:
-                        raise ValueError(f"Downloaded file is not a supported audio format: {downloaded_file.suffix}")
-                    
-                    print(f"✓ Download completed: {downloaded_file.name}")
-                    return str(downloaded_file)
-                else:
-                    raise FileNotFoundError("Downloaded file not found")
+                # Check if it's actually an audio file
+                if downloaded_file.suffix.lower() not in AUDIO_EXTENSIONS:
+                    raise ValueError(f"Downloaded file is not a supported audio format: {downloaded_file.suffix}")
+                
+                if self.cache:
+                    self.cache.record(url, info, downloaded_file)
+                
+                print(f"✓ Download completed: {downloaded_file.name}")
+                return str(downloaded_file)
                     
         except Exception as e:
             print(f"✗ Download error: {e}")
             raise e
     
+    @staticmethod
+    def _downloaded_path(ydl, info):
+        """
+        Path of the file a download produced, from the info dict yt-dlp returned.
+        
+        ``requested_downloads`` holds the final path after any postprocessing;
+        ``prepare_filename`` gives the same name from the output template.
+        """
+        for download in info.get('requested_downloads') or []:
+            if download.get('filepath'):
+                return Path(download['filepath'])
+        return Path(info.get('filepath') or ydl.prepare_filename(info))
+    
+    def _use_cached_download(self, entry, output_dir):
+        """Return an earlier download from the index, copied into output_dir if needed."""
+        cached_file = self.cache.cached_file(entry)
+        if not cached_file:
+            return None
+        
+        cached_file = Path(cached_file)
+        if cached_file.parent.resolve() != output_dir.resolve():
+            target = output_dir / cached_file.name
+            shutil.copy2(cached_file, target)
+            cached_file = target
+        
+        print(f"✓ Using cached download: {cached_file.name}")
+        return str(cached_file)
+    
     def get_video_info(self, url):
         """Get video information without downloading."""
         try:
-            with yt_dlp.YoutubeDL({'quiet': True}) as ydl:
-                info = ydl.extract_info(url, download=False)
-                return {
-                    'title': info.get('title', 'Unknown'),
-                    'duration': info.get('duration', 0),
-                    'uploader': info.get('uploader', 'Unknown'),
-                    'view_count': info.get('view_count', 0),
-                    'upload_date': info.get('upload_date', 'Unknown')
-                }
+            entry = self.cache.lookup(url) if self.cache else None
+            if entry:
+                info = entry['info']
+            else:
+                with self.ydl_class({'quiet': True}) as ydl:
+                    info = ydl.extract_info(url, download=False)
+                if self.cache:
+                    self.cache.record(url, info)
+            
+            return {
+                'title': info.get('title') or 'Unknown',
+                'duration': int(info.get('duration') or 0),
+                'uploader': info.get('uploader') or 'Unknown',
+                'view_count': info.get('view_count') or 0,
+                'upload_date': info.get('upload_date') or 'Unknown'
+            }
         except Exception as e:
             print(f"Error getting video info: {e}")
             return None
     
+    def expand_urls(self, urls):
+        """
+        Expand playlist and channel URLs into the URLs of their videos.
+        
+        Other URLs are passed through without running the extractor.
+        Duplicates are removed, keeping the first occurrence.
+        """
+        expanded = []
+        opts = {'quiet': True, 'extract_flat': 'in_playlist', 'noplaylist': False}
+        with self.ydl_class(opts) as ydl:
+            for url in urls:
+                if is_collection_url(url):
+                    print(f"📋 Listing videos in: {url}")
+                    info = ydl.extract_info(url, download=False)
+                    expanded.extend(self._entry_urls(ydl, info))
+                else:
+                    expanded.append(url)
+        return list(dict.fromkeys(expanded))
+    
+    def _entry_urls(self, ydl, info, depth=0):
+        """Video URLs in a flat-extracted result, following channel tabs."""
+        if info.get('_type') not in ('playlist', 'multi_video'):
+            return [info.get('webpage_url') or info.get('url')]
+        
+        urls = []
+        for entry in info.get('entries') or []:
+            if not entry:
+                continue
+            if entry.get('_type') == 'playlist':
+                urls.extend(self._entry_urls(ydl, entry, depth + 1))
+            elif entry.get('ie_key') == 'YoutubeTab' and depth < 2:
+                # Channel pages list their tabs (videos, shorts, ...) as playlists
+                urls.extend(self._entry_urls(ydl, ydl.extract_info(entry['url'], download=False), depth + 1))
+            elif entry.get('url') or entry.get('webpage_url'):
+                urls.append(entry.get('url') or entry.get('webpage_url'))
+        return urls
+    
+    def _download_with_retries(self, url, output_dir, host_slot, retries, backoff):
+        """Download one URL inside its host slot, retrying with backoff; returns a result dict."""
+        result = {'url': url, 'status': 'failed', 'path': None, 'attempts': 0,
+                  'seconds': 0.0, 'split_seconds': 0.0, 'vocals': None,
+                  'instrumental': None, 'error': None}
+        start = time.perf_counter()
+        for attempt in range(retries + 1):
+            result['attempts'] = attempt + 1
+            try:
+                with host_slot(url):
+                    result['path'] = self.download_audio(url, output_dir)
+                result['status'] = 'done'
+                result['error'] = None
+                break
+            except ValueError as e:
+                # Unsupported formats will not change on retry
+                result['error'] = f"{type(e).__name__}: {e}"
+                break
+            except Exception as e:
+                result['error'] = f"{type(e).__name__}: {e}"
+                if attempt < retries:
+                    # Exponential backoff with jitter, outside the host slot
+                    time.sleep(backoff * 2 ** attempt * random.uniform(0.5, 1.0))
+        result['seconds'] = time.perf_counter() - start
+        return result
+    
+    def download_many(self, urls, output_dir=None, workers=DEFAULT_DOWNLOAD_WORKERS,
+                      per_host=DEFAULT_PER_HOST, retries=DEFAULT_RETRIES,
+                      backoff=DEFAULT_BACKOFF, on_result=None):
+        """
+        Download many videos, playlists or channels on a bounded thread pool.
+        
+        Args:
+            urls (list): Video, playlist or channel URLs
+            output_dir (str): Directory to save downloaded files
+            workers (int): Downloads in flight at once
+            per_host (int): Downloads in flight at once per host
+            retries (int): Extra attempts for a failing download
+            backoff (float): Seconds before the first retry, doubled per retry
+            on_result (callable): Called with each result dict as it finishes
+        
+        Returns:
+            list: Result dicts (url, status, path, attempts, seconds, error) in input order
+        """
+        urls = self.expand_urls(urls)
+        host_slot = host_slots(per_host)
+        
+        def fetch(url):
+            return self._download_with_retries(url, output_dir, host_slot, retries, backoff)
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = [executor.submit(fetch, url) for url in urls]
+            for future in as_completed(futures):
+                result = future.result()
+                results[result['url']] = result
+                if on_result:
+                    on_result(result)
+        
+        return [results[url] for url in urls]
+    
+    def download_and_split_many(self, urls, output_dir=None, engine='librosa',
+                                download_workers=DEFAULT_DOWNLOAD_WORKERS, split_workers=None,
+                                queue_size=DEFAULT_PIPELINE_QUEUE, per_host=DEFAULT_PER_HOST,
+                                retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF,
+                                keep_original=True, on_result=None):
+        """
+        Download and split many URLs as a two-stage pipeline.
+        
+        Downloads run on a thread pool and hand finished files to a bounded
+        queue; split workers take files from the queue and separate them in
+        worker processes while later downloads continue. When the queue is
+        full the downloaders wait, so at most ``queue_size + split_workers``
+        downloaded files are waiting or being split at any time.
+        
+        Args:
+            urls (list): Video, playlist or channel URLs
+            output_dir (str): Directory for downloads and stems
+            engine (str): Splitter engine name from batch.ENGINES
+            download_workers (int): Downloads in flight at once
+            split_workers (int): Files split at once (default: one per CPU)
+            queue_size (int): Downloaded files allowed to wait for a split worker
+            keep_original (bool): Whether to keep the downloaded files; deleted
+                ones are dropped from the download cache (see remove_original)
+            on_result (callable): Called with each result dict as it finishes
+        
+        Returns:
+            list: Result dicts in input order, with vocals, instrumental and
+            split_seconds added to the download fields
+        """
+        from batch import ENGINES, default_workers, process_pool, split_file
+        
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine: {engine} (choose from {', '.join(ENGINES)})")
+        
+        urls = self.expand_urls(urls)
+        split_workers = max(1, min(split_workers or default_workers(), len(urls) or 1))
+        host_slot = host_slots(per_host)
+        ready = queue.Queue(maxsize=max(1, queue_size))
+        results = {}
+        results_lock = threading.Lock()
+        # Several URLs can resolve to one file (another URL form of a video, or
+        # a cached download): it is split once and deleted once, after the batch
+        splits = {}
+        originals = {}
+        
+        def finish(result):
+            with results_lock:
+                results[result['url']] = result
+            if on_result:
+                on_result(result)
+        
+        def download(url):
+            result = self._download_with_retries(url, output_dir, host_slot, retries, backoff)
+            if result['status'] == 'done':
+                # Blocks while the split stage is behind (backpressure)
+                ready.put(result)
+            else:
+                finish(result)
+        
+        def split_loop(split_pool):
+            while True:
+                result = ready.get()
+                if result is None:
+                    return
+                try:
+                    with results_lock:
+                        if result['path'] not in splits:
+                            splits[result['path']] = split_pool.submit(split_file, engine,
+                                                                       result['path'], output_dir)
+                        future = splits[result['path']]
+                    split = future.result()
+                    result['split_seconds'] = split['seconds']
+                    if split['status'] == 'done':
+                        result['vocals'] = split['vocals']
+                        result['instrumental'] = split['instrumental']
+                    else:
+                        result['status'] = 'failed'
+                        result['error'] = split['error']
+                except Exception as e:
+                    # The worker process itself died
+                    result['status'] = 'failed'
+                    result['error'] = f"{type(e).__name__}: {e}"
+                finally:
+                    with results_lock:
+                        originals.setdefault(result['path'], []).append(result)
+                    finish(result)
+        
+        with process_pool(split_workers) as split_pool:
+            splitters = [threading.Thread(target=split_loop, args=(split_pool,), daemon=True)
+                         for _ in range(split_workers)]
+            for splitter in splitters:
+                splitter.start()
+            try:
+                with ThreadPoolExecutor(max_workers=max(1, download_workers)) as download_pool:
+                    list(download_pool.map(download, urls))
+            finally:
+                for _ in splitters:
+                    ready.put(None)
+                for splitter in splitters:
+                    splitter.join()
+        
+        if not keep_original:
+            for path, sharing in originals.items():
+                # Kept if any URL using it failed, so a retry need not download again
+                if all(r['status'] == 'done' for r in sharing):
+                    self.remove_original(path, sharing[0]['url'])
+        
+        return [results[url] for url in urls]
+    
+    def remove_original(self, path, url):
+        """
+        Delete a downloaded file and drop it from the download cache.
+        
+        The video's metadata stays cached; only the file is forgotten (if it
+        is the one recorded for the video), so a later request for the same
+        video downloads it again.
+        """
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"🗑️  Removed original file: {Path(path).name}")
+        if self.cache:
+            self.cache.forget(self.cache.resolve_id(url), path)
+    
     def download_and_split(self, url, output_dir=None, keep_original=True):
         """
         Download audio from YouTube and automatically split it.
@@ -105,7 +429,8 @@ class YouTubeDownloader:
         Args:
             url (str): YouTube video URL
             output_dir (str): Directory for output files
-            keep_original (bool): Whether to keep the original downloaded file
+            keep_original (bool): Whether to keep the original downloaded file;
+                a deleted one is dropped from the download cache
         
         Returns:
             tuple: Paths to vocal and instrumental files
@@ -116,68 +441,230 @@ class YouTubeDownloader:
             
             # Initialize audio splitter
             print("\n🔧 Initializing audio splitter...")
+            from audio_splitter_librosa import AudioSplitter
             splitter = AudioSplitter()
             
-            # Split the downloaded audio
+            # Split the downloaded audio, decoding it once at the target rate
             print("🎵 Splitting audio into vocals and instrumentals...")
-            vocal_path, instrumental_path = splitter.split_audio(downloaded_file, output_dir)
+            vocal_path, instrumental_path = splitter.split_audio(downloaded_file, output_dir,
+                                                                 sample_rate=self.sample_rate)
             
             # Optionally remove original file
             if not keep_original:
-                os.remove(downloaded_file)
-                print(f"🗑️  Removed original file: {Path(downloaded_file).name}")
+                self.remove_original(downloaded_file, url)
             
             return vocal_path, instrumental_path
             
         except Exception as e:
             print(f"✗ Error in download and split process: {e}")
             raise e
+    
+    def stream_and_split(self, url, output_dir=None, sample_rate=None):
+        """
+        Decode the audio stream straight into the splitter and save only the stems.
+        
+        The selected format's URL is piped through ffmpeg into float PCM, so the
+        source is neither written to disk nor transcoded before splitting.
+        
+        Args:
+            url (str): YouTube video URL
+            output_dir (str): Directory for output files (default: downloads/split_output)
+            sample_rate (int): Decode rate (default: the downloader's sample_rate)
+        
+        Returns:
+            tuple: Paths to vocal and instrumental files
+        """
+        try:
+            if output_dir is None:
+                output_dir = Path.cwd() / "downloads" / "split_output"
+            
+            stream_opts = dict(self.download_opts, format=STREAM_FORMAT)
+            
+            print(f"🌐 Streaming from: {url}")
+            with self.ydl_class(stream_opts) as ydl:
+                print("📋 Extracting video information...")
+                info = ydl.extract_info(url, download=False)
+                base_name = Path(ydl.prepare_filename(info)).stem
+            
+            if self.cache:
+                self.cache.record(url, info)
+            
+            # A single selected format has its fields at the top level
+            stream = (info.get('requested_formats') or [info])[0]
+            protocol = stream.get('protocol') or 'https'
+            if not protocol.startswith('http') or not stream.get('url'):
+                raise ValueError(f"Format cannot be streamed (protocol: {protocol})")
+            
+            sample_rate = int(sample_rate or self.sample_rate)
+            
+            print(f"🎵 Title: {info.get('title', 'Unknown')}")
+            print(f"🔊 Decoding stream at {sample_rate} Hz...")
+            from pcm_stream import decode_stream
+            y = decode_stream(stream['url'], sample_rate, headers=stream.get('http_headers'), mono=True,
+                              duration=info.get('duration'))
+            
+            print("🎵 Splitting audio into vocals and instrumentals...")
+            from audio_splitter_librosa import AudioSplitter
+            return AudioSplitter().split_signal(y, sample_rate, base_name, output_dir)
+            
+        except Exception as e:
+            print(f"✗ Error in stream and split process: {e}")
+            raise e
 
 def is_valid_youtube_url(url):
     """Check if the URL is a valid YouTube URL."""
     youtube_domains = ['youtube.com', 'youtu.be', 'www.youtube.com', 'm.youtube.com']
     return any(domain in url for domain in youtube_domains)
 
+def is_collection_url(url):
+    """Check if the URL names a playlist or channel rather than one video."""
+    return bool(COLLECTION_URL_PATTERN.search(url))
+
+def host_slots(per_host):
+    """Function mapping a URL to its host's semaphore, allowing ``per_host`` holders."""
+    slots = {}
+    lock = threading.Lock()
+    
+    def host_slot(url):
+        with lock:
+            return slots.setdefault(host_key(url), threading.BoundedSemaphore(max(1, per_host)))
+    
+    return host_slot
+
+def host_key(url):
+    """Host used for per-host download limits (YouTube's domains count as one)."""
+    host = (urlparse(url).hostname or '').lower()
+    for prefix in ('www.', 'm.', 'music.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return 'youtube.com' if host == 'youtu.be' else host
+
+def read_url_file(path):
+    """URLs from a text file, one per line ('#' starts a comment)."""
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+def run_many(downloader, urls, args):
+    """Download several URLs in parallel, optionally split them, and report per item."""
+    from batch import write_manifest
+    
+    def report(result):
+        mark = '✓' if result['status'] == 'done' else '✗'
+        print(f"{mark} {result['url']}  ({result['attempts']} attempts, {result['seconds']:.1f}s)")
+    
+    if args.split:
+        # Split each file while the next ones download
+        print(f"🚀 Downloading {len(urls)} URLs with {args.workers} workers "
+              f"and splitting with {args.split_workers or 'one per CPU'}...\n")
+        results = downloader.download_and_split_many(
+            urls, args.output, download_workers=args.workers, split_workers=args.split_workers,
+            queue_size=args.queue_size, per_host=args.per_host, retries=args.retries,
+            keep_original=args.keep_original, on_result=report)
+    else:
+        print(f"🚀 Downloading {len(urls)} URLs with {args.workers} workers...\n")
+        results = downloader.download_many(urls, args.output, workers=args.workers,
+                                           per_host=args.per_host, retries=args.retries,
+                                           on_result=report)
+    
+    if args.manifest:
+        path = write_manifest(results, args.manifest, fields=DOWNLOAD_MANIFEST_FIELDS,
+                              workers=args.workers, per_host=args.per_host)
+        print(f"📄 Manifest saved: {path}")
+    
+    failed = [r for r in results if r['status'] != 'done']
+    print(f"\n✓ {len(results) - len(failed)}/{len(results)} items completed")
+    if failed:
+        print(f"❌ {len(failed)} items failed:")
+        for result in failed:
+            print(f"  {result['url']}: {result['error']}")
+        sys.exit(1)
+
 def main():
     """Command line interface for YouTube downloading and splitting."""
     parser = argparse.ArgumentParser(description='Download audio from YouTube and split into vocal/instrumental')
-    parser.add_argument('--url', '-u', required=True, help='YouTube video URL')
+    parser.add_argument('--url', '-u', nargs='+', default=[],
+                       help='YouTube video, playlist or channel URL(s)')
+    parser.add_argument('--url-file', metavar='FILE', help='Text file with one URL per line')
     parser.add_argument('--output', '-o', help='Output directory (optional)')
     parser.add_argument('--info', action='store_true', help='Show video information only')
     parser.add_argument('--keep-original', action='store_true', 
-                       help='Keep the original downloaded file (default: True)')
-    parser.add_argument('--split', action='store_true', 
+                       help='Keep the downloaded audio after splitting (default: delete it '
+                            'and drop it from the download cache, so it is fetched again next time)')
+    parser.add_argument('--split', action='store_true', default=True,
                        help='Download and automatically split audio (default)')
+    parser.add_argument('--no-split', dest='split', action='store_false',
+                       help='Only download the audio')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Download again even if the video was fetched before')
+    parser.add_argument('--stream', action='store_true',
+                       help='Decode the audio while it downloads and save only the split tracks (needs ffmpeg)')
+    parser.add_argument('--workers', '-j', type=int, default=DEFAULT_DOWNLOAD_WORKERS,
+                       help=f'Parallel downloads for several URLs (default: {DEFAULT_DOWNLOAD_WORKERS})')
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST,
+                       help=f'Parallel downloads per host (default: {DEFAULT_PER_HOST})')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                       help=f'Retries for a failing download (default: {DEFAULT_RETRIES})')
+    parser.add_argument('--split-workers', type=int, metavar='N',
+                       help='Files split at once for several URLs (default: one per CPU)')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_PIPELINE_QUEUE,
+                       help=f'Downloaded files waiting to be split (default: {DEFAULT_PIPELINE_QUEUE})')
+    parser.add_argument('--manifest', metavar='FILE',
+                       help='Write per-URL results to a .json or .csv manifest')
     
     args = parser.parse_args()
     
-    # Validate YouTube URL
-    if not is_valid_youtube_url(args.url):
-        print("❌ Error: Please provide a valid YouTube URL")
+    urls = list(args.url)
+    if args.url_file:
+        urls.extend(read_url_file(args.url_file))
+    if not urls:
+        parser.error('provide --url or --url-file')
+    
+    # Validate YouTube URLs
+    invalid = [url for url in urls if not is_valid_youtube_url(url)]
+    if invalid:
+        print(f"❌ Error: Please provide valid YouTube URLs: {', '.join(invalid)}")
         sys.exit(1)
     
     try:
-        downloader = YouTubeDownloader()
+        downloader = YouTubeDownloader(use_cache=not args.no_cache)
         
         if args.info:
+            # Nothing is downloaded, however many URLs are given
             print("📋 Getting video information...")
-            info = downloader.get_video_info(args.url)
-            if info:
-                print(f"\n📊 Video Information:")
-                print(f"   🎵 Title: {info['title']}")
-                print(f"   👤 Uploader: {info['uploader']}")
-                print(f"   ⏱️  Duration: {info['duration'] // 60}:{info['duration'] % 60:02d}")
-                print(f"   👀 Views: {info['view_count']:,}")
-                print(f"   📅 Upload Date: {info['upload_date']}")
+            for url in downloader.expand_urls(urls):
+                info = downloader.get_video_info(url)
+                if info:
+                    print(f"\n📊 Video Information: {url}")
+                    print(f"   🎵 Title: {info['title']}")
+                    print(f"   👤 Uploader: {info['uploader']}")
+                    print(f"   ⏱️  Duration: {info['duration'] // 60}:{info['duration'] % 60:02d}")
+                    print(f"   👀 Views: {info['view_count']:,}")
+                    print(f"   📅 Upload Date: {info['upload_date']}")
             return
         
-        # Default behavior: download and split
-        print("🚀 Starting download and split process...\n")
-        vocal_path, instrumental_path = downloader.download_and_split(
-            args.url, 
-            args.output, 
-            keep_original=args.keep_original
-        )
+        # Several videos, a playlist or a channel
+        if len(urls) > 1 or args.url_file or any(is_collection_url(url) for url in urls):
+            run_many(downloader, urls, args)
+            return
+        
+        url = urls[0]
+        if not args.split:
+            print("🚀 Starting download...\n")
+            downloaded_file = downloader.download_audio(url, args.output)
+            print(f"\n🎉 Downloaded: {Path(downloaded_file).name}")
+            return
+        
+        if args.stream:
+            print("🚀 Starting stream and split process...\n")
+            vocal_path, instrumental_path = downloader.stream_and_split(url, args.output)
+        else:
+            # Default behavior: download and split
+            print("🚀 Starting download and split process...\n")
+            vocal_path, instrumental_path = downloader.download_and_split(
+                url, 
+                args.output, 
+                keep_original=args.keep_original
+            )
         
         print(f"\n🎉 Process completed successfully!")
         print(f"📂 Files created:")